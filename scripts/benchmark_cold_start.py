@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: JSON mapping files vs compiled mapping bundle.
+
+Writes N synthetic center mappings to a temporary directory, then
+starts fresh Python processes that do what a CLI or web process does
+before its first extraction query:
+
+- list available mappings
+- load each center's mapping and build its extraction SQL
+
+Reported per mode: time to the first center's SQL and to all centers.
+Interpreter startup is excluded (measured from inside the process).
+
+Usage:
+    python scripts/benchmark_cold_start.py --centers 500 --runs 5
+"""
+
+import argparse
+import json
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.mapping_bundle import compile_bundle  # noqa: E402
+
+# Same canonical layout as services.mapping_generator (which needs pyodbc)
+EXPECTED_COLUMNS = {
+    "PATIENT": ["ID", "P_NAME", "P_VORNAME", "DELKZ"],
+    "KASSEN": ["ID", "NAME", "ART", "DELKZ"],
+    "PATKASSE": ["ID", "PATNR", "KASSENID", "DELKZ"],
+    "KARTEI": ["ID", "PATNR", "DATUM", "BEMERKUNG", "DELKZ"],
+    "LEISTUNG": ["ID", "PATIENTID", "DATUM", "LEISTUNG", "DELKZ"],
+}
+
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+from pathlib import Path
+from src.core.introspector import MappingCache
+from src.core.queries import CHART_ENTRIES, SERVICES, get_query
+
+mappings_dir = Path(sys.argv[1])
+cache = MappingCache(mappings_dir, mappings_dir.parent / sys.argv[2])
+first = None
+for center_id in sorted(cache.list_available()):
+    schema = cache.get(center_id)
+    get_query(schema, CHART_ENTRIES)
+    get_query(schema, SERVICES)
+    if first is None:
+        first = time.perf_counter() - start
+total = time.perf_counter() - start
+print(json.dumps({"first_ms": first * 1000, "all_ms": total * 1000,
+                  "stats": cache.stats()}))
+"""
+
+
+def suffix(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.choice([2, 3, 4])))
+
+
+def write_mappings(mappings_dir: Path, centers: int, seed: int) -> None:
+    rng = random.Random(seed)
+    mappings_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(1, centers + 1):
+        center_id = f"center_{i:04d}"
+        mapping = {
+            "center_id": center_id,
+            "database": f"DentalDB_{i:04d}",
+            "schema": "ck",
+            "generated": True,
+            "reviewed": False,
+            "tables": {
+                table: {
+                    "actual_name": f"{table}_{suffix(rng)}",
+                    "columns": {
+                        col: {"actual_name": col if col in ("ID", "DELKZ") else f"{col}_{suffix(rng)}"}
+                        for col in columns
+                    },
+                }
+                for table, columns in EXPECTED_COLUMNS.items()
+            },
+            "unmapped_tables": [],
+        }
+        path = mappings_dir / f"{center_id}_mapping.json"
+        path.write_text(json.dumps(mapping, indent=2), encoding="utf-8")
+
+
+def probe(mappings_dir: Path, bundle_name: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, str(mappings_dir), bundle_name],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for mapping loading")
+    parser.add_argument("--centers", "-n", type=int, default=500)
+    parser.add_argument("--runs", "-r", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mappings_dir = Path(tmp) / "mappings"
+        write_mappings(mappings_dir, args.centers, args.seed)
+        compile_bundle(mappings_dir, Path(tmp) / "mappings.bundle")
+
+        print(f"\n{'='*60}")
+        print(f"COLD START ({args.centers} centers, {args.runs} runs, median)")
+        print(f"{'='*60}")
+        print(f"{'Mode':12} {'first SQL ms':>14} {'all SQL ms':>12}")
+
+        # "missing.bundle" does not exist -> pure JSON path
+        for label, bundle_name in (("json", "missing.bundle"), ("bundle", "mappings.bundle")):
+            runs = [probe(mappings_dir, bundle_name) for _ in range(args.runs)]
+            first = statistics.median(r["first_ms"] for r in runs)
+            total = statistics.median(r["all_ms"] for r in runs)
+            print(f"{label:12} {first:14.1f} {total:12.1f}")
+
+        print(f"{'='*60}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
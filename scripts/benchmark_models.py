@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark chart entry representations.
+
+Compares the original dict-backed ChartEntry dataclass with the slotted
+ChartEntry and the columnar ChartEntryBatch:
+
+- memory per million entries (tracemalloc)
+- JSON and CSV export time
+
+No database needed - entries are synthesized with realistic repetition
+(few insurances, several entries per patient, shared service codes).
+
+Usage:
+    python scripts/benchmark_models.py --entries 1000000
+"""
+
+import argparse
+import csv
+import gc
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.chart_entry import FIELDS, ChartEntry, ChartEntryBatch  # noqa: E402
+
+INSURANCES = [
+    ("GKV", "AOK Bayern"),
+    ("GKV", "DAK Gesundheit"),
+    ("GKV", "Techniker Krankenkasse"),
+    ("PKV", "PRIVAT"),
+    ("Selbstzahler", None),
+]
+TEXTS = [
+    "Kontrolle, Befund unauffällig",
+    "Zahnreinigung durchgeführt",
+    "Füllungstherapie Zahn 36",
+    "Röntgenaufnahme OPG",
+]
+CODES = ["01", "1040", "13b", "Ä935", "ä1", "2197"]
+
+
+@dataclass
+class LegacyChartEntry:
+    """The original ChartEntry (per-instance __dict__, no interning)."""
+
+    center_id: str
+    center_name: str
+    date: date
+    patient_id: int
+    insurance_status: str
+    insurance_name: str | None
+    chart_entry: str
+    service_codes: list[str] = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "center_id": self.center_id,
+            "center_name": self.center_name,
+            "date": self.date.isoformat(),
+            "patient_id": self.patient_id,
+            "insurance_status": self.insurance_status,
+            "insurance_name": self.insurance_name,
+            "chart_entry": self.chart_entry,
+            "service_codes": self.service_codes,
+        }
+
+    def to_csv_row(self):
+        return {
+            "center_id": self.center_id,
+            "center_name": self.center_name,
+            "date": self.date.isoformat(),
+            "patient_id": str(self.patient_id),
+            "insurance_status": self.insurance_status,
+            "insurance_name": self.insurance_name or "",
+            "chart_entry": self.chart_entry,
+            "service_codes": ",".join(self.service_codes),
+        }
+
+
+def synth_rows(n: int, seed: int):
+    """Rows as the adapter sees them: fresh string objects per row."""
+    rng = random.Random(seed)
+    patients = max(1, n // 3)
+    services = {
+        pid: rng.sample(CODES, rng.randint(0, 3)) for pid in range(1, patients + 1)
+    }
+    rows = []
+    for _ in range(n):
+        pid = rng.randint(1, patients)
+        status, name = INSURANCES[pid % len(INSURANCES)]
+        # Copy strings so they behave like values decoded from the driver
+        rows.append((
+            pid,
+            "".join(status),
+            None if name is None else "".join(name),
+            "".join(rng.choice(TEXTS)),
+        ))
+    return rows, services
+
+
+def build_legacy(rows, services, target):
+    return [
+        LegacyChartEntry("center_01", "".join("Zahnarztpraxis München"), target,
+                         pid, status, name, text, list(services.get(pid, [])))
+        for pid, status, name, text in rows
+    ]
+
+
+def build_slotted(rows, services, target):
+    return [
+        ChartEntry("center_01", "".join("Zahnarztpraxis München"), target,
+                   pid, status, name, text, list(services.get(pid, [])))
+        for pid, status, name, text in rows
+    ]
+
+
+def build_batch(rows, services, target):
+    batch = ChartEntryBatch("center_01", "Zahnarztpraxis München", target)
+    for pid, codes in services.items():
+        batch.add_services(pid, codes)
+    for pid, status, name, text in rows:
+        batch.append(pid, status, name, text)
+    return batch
+
+
+def measure_memory(builder, rows, services, target):
+    """Return (object, bytes allocated while building)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = builder(rows, services, target)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def export_entries(entries):
+    start = time.perf_counter()
+    json.dumps([e.to_dict() for e in entries], ensure_ascii=False)
+    json_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(FIELDS))
+    writer.writeheader()
+    for e in entries:
+        writer.writerow(e.to_csv_row())
+    csv_ms = (time.perf_counter() - start) * 1000
+    return json_ms, csv_ms
+
+
+def export_batch(batch):
+    start = time.perf_counter()
+    json.dumps(batch.to_dicts(), ensure_ascii=False)
+    json_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(FIELDS)
+    writer.writerows(batch.iter_csv_rows())
+    csv_ms = (time.perf_counter() - start) * 1000
+    return json_ms, csv_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--entries", "-n", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    target = date(2022, 1, 18)
+    rows, services = synth_rows(args.entries, args.seed)
+    per_million = 1_000_000 / args.entries
+
+    print(f"\n{'='*60}")
+    print(f"CHART ENTRY MODEL BENCHMARK ({args.entries:,} entries)")
+    print(f"{'='*60}")
+    print(f"{'Model':22} {'MB/1M':>10} {'JSON ms':>10} {'CSV ms':>10}")
+
+    results = [
+        ("dataclass (legacy)", build_legacy, export_entries),
+        ("ChartEntry (slots)", build_slotted, export_entries),
+        ("ChartEntryBatch", build_batch, export_batch),
+    ]
+    for label, builder, exporter in results:
+        obj, allocated = measure_memory(builder, rows, services, target)
+        json_ms, csv_ms = exporter(obj)
+        mb = allocated * per_million / (1024 * 1024)
+        print(f"{label:22} {mb:10.1f} {json_ms:10.0f} {csv_ms:10.0f}")
+        del obj
+
+    print(f"{'='*60}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
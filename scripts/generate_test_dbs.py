@@ -2,21 +2,61 @@
 """
 Generate test databases for multi-center extraction.
 
-Creates 30 databases with RANDOM table/column suffixes per element,
-simulating real-world schema variations across dental centers.
-Each center gets a mapping file recording the actual schema.
+Creates one database per center with RANDOM table/column suffixes per
+element, simulating real-world schema variations across dental centers.
+Each center gets a ground truth file recording the actual schema.
+
+Default: the configured centers with a small fixed sample data set.
+Scale mode (--patients given): synthetic data for N centers, e.g. a
+500-center benchmark fleet with millions of chart entries:
+
+    python scripts/generate_test_dbs.py --centers 500 --patients 2000 \
+        --days 30 --entries-per-day 200 --workers 8 --seed 42
+
+- Patients are drawn from a Zipf distribution (--patient-skew, 0 =
+  uniform), so a few patients have many entries, as in real practices
+- --deleted-rate soft-deletes (DELKZ=1) a share of patients, chart
+  entries and services; extraction must filter them out
+- Rows are loaded with fast_executemany in batches; databases are
+  built in parallel (--workers), with recovery model SIMPLE
+- Each center draws from its own RNG seeded with (--seed, center_id),
+  so a fleet is reproducible regardless of build order. Seeds and
+  options are written into each ground truth file and a manifest
+- Centers beyond the configured ones are written to a fleet config
+  (--config-out); use it with IVORIS_CONFIG=<file> or --config <file>
+
+--backend sqlite writes one SQLite file per center (--sqlite-dir,
+default data/sqlite) instead of SQL Server databases, with the same
+random-suffix schemas and data. The fleet config then selects the
+SQLite backend, so discovery, mappings, extraction and benchmarks run
+without a SQL Server:
+
+    python scripts/generate_test_dbs.py --backend sqlite --centers 500 \
+        --patients 500 --entries-per-day 50 --workers 8
 """
 
+import argparse
+import hashlib
 import json
 import logging
 import random
 import string
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from itertools import accumulate
 from pathlib import Path
 
-import pyodbc
 import yaml
 
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.config import database_config  # noqa: E402
+from src.core.dialect import DEFAULT_SQLITE_DIR, DIALECTS  # noqa: E402
+
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
@@ -57,6 +97,27 @@ SAMPLE_SERVICES = [
     (3, 20220118, "Ä935"),
 ]
 
+# Vocabulary for synthetic (scale mode) data
+LAST_NAMES = [
+    "Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+    "Schulz", "Hoffmann", "Schäfer", "Koch", "Bauer", "Richter", "Klein", "Wolf",
+]
+FIRST_NAMES = [
+    "Anna", "Hans", "Maria", "Klaus", "Petra", "Jonas", "Lena", "Lukas",
+    "Sophie", "Felix", "Emma", "Paul", "Mia", "Leon", "Hannah", "Jürgen",
+]
+CHART_TEXTS = [entry for _, _, entry in SAMPLE_CHART_ENTRIES] + [
+    "Füllung Zahn 26, Kompositrestauration",
+    "Extraktion Zahn 48, komplikationslos",
+    "Parodontitistherapie, Kürettage",
+    "Abformung für Krone Zahn 14",
+    "Schmerzbehandlung, Trepanation Zahn 46",
+    "Eingliederung Brücke 34-36",
+]
+SERVICE_CODES = ["01", "1040", "13b", "Ä935", "Ä1", "12", "25", "40", "105", "107"]
+
+DEFAULT_START_DATE = date(2022, 1, 18)  # Benchmark date
+
 # Canonical schema definition
 # This defines what tables and columns we expect in each center
 CANONICAL_SCHEMA = {
@@ -86,13 +147,13 @@ CANONICAL_SCHEMA = {
 }
 
 
-def generate_suffix() -> str:
+def generate_suffix(rng: random.Random = random) -> str:
     """Generate a random 2-4 character suffix."""
-    length = random.choice([2, 3, 4])
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    length = rng.choice([2, 3, 4])
+    return "".join(rng.choices(string.ascii_uppercase + string.digits, k=length))
 
 
-def generate_schema_mapping(center_id: str) -> dict:
+def generate_schema_mapping(center_id: str, rng: random.Random = random) -> dict:
     """
     Generate random suffixes for each table and column.
 
@@ -129,7 +190,7 @@ def generate_schema_mapping(center_id: str) -> dict:
         if use_clean_schema:
             actual_table_name = table_name
         else:
-            table_suffix = generate_suffix()
+            table_suffix = generate_suffix(rng)
             actual_table_name = f"{table_name}_{table_suffix}"
 
         column_mapping = {}
@@ -140,7 +201,7 @@ def generate_schema_mapping(center_id: str) -> dict:
             elif use_clean_schema:
                 column_mapping[col] = col
             else:
-                col_suffix = generate_suffix()
+                col_suffix = generate_suffix(rng)
                 column_mapping[col] = f"{col}_{col_suffix}"
 
         mapping["tables"][table_name] = {
@@ -151,25 +212,79 @@ def generate_schema_mapping(center_id: str) -> dict:
     return mapping
 
 
+@dataclass
+class DataOptions:
+    """Size and shape of synthetic data per center (scale mode)."""
+
+    patients: int
+    days: int = 1
+    entries_per_day: int = 100
+    start_date: date = DEFAULT_START_DATE
+    patient_skew: float = 1.0  # Zipf exponent; 0 = uniform
+    insurances: int = 10
+    private_share: float = 0.1  # Share of patients with private insurance (ART 'P')
+    services_per_entry: float = 1.5
+    deleted_rate: float = 0.02
+
+
+def center_seed(seed: int, center_id: str) -> int:
+    """Per-center seed, independent of build order."""
+    return int.from_bytes(hashlib.sha256(f"{seed}:{center_id}".encode()).digest()[:8], "big")
+
+
 def save_ground_truth(mapping: dict, output_dir: Path) -> None:
     """Save ground truth mapping (what was actually generated)."""
     output_dir.mkdir(parents=True, exist_ok=True)
     filepath = output_dir / f"{mapping['center_id']}_ground_truth.json"
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, indent=2, ensure_ascii=False)
-    logger.info(f"  Saved ground truth to {filepath.name}")
+        json.dump(mapping, f, indent=2, ensure_ascii=False, default=str)
+    logger.debug(f"  Saved ground truth to {filepath.name}")
 
 
-def load_centers():
+def load_centers(config_path: Path):
     """Load center configuration."""
-    config_path = Path(__file__).parent.parent / "config" / "centers.yml"
     with open(config_path) as f:
         data = yaml.safe_load(f)
     return data["database"], data["centers"]
 
 
+def fleet_centers(configured: list[dict], count: int) -> list[dict]:
+    """The first `count` centers: configured ones, then generated ones."""
+    centers = list(configured[:count])
+    cities = [c["city"] for c in configured] or ["Teststadt"]
+    for i in range(len(centers) + 1, count + 1):
+        centers.append(
+            {
+                "id": f"center_{i:02d}",
+                "name": f"Testpraxis {i}",
+                "database": f"DentalDB_{i:02d}",
+                "city": cities[(i - 1) % len(cities)],
+            }
+        )
+    return centers
+
+
+def write_fleet_config(path: Path, db_config: dict, centers: list[dict]) -> None:
+    """Centers config for the generated fleet (same format as centers.yml)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Generated by scripts/generate_test_dbs.py\n")
+        yaml.safe_dump(
+            {"database": db_config, "centers": centers},
+            f,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+
+def is_sqlite(db_config: dict) -> bool:
+    return db_config.get("backend") == "sqlite"
+
+
 def get_master_connection(db_config):
     """Get connection to master database."""
+    import pyodbc
+
     conn_str = (
         f"DRIVER={{{db_config['driver']}}};"
         f"SERVER={db_config['host']},{db_config['port']};"
@@ -182,7 +297,15 @@ def get_master_connection(db_config):
 
 
 def get_db_connection(db_config, database):
-    """Get connection to specific database."""
+    """Get connection to specific database (created if missing on SQLite)."""
+    if is_sqlite(db_config):
+        config = database_config(db_config)
+        conn = config.dialect.connect(config.connection_string(database), create=True)
+        conn.execute("PRAGMA ck.synchronous = OFF")  # Throwaway test data
+        return conn
+
+    import pyodbc
+
     conn_str = (
         f"DRIVER={{{db_config['driver']}}};"
         f"SERVER={db_config['host']},{db_config['port']};"
@@ -209,19 +332,36 @@ def create_database(conn, db_name):
 
     logger.info(f"  Creating database {db_name}...")
     cursor.execute(f"CREATE DATABASE [{db_name}]")
+    # Bulk loads without full transaction logging
+    cursor.execute(f"ALTER DATABASE [{db_name}] SET RECOVERY SIMPLE")
     cursor.close()
 
 
+def create_sqlite_database(db_config, db_name):
+    """Replace a center's SQLite file with an empty one."""
+    config = database_config(db_config)
+    path = Path(config.connection_string(db_name))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        logger.info(f"  Database {db_name} already exists, replacing...")
+        path.unlink()
+
+
 def create_schema_and_tables(db_config, database, mapping: dict):
     """Create schema and tables with randomized names from mapping."""
     conn = get_db_connection(db_config, database)
     cursor = conn.cursor()
 
-    # Create ck schema
-    cursor.execute("""
-        IF NOT EXISTS (SELECT * FROM sys.schemas WHERE name = 'ck')
-        EXEC('CREATE SCHEMA ck')
-    """)
+    if is_sqlite(db_config):
+        # The file is attached as schema ck; INTEGER PRIMARY KEY auto-numbers
+        identity = "INTEGER PRIMARY KEY"
+    else:
+        identity = "INT IDENTITY PRIMARY KEY"
+        # Create ck schema
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.schemas WHERE name = 'ck')
+            EXEC('CREATE SCHEMA ck')
+        """)
 
     tables = mapping["tables"]
 
@@ -251,7 +391,7 @@ def create_schema_and_tables(db_config, database, mapping: dict):
     t = tables["PATKASSE"]
     cursor.execute(f"""
         CREATE TABLE ck.{t['actual_name']} (
-            {t['columns']['ID']} INT IDENTITY PRIMARY KEY,
+            {t['columns']['ID']} {identity},
             {t['columns']['PATNR']} INT,
             {t['columns']['KASSENID']} INT,
             {t['columns']['DELKZ']} INT DEFAULT 0
@@ -262,7 +402,7 @@ def create_schema_and_tables(db_config, database, mapping: dict):
     t = tables["KARTEI"]
     cursor.execute(f"""
         CREATE TABLE ck.{t['actual_name']} (
-            {t['columns']['ID']} INT IDENTITY PRIMARY KEY,
+            {t['columns']['ID']} {identity},
             {t['columns']['PATNR']} INT,
             {t['columns']['DATUM']} INT,
             {t['columns']['BEMERKUNG']} NVARCHAR(500),
@@ -274,7 +414,7 @@ def create_schema_and_tables(db_config, database, mapping: dict):
     t = tables["LEISTUNG"]
     cursor.execute(f"""
         CREATE TABLE ck.{t['actual_name']} (
-            {t['columns']['ID']} INT IDENTITY PRIMARY KEY,
+            {t['columns']['ID']} {identity},
             {t['columns']['PATIENTID']} INT,
             {t['columns']['DATUM']} INT,
             {t['columns']['LEISTUNG']} VARCHAR(20),
@@ -283,132 +423,304 @@ def create_schema_and_tables(db_config, database, mapping: dict):
     """)
 
     cursor.close()
+    conn.commit()
     conn.close()
 
 
-def populate_data(db_config, database, mapping: dict):
-    """Populate tables with sample data using mapping."""
-    conn = get_db_connection(db_config, database)
-    cursor = conn.cursor()
+def sample_rows() -> dict[str, tuple[list[str], list[tuple]]]:
+    """The fixed sample data set: table -> (canonical columns, rows)."""
+    return {
+        "PATIENT": (["ID", "P_NAME", "P_VORNAME"], list(SAMPLE_PATIENTS)),
+        "KASSEN": (["ID", "NAME", "ART"], list(SAMPLE_INSURANCE)),
+        # Patient ID = insurance ID for simplicity
+        "PATKASSE": (["PATNR", "KASSENID"], [(id, id) for id, _, _ in SAMPLE_PATIENTS]),
+        "KARTEI": (["PATNR", "DATUM", "BEMERKUNG"], list(SAMPLE_CHART_ENTRIES)),
+        "LEISTUNG": (["PATIENTID", "DATUM", "LEISTUNG"], list(SAMPLE_SERVICES)),
+    }
 
-    tables = mapping["tables"]
 
-    # Insert patients
-    t = tables["PATIENT"]
-    for id, name, vorname in SAMPLE_PATIENTS:
-        cursor.execute(
-            f"INSERT INTO ck.{t['actual_name']} "
-            f"({t['columns']['ID']}, {t['columns']['P_NAME']}, {t['columns']['P_VORNAME']}) "
-            f"VALUES (?, ?, ?)",
-            (id, name, vorname),
-        )
+def synthetic_rows(rng: random.Random, options: DataOptions) -> dict[str, tuple[list[str], list[tuple]]]:
+    """Synthetic data set for one center: table -> (canonical columns, rows)."""
+    deleted = options.deleted_rate
+    patient_ids = list(range(1, options.patients + 1))
 
-    # Insert insurance providers
-    t = tables["KASSEN"]
-    for id, name, art in SAMPLE_INSURANCE:
-        cursor.execute(
-            f"INSERT INTO ck.{t['actual_name']} "
-            f"({t['columns']['ID']}, {t['columns']['NAME']}, {t['columns']['ART']}) "
-            f"VALUES (?, ?, ?)",
-            (id, name, art),
-        )
+    patients = [
+        (pid, rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES), int(rng.random() < deleted))
+        for pid in patient_ids
+    ]
 
-    # Link patients to insurance (patient ID = insurance ID for simplicity)
-    t = tables["PATKASSE"]
-    for id, _, _ in SAMPLE_PATIENTS:
-        cursor.execute(
-            f"INSERT INTO ck.{t['actual_name']} "
-            f"({t['columns']['PATNR']}, {t['columns']['KASSENID']}) "
-            f"VALUES (?, ?)",
-            (id, id),
-        )
+    # Insurers: at least one private ('P') and one statutory if there are two or more
+    insurers = []
+    for i in range(1, options.insurances + 1):
+        if i <= len(SAMPLE_INSURANCE):
+            _, name, art = SAMPLE_INSURANCE[i - 1]
+        else:
+            name, art = f"BKK Test {i}", rng.choice(["4", "8"])
+        insurers.append((i, name, art))
+    private = [i for i, _, art in insurers if art == "P"] or [insurers[-1][0]]
+    statutory = [i for i, _, art in insurers if art != "P"] or private
+
+    # One active insurance per patient (the extraction joins PATKASSE unfiltered)
+    patkasse = [
+        (pid, rng.choice(private if rng.random() < options.private_share else statutory), 0)
+        for pid in patient_ids
+    ]
+
+    # Zipf-distributed patients: weight 1 / rank^s
+    cum_weights = list(accumulate(1 / rank**options.patient_skew for rank in patient_ids))
+
+    kartei = []
+    leistung = []
+    whole = int(options.services_per_entry)
+    fraction = options.services_per_entry - whole
+    for day in range(options.days):
+        datum = int((options.start_date + timedelta(days=day)).strftime("%Y%m%d"))
+        for pid in rng.choices(patient_ids, cum_weights=cum_weights, k=options.entries_per_day):
+            kartei.append((pid, datum, rng.choice(CHART_TEXTS), int(rng.random() < deleted)))
+            for _ in range(whole + (rng.random() < fraction)):
+                leistung.append((pid, datum, rng.choice(SERVICE_CODES), int(rng.random() < deleted)))
+
+    return {
+        "PATIENT": (["ID", "P_NAME", "P_VORNAME", "DELKZ"], patients),
+        "KASSEN": (["ID", "NAME", "ART", "DELKZ"], [(i, n, a, 0) for i, n, a in insurers]),
+        "PATKASSE": (["PATNR", "KASSENID", "DELKZ"], patkasse),
+        "KARTEI": (["PATNR", "DATUM", "BEMERKUNG", "DELKZ"], kartei),
+        "LEISTUNG": (["PATIENTID", "DATUM", "LEISTUNG", "DELKZ"], leistung),
+    }
 
-    # Insert chart entries
-    t = tables["KARTEI"]
-    for patient_id, datum, entry in SAMPLE_CHART_ENTRIES:
-        cursor.execute(
-            f"INSERT INTO ck.{t['actual_name']} "
-            f"({t['columns']['PATNR']}, {t['columns']['DATUM']}, {t['columns']['BEMERKUNG']}) "
-            f"VALUES (?, ?, ?)",
-            (patient_id, datum, entry),
-        )
 
-    # Insert services
-    t = tables["LEISTUNG"]
-    for patient_id, datum, code in SAMPLE_SERVICES:
-        cursor.execute(
-            f"INSERT INTO ck.{t['actual_name']} "
-            f"({t['columns']['PATIENTID']}, {t['columns']['DATUM']}, {t['columns']['LEISTUNG']}) "
-            f"VALUES (?, ?, ?)",
-            (patient_id, datum, code),
-        )
+def bulk_insert(cursor, table: str, columns: list[str], rows: list[tuple], batch_size: int) -> None:
+    """Insert rows in batches (pyodbc: array binding with fast_executemany)."""
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO ck.{table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if hasattr(cursor, "fast_executemany"):
+        cursor.fast_executemany = True
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[start:start + batch_size])
 
-    cursor.close()
-    conn.close()
 
+def populate_data(db_config, database, mapping: dict, data: dict, batch_size: int = 10_000):
+    """Bulk load canonical rows into the tables named by the mapping."""
+    conn = get_db_connection(db_config, database)
+    cursor = conn.cursor()
 
-def main():
-    logger.info("=" * 60)
-    logger.info("Multi-Center Test Database Generator")
-    logger.info("With RANDOM Schema Variations")
-    logger.info("=" * 60)
+    for canonical, (columns, rows) in data.items():
+        t = mapping["tables"][canonical]
+        actual_columns = [t["columns"][col] for col in columns]
+        bulk_insert(cursor, t["actual_name"], actual_columns, rows, batch_size)
 
-    db_config, centers = load_centers()
-    ground_truth_dir = Path(__file__).parent.parent / "data" / "ground_truth"
+    cursor.close()
+    conn.commit()  # SQLite loads everything in one transaction
+    conn.close()
 
-    logger.info(f"\nConnecting to SQL Server at {db_config['host']}:{db_config['port']}...")
 
-    try:
-        master_conn = get_master_connection(db_config)
-    except Exception as e:
-        logger.error(f"Failed to connect: {e}")
-        logger.info("\nMake sure SQL Server is running:")
-        logger.info("  docker-compose up -d")
-        return 1
+def create_date_indexes(db_config, database, mapping: dict):
+    """Index the DATUM columns the extraction filters on (scale mode)."""
+    conn = get_db_connection(db_config, database)
+    cursor = conn.cursor()
+    for canonical in ("KARTEI", "LEISTUNG"):
+        t = mapping["tables"][canonical]
+        if is_sqlite(db_config):
+            # SQLite qualifies the index, not the table
+            cursor.execute(
+                f"CREATE INDEX ck.IX_{t['actual_name']}_DATUM "
+                f"ON {t['actual_name']} ({t['columns']['DATUM']})"
+            )
+        else:
+            cursor.execute(
+                f"CREATE INDEX IX_{t['actual_name']}_DATUM "
+                f"ON ck.{t['actual_name']} ({t['columns']['DATUM']})"
+            )
+    cursor.close()
+    conn.commit()
+    conn.close()
 
-    logger.info("Connected!\n")
 
-    for center in centers:
-        # Skip center_01 - it has the real challenge database
-        if center["id"] == "center_01":
-            logger.info(f"Skipping {center['name']} ({center['database']}) - using real challenge database")
-            continue
+def build_center(center: dict, db_config: dict, options: DataOptions | None, seed: int,
+                 ground_truth_dir: Path, batch_size: int) -> dict[str, int]:
+    """Create, fill and record one center; returns row counts per table."""
+    cseed = center_seed(seed, center["id"])
+    rng = random.Random(cseed)
 
-        logger.info(f"Creating {center['name']} ({center['database']})...")
+    # Generate random schema mapping for this center
+    mapping = generate_schema_mapping(center["id"], rng)
+    data = sample_rows() if options is None else synthetic_rows(rng, options)
 
+    # Create database (own master connection per worker)
+    if is_sqlite(db_config):
+        create_sqlite_database(db_config, center["database"])
+    else:
+        master_conn = get_master_connection(db_config)
         try:
-            # Generate random schema mapping for this center
-            mapping = generate_schema_mapping(center["id"])
-
-            # Create database
             create_database(master_conn, center["database"])
+        finally:
+            master_conn.close()
+
+    # Create schema and tables with random names, then load
+    create_schema_and_tables(db_config, center["database"], mapping)
+    populate_data(db_config, center["database"], mapping, data, batch_size)
+    if options is not None:
+        create_date_indexes(db_config, center["database"], mapping)
+
+    # Save ground truth (what was actually generated) with its seeds
+    mapping["generator"] = {
+        "seed": seed,
+        "center_seed": cseed,
+        "options": asdict(options) if options else "sample",
+    }
+    save_ground_truth(mapping, ground_truth_dir)
+
+    return {table: len(rows) for table, (_, rows) in data.items()}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate test databases with random schemas")
+    parser.add_argument("--config", type=Path, default=ROOT / "config" / "centers.yml",
+                        help="Centers config (database connection and configured centers)")
+    parser.add_argument("--centers", type=int,
+                        help="Number of centers (default: all configured); extra ones are generated")
+    parser.add_argument("--config-out", type=Path, default=ROOT / "config" / "centers_fleet.yml",
+                        help="Where to write the config when --centers exceeds the configured ones")
+    parser.add_argument("--backend", choices=sorted(DIALECTS),
+                        help="Database backend (default: the config's, usually sqlserver)")
+    parser.add_argument("--sqlite-dir", default=DEFAULT_SQLITE_DIR,
+                        help=f"Directory of the SQLite files (default: {DEFAULT_SQLITE_DIR})")
+    parser.add_argument("--seed", type=int, default=42, help="Master seed (default: 42)")
+    parser.add_argument("--workers", "-w", type=int, default=4,
+                        help="Databases built in parallel (default: 4)")
+    parser.add_argument("--batch-size", type=int, default=10_000,
+                        help="Rows per executemany batch (default: 10000)")
+
+    scale = parser.add_argument_group("scale mode (synthetic data, enabled by --patients)")
+    scale.add_argument("--patients", type=int, help="Patients per center")
+    scale.add_argument("--days", type=int, default=1, help="Days of chart entries (default: 1)")
+    scale.add_argument("--entries-per-day", type=int, default=100,
+                       help="Chart entries per center and day (default: 100)")
+    scale.add_argument("--start-date", type=date.fromisoformat, default=DEFAULT_START_DATE,
+                       help=f"First day (default: {DEFAULT_START_DATE})")
+    scale.add_argument("--patient-skew", type=float, default=1.0,
+                       help="Zipf exponent for entries per patient, 0 = uniform (default: 1.0)")
+    scale.add_argument("--insurances", type=int, default=10,
+                       help="Insurance providers per center (default: 10)")
+    scale.add_argument("--private-share", type=float, default=0.1,
+                       help="Share of privately insured patients (default: 0.1)")
+    scale.add_argument("--services-per-entry", type=float, default=1.5,
+                       help="Mean service codes per chart entry (default: 1.5)")
+    scale.add_argument("--deleted-rate", type=float, default=0.02,
+                       help="Share of soft-deleted (DELKZ=1) rows (default: 0.02)")
+    return parser.parse_args()
+
 
-            # Create schema and tables with random names
-            create_schema_and_tables(db_config, center["database"], mapping)
+def main():
+    args = parse_args()
+
+    logger.info("=" * 60)
+    logger.info("Multi-Center Test Database Generator")
+    logger.info("With RANDOM Schema Variations")
+    logger.info("=" * 60)
 
-            # Populate data
-            populate_data(db_config, center["database"], mapping)
+    db_config, configured = load_centers(args.config)
+    centers = fleet_centers(configured, args.centers or len(configured))
+    backend = db_config.get("backend", "sqlserver")
+    backend_changed = args.backend is not None and args.backend != backend
+    if args.backend == "sqlite":
+        db_config = {"backend": "sqlite", "path": args.sqlite_dir}
+    ground_truth_dir = ROOT / "data" / "ground_truth"
+
+    options = None
+    if args.patients:
+        options = DataOptions(
+            patients=args.patients,
+            days=args.days,
+            entries_per_day=args.entries_per_day,
+            start_date=args.start_date,
+            patient_skew=args.patient_skew,
+            insurances=args.insurances,
+            private_share=args.private_share,
+            services_per_entry=args.services_per_entry,
+            deleted_rate=args.deleted_rate,
+        )
 
-            # Save ground truth (what was actually generated)
-            save_ground_truth(mapping, ground_truth_dir)
+    if is_sqlite(db_config):
+        config = database_config(db_config)
+        logger.info(f"\nWriting SQLite databases to {config.dialect.directory(config)}\n")
+        to_build = centers
+    else:
+        logger.info(f"\nConnecting to SQL Server at {db_config['host']}:{db_config['port']}...")
 
-            logger.info(f"  Done\n")
+        try:
+            get_master_connection(db_config).close()
         except Exception as e:
-            logger.error(f"  Error: {e}\n")
+            logger.error(f"Failed to connect: {e}")
+            logger.info("\nMake sure SQL Server is running:")
+            logger.info("  docker-compose up -d")
             return 1
 
-    master_conn.close()
+        logger.info("Connected!\n")
+
+        # Skip center_01 - it has the real challenge database
+        to_build = [c for c in centers if c["id"] != "center_01"]
+    if len(to_build) < len(centers):
+        logger.info("Skipping center_01 - using real challenge database")
+    logger.info(
+        f"Building {len(to_build)} databases with {args.workers} workers "
+        f"({'synthetic' if options else 'sample'} data, seed {args.seed})...\n"
+    )
+
+    start = time.perf_counter()
+    totals: dict[str, int] = {}
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(
+                build_center, center, db_config, options, args.seed, ground_truth_dir, args.batch_size
+            ): center
+            for center in to_build
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            center = futures[future]
+            try:
+                counts = future.result()
+            except Exception as e:
+                logger.error(f"  [err] {center['id']} ({center['database']}): {e}")
+                failed.append(center["id"])
+                continue
+            for table, n in counts.items():
+                totals[table] = totals.get(table, 0) + n
+            logger.info(
+                f"  [{done}/{len(to_build)}] {center['id']} ({center['database']}): "
+                f"{counts['KARTEI']} chart entries, {counts['LEISTUNG']} services"
+            )
+
+    elapsed = time.perf_counter() - start
+
+    if len(centers) > len(configured) or backend_changed:
+        write_fleet_config(args.config_out, db_config, centers)
+        logger.info(f"\nFleet config: {args.config_out}")
+        logger.info(f"  Use with: IVORIS_CONFIG={args.config_out} python -m src.cli ...")
+
+    manifest = {
+        "backend": db_config.get("backend", "sqlserver"),
+        "seed": args.seed,
+        "centers": [c["id"] for c in to_build],
+        "failed": failed,
+        "options": asdict(options) if options else "sample",
+        "rows": totals,
+        "duration_s": round(elapsed, 1),
+    }
+    ground_truth_dir.mkdir(parents=True, exist_ok=True)
+    with open(ground_truth_dir / "generator_manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
 
     logger.info("=" * 60)
-    logger.info(f"Created {len(centers)} test databases")
+    logger.info(f"Created {len(to_build) - len(failed)} test databases in {elapsed:.1f}s")
     logger.info(f"Ground truth saved to: {ground_truth_dir}")
     logger.info("=" * 60)
 
-    logger.info("\nSample data per database:")
-    logger.info(f"  - {len(SAMPLE_PATIENTS)} patients")
-    logger.info(f"  - {len(SAMPLE_INSURANCE)} insurance providers")
-    logger.info(f"  - {len(SAMPLE_CHART_ENTRIES)} chart entries")
-    logger.info(f"  - {len(SAMPLE_SERVICES)} service codes")
+    logger.info("\nRows loaded:")
+    for table, n in totals.items():
+        logger.info(f"  - {table}: {n:,}")
 
     logger.info("\nSchema variations:")
     logger.info("  - Each table has a RANDOM suffix (e.g., KARTEI_X7K)")
@@ -417,10 +729,10 @@ def main():
 
     logger.info("\nNext steps:")
     logger.info("  1. python -m src.cli discover-raw   # See raw schema")
-    logger.info("  2. python -m src.cli map-schema     # Agentic mapping")
+    logger.info("  2. python -m src.cli generate-mappings")
     logger.info("  3. python -m src.cli extract        # Extract data")
 
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
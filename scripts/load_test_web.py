@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load test: is the web UI responsive while extractions run?
+
+Simulates several users triggering /api/extract at the same time and,
+meanwhile, polls cheap endpoints (the explore page and /api/centers)
+the way a browser would. Reports probe latency percentiles and the
+server's queueing metrics from /api/executor.
+
+With blocking endpoints running on the event loop, probe latency
+tracks the slowest extraction. With the bounded executor it should
+stay in the low milliseconds.
+
+Usage:
+    python -m src.cli web &
+    python scripts/load_test_web.py --users 6 --rounds 3
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PROBE_PATHS = ["/explore", "/api/centers"]
+
+
+def fetch(url: str, timeout: float) -> tuple[int, float]:
+    """Return (status, latency ms)."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web UI responsiveness under extraction load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", "-u", type=int, default=6, help="Concurrent extraction users")
+    parser.add_argument("--rounds", "-r", type=int, default=3, help="Extractions per user")
+    parser.add_argument("--date", default="2022-01-18")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between probes")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    extract_url = f"{base}/api/extract?date={args.date}"
+
+    # Baseline probe latency with no load
+    idle = [fetch(base + path, args.timeout)[1] for path in PROBE_PATHS for _ in range(5)]
+
+    stop = threading.Event()
+    probes: list[float] = []
+    probe_errors = 0
+
+    def probe_loop():
+        nonlocal probe_errors
+        i = 0
+        while not stop.is_set():
+            status, ms = fetch(base + PROBE_PATHS[i % len(PROBE_PATHS)], args.timeout)
+            if status == 200:
+                probes.append(ms)
+            else:
+                probe_errors += 1
+            i += 1
+            stop.wait(args.probe_interval)
+
+    def user(_):
+        results = []
+        for _ in range(args.rounds):
+            results.append(fetch(extract_url, args.timeout))
+        return results
+
+    prober = threading.Thread(target=probe_loop, daemon=True)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        extractions = [r for rs in pool.map(user, range(args.users)) for r in rs]
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    ok = [ms for status, ms in extractions if status == 200]
+    rejected = sum(1 for status, _ in extractions if status == 503)
+
+    print(f"\n{'='*60}")
+    print(f"WEB LOAD TEST ({args.users} users x {args.rounds} extractions)")
+    print(f"{'='*60}")
+    print(f"Wall time:            {elapsed:.1f}s")
+    print(f"Extractions:          {len(ok)} ok, {rejected} rejected (503), "
+          f"{len(extractions) - len(ok) - rejected} failed")
+    if ok:
+        print(f"Extraction latency:   p50 {percentile(ok, 50):.0f}ms  "
+              f"p95 {percentile(ok, 95):.0f}ms  max {max(ok):.0f}ms")
+    print(f"Probe latency idle:   p50 {statistics.median(idle):.1f}ms")
+    if probes:
+        print(f"Probe latency load:   p50 {percentile(probes, 50):.1f}ms  "
+              f"p95 {percentile(probes, 95):.1f}ms  max {max(probes):.1f}ms  "
+              f"({len(probes)} probes, {probe_errors} errors)")
+
+    try:
+        with urllib.request.urlopen(f"{base}/api/executor", timeout=10) as response:
+            stats = json.load(response)["endpoints"]
+        print(f"\n{'Endpoint':12} {'done':>6} {'rejected':>9} {'avg wait':>10} {'max wait':>10}")
+        for name, s in stats.items():
+            print(f"{name:12} {s['completed']:6} {s['rejected']:9} "
+                  f"{s['avg_wait_ms']:8.0f}ms {s['max_wait_ms']:8.0f}ms")
+    except urllib.error.URLError:
+        pass
+    print(f"{'='*60}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,24 @@ Extracts data from a specific dental center using discovered schema.
 """
 
 import logging
+import time
+from contextlib import contextmanager
 from datetime import date
-
-import pyodbc
+from typing import Any, Iterator
 
 from ..core.config import CenterConfig, DatabaseConfig
+from ..core.discovery import (
+    DiscoveredSchema,
+    SchemaDriftError,
+    diff_mapping,
+    fetch_fingerprint,
+    group_catalog_rows,
+)
 from ..core.introspector import get_schema
+from ..core.pool import ConnectionPool
+from ..core.queries import CHART_ENTRIES, SERVICES, get_query
 from ..core.schema_mapping import SchemaMapping
-from ..models.chart_entry import ChartEntry
+from ..models.chart_entry import ChartEntryBatch
 
 logger = logging.getLogger(__name__)
 
@@ -25,138 +35,149 @@ class CenterAdapter:
         center: CenterConfig,
         db_config: DatabaseConfig,
         schema: SchemaMapping,
+        pool: ConnectionPool | None = None,
     ):
         self.center = center
         self.db_config = db_config
         self.schema = schema
-        self._connection: pyodbc.Connection | None = None
+        self.pool = pool
+        self.dialect = db_config.dialect
+        self._connection: Any | None = None
+        self.timings: dict[str, float] = {}  # Phase -> ms, accumulated
+        self.spans: list[tuple[str, float, float]] = []  # (phase, start, end) perf_counter
+
+    @contextmanager
+    def _timed(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((phase, start, end))
+            self.timings[phase] = self.timings.get(phase, 0.0) + (end - start) * 1000
 
     @property
     def connection_string(self) -> str:
         return self.db_config.connection_string(self.center.database)
 
     def connect(self) -> None:
-        """Establish database connection."""
+        """Establish database connection (borrowed from the pool if any)."""
         if self._connection is None:
             logger.debug(f"Connecting to {self.center.database}")
-            self._connection = pyodbc.connect(self.connection_string)
-
-    def disconnect(self) -> None:
-        """Close database connection."""
+            with self._timed("connect"):
+                if self.pool is not None:
+                    self._connection = self.pool.acquire(self.center.database)
+                else:
+                    self._connection = self.dialect.connect(self.connection_string)
+
+    def disconnect(self, discard: bool = False) -> None:
+        """Close database connection, or return it to the pool."""
         if self._connection:
-            self._connection.close()
+            if self.pool is not None:
+                self.pool.release(self.center.database, self._connection, discard=discard)
+            else:
+                self._connection.close()
             self._connection = None
 
-    def _query(self, sql: str, params: tuple = ()) -> list[dict]:
-        """Execute query and return results."""
+    def _query(
+        self, sql: str, params: tuple = (), phases: tuple[str, str] = ("execute", "fetch")
+    ) -> list[dict]:
+        """Execute query and return results, timed as (execute, fetch) phases."""
         self.connect()
-        cursor = self._connection.cursor()
-        cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        rows = cursor.fetchall()
-        cursor.close()
-        return [dict(zip(columns, row)) for row in rows]
-
-    def extract_chart_entries(self, target_date: date) -> list[ChartEntry]:
-        """Extract chart entries for a specific date."""
+        execute_phase, fetch_phase = phases
+        with self._timed(execute_phase):
+            cursor = self._connection.cursor()
+            cursor.execute(sql, params)
+        with self._timed(fetch_phase):
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+            cursor.close()
+            return [dict(zip(columns, row)) for row in rows]
+
+    def check_schema(self) -> None:
+        """
+        Fail fast if the live schema drifted away from the mapping.
+
+        Compares the live schema fingerprint with the one stored in
+        the mapping (one cheap query). Only on mismatch is the schema
+        rediscovered to report which mapped tables/columns changed; a
+        fingerprint that changed nothing mapped is remembered on the
+        mapping, so the rediscovery runs once per mapping load.
+        """
+        expected = self.schema.fingerprint
+        if not expected:
+            return  # Mapping predates fingerprints
+
+        self.connect()
+        with self._timed("schema_check"):
+            live = fetch_fingerprint(self._connection, self.schema.schema, self.dialect)
+            if live == expected or live in self.schema.compatible_fingerprints:
+                return
+
+            database, rows = self.dialect.read_catalog(self._connection, self.schema.schema)
+            discovered = DiscoveredSchema(
+                database=database, tables=group_catalog_rows(rows, self.schema.schema)
+            )
+        diff = diff_mapping(self.schema, discovered)
+        if diff:
+            raise SchemaDriftError(self.center.id, diff)
+
+        self.schema.compatible_fingerprints.add(live)
+        logger.warning(
+            f"{self.center.name}: schema changed outside mapped columns, "
+            f"run 'generate-mappings --incremental' to update the mapping's fingerprint"
+        )
+
+    def extract_chart_entries(self, target_date: date) -> ChartEntryBatch:
+        """Extract chart entries for a specific date into a columnar batch."""
         ivoris_date = int(target_date.strftime("%Y%m%d"))
 
-        # Build query using schema mapping
-        s = self.schema
+        self.check_schema()
 
-        # Get actual column names
-        k_patnr = s.get_column("KARTEI", "PATNR")
-        k_datum = s.get_column("KARTEI", "DATUM")
-        k_bemerkung = s.get_column("KARTEI", "BEMERKUNG")
-        k_delkz = s.get_column("KARTEI", "DELKZ")
-        
-        pk_patnr = s.get_column("PATKASSE", "PATNR")
-        pk_kassenid = s.get_column("PATKASSE", "KASSENID")
-        
-        ka_id = s.get_column("KASSEN", "ID")
-        ka_name = s.get_column("KASSEN", "NAME")
-        ka_art = s.get_column("KASSEN", "ART")
-
-        # Get actual table names
-        t_kartei = s.get_table("KARTEI")
-        t_patient = s.get_table("PATIENT")
-        t_patkasse = s.get_table("PATKASSE")
-        t_kassen = s.get_table("KASSEN")
-
-        query = f"""
-            SELECT
-                k.ID as KARTEI_ID,
-                k.{k_patnr} as PATNR,
-                k.{k_datum} as DATUM,
-                k.{k_bemerkung} as BEMERKUNG,
-                ka.{ka_name} as KASSE_NAME,
-                ka.{ka_art} as KASSE_ART
-            FROM ck.{t_kartei} k
-            LEFT JOIN ck.{t_patient} p ON k.{k_patnr} = p.ID
-            LEFT JOIN ck.{t_patkasse} pk ON k.{k_patnr} = pk.{pk_patnr}
-            LEFT JOIN ck.{t_kassen} ka ON pk.{pk_kassenid} = ka.{ka_id}
-            WHERE k.{k_datum} = ?
-            AND (k.{k_delkz} = 0 OR k.{k_delkz} IS NULL)
-            ORDER BY k.{k_patnr}, k.ID
-        """
+        query = get_query(self.schema, CHART_ENTRIES)
 
         logger.debug(f"Extracting from {self.center.name} for {target_date}")
         rows = self._query(query, (ivoris_date,))
         logger.info(f"{self.center.name}: {len(rows)} entries")
 
+        batch = ChartEntryBatch(self.center.id, self.center.name, target_date)
         if not rows:
-            return []
+            return batch
 
-        # Get service codes
         services = self._get_services(target_date)
 
-        # Build ChartEntry objects
-        entries = []
-        for row in rows:
-            patient_id = row.get("PATNR")
-            entry = ChartEntry(
-                center_id=self.center.id,
-                center_name=self.center.name,
-                date=target_date,
-                patient_id=patient_id,
-                insurance_status=self._map_insurance(row.get("KASSE_ART")),
-                insurance_name=row.get("KASSE_NAME"),
-                chart_entry=row.get("BEMERKUNG") or "",
-                service_codes=services.get(patient_id, []),
-            )
-            entries.append(entry)
+        # Register service codes once per patient, then fill the columns
+        with self._timed("transform"):
+            for patient_id, codes in services.items():
+                batch.add_services(patient_id, codes)
+
+            for row in rows:
+                batch.append(
+                    patient_id=row.get("PATNR"),
+                    insurance_status=self._map_insurance(row.get("KASSE_ART")),
+                    insurance_name=row.get("KASSE_NAME"),
+                    chart_entry=row.get("BEMERKUNG") or "",
+                )
 
-        return entries
+        return batch
 
     def _get_services(self, target_date: date) -> dict[int, list[str]]:
         """Get service codes grouped by patient."""
         ivoris_date = int(target_date.strftime("%Y%m%d"))
-        s = self.schema
-
-        t_leistung = s.get_table("LEISTUNG")
-        l_patientid = s.get_column("LEISTUNG", "PATIENTID")
-        l_datum = s.get_column("LEISTUNG", "DATUM")
-        l_leistung = s.get_column("LEISTUNG", "LEISTUNG")
-        l_delkz = s.get_column("LEISTUNG", "DELKZ")
-
-        query = f"""
-            SELECT {l_patientid} as PATIENTID, {l_leistung} as LEISTUNG
-            FROM ck.{t_leistung}
-            WHERE {l_datum} = ?
-            AND ({l_delkz} = 0 OR {l_delkz} IS NULL)
-        """
+        query = get_query(self.schema, SERVICES)
 
-        rows = self._query(query, (ivoris_date,))
+        rows = self._query(query, (ivoris_date,), phases=("services", "services"))
 
         services: dict[int, list[str]] = {}
-        for row in rows:
-            pid = row.get("PATIENTID")
-            code = row.get("LEISTUNG")
-            if pid and code:
-                if pid not in services:
-                    services[pid] = []
-                if code not in services[pid]:
-                    services[pid].append(code)
+        with self._timed("services"):
+            for row in rows:
+                pid = row.get("PATIENTID")
+                code = row.get("LEISTUNG")
+                if pid and code:
+                    if pid not in services:
+                        services[pid] = []
+                    if code not in services[pid]:
+                        services[pid].append(code)
 
         return services
 
@@ -173,15 +194,18 @@ class CenterAdapter:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.disconnect()
+        # A connection that failed mid-query is not returned to the pool
+        failed = exc_type is not None and issubclass(exc_type, self.dialect.Error)
+        self.disconnect(discard=failed)
         return False
 
 
 class AdapterFactory:
     """Factory for creating center adapters."""
 
-    def __init__(self, db_config: DatabaseConfig):
+    def __init__(self, db_config: DatabaseConfig, pool: ConnectionPool | None = None):
         self.db_config = db_config
+        self.pool = pool
 
     def create(self, center: CenterConfig) -> CenterAdapter:
         """Create an adapter for a center with auto-discovered schema."""
@@ -192,4 +216,5 @@ class AdapterFactory:
             center=center,
             db_config=self.db_config,
             schema=schema,
+            pool=self.pool,
         )
@@ -5,20 +5,28 @@ Workflow:
 1. generate_test_dbs.py    - Create databases with random schemas
 2. discover-raw            - View raw schema from database
 3. generate-mappings       - Create mapping files (for manual review)
+   compile-mappings        - Pack mappings + SQL into one bundle (optional)
+   evaluate-mappings       - Mapping accuracy against ground truth
 4. extract                 - Extract data using mappings
 5. benchmark               - Performance test
+   daemon                  - Scheduled extraction with catch-up (replaces cron)
 6. web                     - Start web UI
 """
 
 import argparse
+import json
 import logging
+import os
 import sys
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 from pathlib import Path
 
 from ..core.config import load_config
-from ..core.introspector import clear_cache, list_available_mappings
-from ..services.extraction import ExtractionService
+from ..core.introspector import list_available_mappings
+from ..core.tracing import TraceRecorder
+from ..services.benchmark import ALPHA, MODES, BenchmarkSuite, compare_reports
+from ..services.extraction import PHASES, ExtractionService
+from ..services.schema_diff import GOOD_ACCURACY, SchemaDiffEvaluator
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -29,9 +37,54 @@ MAPPINGS_DIR = DATA_DIR / "mappings"
 GROUND_TRUTH_DIR = DATA_DIR / "ground_truth"
 
 
+def print_timing_table(rows: list[tuple[bool, str, float, str]]) -> None:
+    """Print (ok, name, duration_ms, detail) rows, slowest first."""
+    print(f"\nPer-Center Timing:")
+    for ok, name, duration_ms, detail in sorted(rows, key=lambda r: r[2], reverse=True):
+        status = "ok" if ok else "err"
+        print(f"  [{status}] {name:30} {duration_ms:6.0f}ms  ({detail})")
+
+
+def apply_fault_profile(args, config) -> bool:
+    """Inject the --faults profile into all connections; False if unusable."""
+    if not getattr(args, "faults", None):
+        return True
+    from ..core.faults import FaultProfile
+
+    try:
+        config.database.faults = FaultProfile.load(Path(args.faults), config.centers)
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Invalid fault profile {args.faults}: {e}")
+        return False
+    logger.info(f"Injecting faults from {args.faults} (seed {config.database.faults.seed})")
+    return True
+
+
+def print_discovered(center, discovered) -> None:
+    """Print one center's raw discovery."""
+    print(f"\n{'='*60}")
+    print(f"Center: {center.name} ({center.id})")
+    print(f"Database: {discovered.database}")
+    print(f"{'='*60}")
+
+    for table in discovered.tables:
+        rows = f" ({table.row_count} rows)" if table.row_count is not None else ""
+        print(f"\nTABLE: {table.schema}.{table.name}{rows}")
+        for col in table.columns:
+            nullable = "NULL" if col.is_nullable else "NOT NULL"
+            extra = " PK" if col.is_primary_key else ""
+            if col.references:
+                extra += f" -> {col.references}"
+            print(f"  - {col.name} ({col.data_type}, {nullable}){extra}")
+
+
 def cmd_discover_raw(args, config):
     """Discover and display RAW schemas from databases."""
-    from ..core.discovery import SchemaDiscovery
+    import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from ..core.discovery import discover_cached
+    from ..core.profiling import propagate
 
     centers = config.centers
     if args.center:
@@ -40,26 +93,47 @@ def cmd_discover_raw(args, config):
             logger.error(f"Unknown center: {args.center}")
             return 1
 
-    for center in centers:
-        conn_str = config.database.connection_string(center.database)
-
-        try:
-            discovery = SchemaDiscovery(conn_str)
-            discovered = discovery.discover()
-
-            print(f"\n{'='*60}")
-            print(f"Center: {center.name} ({center.id})")
-            print(f"Database: {discovered.database}")
-            print(f"{'='*60}")
+    prefetched = {}
+    if args.server_wide:
+        from ..core.discovery import save_discovery
+        from ..services.mapping_generator import discover_server_wide
 
-            for table in discovered.tables:
-                print(f"\nTABLE: {table.schema}.{table.name}")
-                for col in table.columns:
-                    nullable = "NULL" if col.is_nullable else "NOT NULL"
-                    print(f"  - {col.name} ({col.data_type}, {nullable})")
+        prefetched = discover_server_wide(
+            config, centers, include_keys=args.keys, include_row_counts=args.row_counts
+        )
+        for center in centers:
+            if center.database in prefetched:
+                save_discovery(center.id, prefetched[center.database])
+
+    def discover(center):
+        start = time.perf_counter()
+        discovered = prefetched.get(center.database) or discover_cached(
+            center.id,
+            config.database.connection_string(center.database),
+            refresh=args.refresh,
+            include_keys=args.keys,
+            include_row_counts=args.row_counts,
+            dialect=config.database.dialect,
+        )
+        return discovered, (time.perf_counter() - start) * 1000
+
+    # Print each center as soon as its discovery completes
+    timing = []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(propagate(discover), center): center for center in centers}
+
+        for future in as_completed(futures):
+            center = futures[future]
+            try:
+                discovered, duration_ms = future.result()
+                print_discovered(center, discovered)
+                timing.append((True, center.name, duration_ms, f"{len(discovered.tables)} tables"))
+            except Exception as e:
+                print(f"\n{center.name}: Error - {e}")
+                timing.append((False, center.name, 0.0, str(e)))
 
-        except Exception as e:
-            print(f"\n{center.name}: Error - {e}")
+    print(f"\n{'='*60}")
+    print_timing_table(timing)
 
     return 0
 
@@ -71,11 +145,46 @@ def cmd_generate_mappings(args, config):
     logger.info("Generating mapping files from discovered schemas...")
     logger.info(f"Output directory: {MAPPINGS_DIR}")
 
-    generated = generate_all_mappings(config, MAPPINGS_DIR)
+    sampler = None
+    if args.sample_values:
+        from ..services.value_sampler import ValueSampler
+
+        sampler = ValueSampler(
+            config.database,
+            sample_rows=args.sample_rows,
+            timeout_s=args.sample_timeout,
+            max_workers=args.sample_workers,
+        )
+
+    try:
+        results = generate_all_mappings(
+            config,
+            MAPPINGS_DIR,
+            incremental=args.incremental,
+            server_wide=args.server_wide,
+            max_workers=args.workers,
+            sampler=sampler,
+        )
+    finally:
+        if sampler is not None:
+            sampler.close()
+    generated = [r for r in results if r.status == "generated"]
+    skipped = [r for r in results if r.status == "skipped"]
+    failed = [r for r in results if r.status == "error"]
 
     print(f"\n{'='*60}")
     print(f"Generated {len(generated)} mapping files")
+    if skipped:
+        print(f"Skipped {len(skipped)} (unchanged or reviewed)")
+    if failed:
+        print(f"Failed {len(failed)}")
+    if sampler is not None:
+        print(f"Sampling queries: {sampler.queries}")
     print(f"{'='*60}")
+    print_timing_table([
+        (r.status != "error", r.center_name, r.duration_ms, r.error or r.status)
+        for r in results
+    ])
     print(f"\nFiles saved to: {MAPPINGS_DIR}")
     print("\nIMPORTANT: Review and adjust mappings as needed before extraction.")
     print("Each file has 'reviewed: false' flag - set to true after review.")
@@ -83,10 +192,94 @@ def cmd_generate_mappings(args, config):
     return 0
 
 
+def cmd_compile_mappings(args, config):
+    """Compile all mapping files into a single memory-mapped bundle."""
+    from ..core.mapping_bundle import compile_bundle, default_bundle_path
+
+    available = list_available_mappings(MAPPINGS_DIR)
+    if not available:
+        logger.error("No mapping files found.")
+        logger.info("Run 'python -m src.cli generate-mappings' first.")
+        return 1
+
+    path = compile_bundle(MAPPINGS_DIR, default_bundle_path(MAPPINGS_DIR))
+
+    print(f"\n{'='*60}")
+    print(f"Compiled {len(available)} mappings")
+    print(f"{'='*60}")
+    print(f"Bundle: {path} ({path.stat().st_size / 1024:.1f} KB)")
+    print("\nRe-run after editing mappings; stale entries fall back to JSON.")
+
+    return 0
+
+
+def cmd_evaluate_mappings(args, config):
+    """Compare mapping files with generated ground truth, all centers at once."""
+    evaluator = SchemaDiffEvaluator(GROUND_TRUTH_DIR, MAPPINGS_DIR, max_workers=args.workers)
+    center_ids = [args.center] if args.center else None
+
+    report = evaluator.evaluate(center_ids)
+    if not report.centers and not report.errors:
+        logger.error("No ground truth found.")
+        logger.info("Run 'python scripts/generate_test_dbs.py' first.")
+        return 1
+
+    summary = report.summary()
+    print(f"\n{'='*60}")
+    print(f"MAPPING ACCURACY")
+    print(f"{'='*60}")
+    print(f"Centers: {summary['centers']}")
+    print(f"Tables:  {summary['tables_matched']}/{summary['tables_total']}")
+    print(f"Columns: {summary['columns_matched']}/{summary['columns_total']}")
+    print(f"Accuracy: {summary['accuracy']}% (mean per center {summary['mean_center_accuracy']}%)")
+    print(
+        f"Perfect: {summary['perfect']}, Good: {summary['good']}, "
+        f"Needs review (<{GOOD_ACCURACY}%): {summary['needs_review']}"
+    )
+    if summary["without_mapping"]:
+        print(f"Without mapping: {summary['without_mapping']}")
+    print(f"{'='*60}")
+
+    # Imperfect centers, worst first
+    imperfect = sorted((c for c in report.centers if c["accuracy"] < 100), key=lambda c: c["accuracy"])
+    if imperfect:
+        print(f"\nImperfect Centers:")
+        for diff in imperfect[: args.limit] if args.limit else imperfect:
+            print(
+                f"  {diff['center_id']:30} {diff['accuracy']:3}%  "
+                f"(tables {diff['tables_matched']}/{diff['tables_total']}, "
+                f"columns {diff['columns_matched']}/{diff['columns_total']})"
+            )
+            if args.show_mismatches:
+                for table, table_diff in diff["tables"].items():
+                    if not table_diff["match"]:
+                        print(f"      {table}: {table_diff['mapping'] or '-'} (expected {table_diff['ground_truth']})")
+                    for col, col_diff in table_diff["columns"].items():
+                        if not col_diff["match"]:
+                            print(
+                                f"      {table}.{col}: {col_diff['mapping'] or '-'} "
+                                f"(expected {col_diff['ground_truth']})"
+                            )
+        if args.limit and len(imperfect) > args.limit:
+            print(f"  ... {len(imperfect) - args.limit} more")
+
+    for center_id in report.missing_ground_truth:
+        print(f"\n  [no ground truth] {center_id}")
+    for center_id, error in report.errors.items():
+        print(f"\n  [err] {center_id}: {error}")
+
+    if args.fail_under is not None and summary["accuracy"] < args.fail_under:
+        print(f"\nFAIL: Accuracy {summary['accuracy']}% is under {args.fail_under}%")
+        return 1
+    return 1 if report.errors else 0
+
+
 def cmd_show_mapping(args, config):
     """Show a mapping file for a center."""
     import json
 
+    from ..core.discovery import load_discovery
+
     if not args.center:
         # List available mappings
         available = list_available_mappings(MAPPINGS_DIR)
@@ -106,6 +299,10 @@ def cmd_show_mapping(args, config):
     with open(filepath) as f:
         mapping = json.load(f)
 
+    # Cached discovery (if any) adds types and row counts without querying
+    discovered = load_discovery(args.center)
+    live = {t.name: t for t in discovered.tables} if discovered else {}
+
     print(f"\n{'='*60}")
     print(f"Mapping: {args.center}")
     print(f"Database: {mapping.get('database')}")
@@ -113,9 +310,24 @@ def cmd_show_mapping(args, config):
     print(f"{'='*60}")
 
     for canonical, table in mapping.get("tables", {}).items():
-        print(f"\n{canonical} -> {table['actual_name']}")
+        live_table = live.get(table["actual_name"])
+        rows = ""
+        if live_table and live_table.row_count is not None:
+            rows = f" ({live_table.row_count} rows)"
+        print(f"\n{canonical} -> {table['actual_name']}{rows}")
+
+        live_types = {c.name: c.data_type for c in live_table.columns} if live_table else {}
         for col_canonical, col_data in table.get("columns", {}).items():
-            print(f"  {col_canonical} -> {col_data['actual_name']}")
+            actual = col_data["actual_name"]
+            data_type = live_types.get(actual) or col_data.get("data_type")
+            suffix = f" ({data_type})" if data_type else ""
+            if col_data.get("method", "exact") != "exact":
+                suffix += f"  [{col_data['method']} {col_data.get('confidence', 0):.2f}]"
+            print(f"  {col_canonical} -> {actual}{suffix}")
+
+        unresolved = table.get("unresolved_columns", [])
+        if unresolved:
+            print(f"  UNRESOLVED: {', '.join(unresolved)}")
 
     unmapped = mapping.get("unmapped_tables", [])
     if unmapped:
@@ -152,8 +364,12 @@ def cmd_extract(args, config):
             logger.info(f"Available: {', '.join(config.get_center_ids())}")
             return 1
 
+    if not apply_fault_profile(args, config):
+        return 1
+
     # Run extraction
-    service = ExtractionService(config)
+    trace = TraceRecorder("extract") if args.trace else None
+    service = ExtractionService(config, trace=trace)
     result = service.extract_all(
         target_date=target_date,
         center_ids=center_ids,
@@ -179,11 +395,25 @@ def cmd_extract(args, config):
         path = service.export_csv(result)
         print(f"CSV: {path}")
 
+    if trace is not None:
+        print(f"Trace: {trace.write()} (chrome://tracing or https://ui.perfetto.dev)")
+
     return 0
 
 
+def parse_worker_counts(value: str) -> list[int]:
+    """'1,5,10' -> [1, 5, 10]"""
+    try:
+        counts = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid worker counts: {value}")
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"Invalid worker counts: {value}")
+    return counts
+
+
 def cmd_benchmark(args, config):
-    """Run performance benchmark."""
+    """Run performance benchmark (cold and warm runs per worker count)."""
     # Check for mapping files
     available = list_available_mappings(MAPPINGS_DIR)
     if not available:
@@ -191,44 +421,169 @@ def cmd_benchmark(args, config):
         logger.info("Run 'python -m src.cli generate-mappings' first.")
         return 1
 
-    logger.info("Running benchmark...")
-
-    # Clear cache to measure full load time
-    clear_cache()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
 
-    service = ExtractionService(config)
+    if not apply_fault_profile(args, config):
+        return 1
 
-    # Run extraction
-    target_date = date(2022, 1, 18)  # Known test date
-    result = service.extract_all(
-        target_date=target_date,
-        max_workers=args.workers,
+    logger.info("Running benchmark...")
+    suite = BenchmarkSuite(
+        config,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        worker_counts=args.workers,
+        center_ids=[args.center] if args.center else None,
+        trace=TraceRecorder("benchmark") if args.trace else None,
     )
+    report = suite.run()
 
     # Report
     print(f"\n{'='*60}")
     print(f"BENCHMARK RESULTS")
     print(f"{'='*60}")
-    print(f"Centers: {len(result.results)}")
-    print(f"Total Entries: {result.total_entries}")
-    print(f"Total Time: {result.total_duration_ms:.0f}ms")
+    print(f"Centers: {report['centers']}  Date: {report['target_date']}")
+    print(f"Iterations: {report['iterations']}  Warm-up: {report['warmup']}")
+    if report["faults"]:
+        print(f"Faults: {report['faults']['source']} (seed {report['faults']['seed']})")
+    if args.profile:
+        print(f"Note: profiling is on; timings include its overhead")
+
+    passed = True
+    for workers, modes in report["runs"].items():
+        print(f"\nWorkers: {workers}")
+        print(f"  {'':12} {'n':>3} {'mean':>8} {'stdev':>8} {'p50':>8} {'p95':>8} {'p99':>8}  errors")
+        for mode in MODES:
+            total = modes[mode]["total"]
+            print(
+                f"  {mode + ' total':12} {total['n']:3} {total['mean']:7.0f}ms {total['stdev']:7.0f}ms "
+                f"{total['p50']:7.0f}ms {total['p95']:7.0f}ms {total['p99']:7.0f}ms  {modes[mode]['errors']}"
+            )
+
+        # Where a center's time goes (all centers pooled)
+        recorded = [p for p in PHASES if any(p in modes[m]["phases"] for m in MODES)]
+        if recorded:
+            print(f"  Phases per center (p50 / p95):")
+        for phase in recorded:
+            cells = []
+            for mode in MODES:
+                dist = modes[mode]["phases"].get(phase)
+                cells.append(f"{mode} {dist['p50']:7.1f} / {dist['p95']:7.1f}ms" if dist else f"{mode} {'-':>18}")
+            print(f"    {phase:14} {'   '.join(cells)}")
+
+        # Slowest centers by warm p95
+        centers = sorted(modes["warm"]["centers"].items(), key=lambda c: c[1]["p95"], reverse=True)
+        if centers:
+            print(f"  Slowest centers (warm):")
+            for center_id, dist in centers[: args.top]:
+                cold = modes["cold"]["centers"].get(center_id, {})
+                print(
+                    f"    {center_id:24} p50 {dist['p50']:6.0f}ms  p95 {dist['p95']:6.0f}ms  "
+                    f"stdev {dist['stdev']:5.0f}ms  (cold p50 {cold.get('p50', 0):6.0f}ms)"
+                )
+
+        cold_p50 = modes["cold"]["total"]["p50"]
+        if cold_p50 >= report["target_ms"]:
+            passed = False
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nJSON: {output}")
+    if report["trace"]:
+        print(f"Trace: {report['trace']} (chrome://tracing or https://ui.perfetto.dev)")
+
+    print(f"\n{'='*60}")
+    target = report["target_ms"]
+    if passed:
+        print(f"PASS: Cold p50 under {target}ms target")
+    else:
+        print(f"FAIL: Cold p50 over {target}ms target")
     print(f"{'='*60}")
-    print(f"\nPer-Center Timing:")
 
-    for r in sorted(result.results, key=lambda x: x.duration_ms, reverse=True):
-        status = "ok" if r.error is None else "err"
+    if baseline is None:
+        return 0
+
+    regressions = compare_reports(baseline, report)
+    print(f"\nCompared with {args.compare} ({baseline.get('created_at', 'unknown date')}):")
+    if baseline.get("faults") != report["faults"]:
+        print("  Note: baseline ran with a different fault profile")
+    if not regressions:
+        print(f"  No significant regressions (one-sided Mann-Whitney U, FDR {ALPHA})")
+        return 0
+    for r in sorted(regressions, key=lambda r: r.change, reverse=True):
         print(
-            f"  [{status}] {r.center_name:30} {r.duration_ms:6.0f}ms  ({len(r.entries)} entries)"
+            f"  REGRESSION {r.mode:4} workers={r.workers:3} {r.scope:24} "
+            f"p50 {r.baseline_p50:.0f}ms -> {r.current_p50:.0f}ms ({r.change:+.0%}, p={r.p_value:.4f})"
         )
+    return 1
+
+
+def parse_time_of_day(value: str) -> dt_time:
+    """'06:00' -> time(6, 0)"""
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid time: {value}. Use HH:MM")
+
+
+def cmd_daemon(args, config):
+    """Run daily extractions in a long-running process, catching up missed days."""
+    import signal
+
+    from ..core.config import default_config_path
+    from ..services.scheduler import ExtractionScheduler, SchedulerSettings
+
+    since = None
+    if args.since:
+        try:
+            since = datetime.strptime(args.since, "%Y-%m-%d").date()
+        except ValueError:
+            logger.error(f"Invalid date: {args.since}. Use YYYY-MM-DD")
+            return 1
+    if args.catchup_workers > args.workers:
+        logger.warning(f"--catchup-workers {args.catchup_workers} exceeds --workers {args.workers}")
+
+    settings = SchedulerSettings(
+        at=args.at,
+        workers=args.workers,
+        catchup_workers=args.catchup_workers,
+        max_backfill_days=args.max_backfill_days,
+        retry_minutes=args.retry_minutes,
+        since=since,
+        formats=("json", "csv") if args.format == "both" else (args.format,),
+    )
+    scheduler = ExtractionScheduler(
+        default_config_path(), settings, state_path=Path(args.state) if args.state else None
+    )
 
     print(f"\n{'='*60}")
-    target = 5000  # 5 seconds target
-    if result.total_duration_ms < target:
-        print(f"PASS: Under {target}ms target")
-    else:
-        print(f"FAIL: Over {target}ms target")
+    print(f"Ivoris Extraction Daemon")
     print(f"{'='*60}")
+    print(f"Daily at: {settings.at:%H:%M} (extracts the previous day)")
+    print(f"Workers: {settings.workers}  Catch-up workers: {settings.catchup_workers}")
+    print(f"Backfill: up to {settings.max_backfill_days} days  Retry: every {settings.retry_minutes:g} min")
+    print(f"State: {scheduler.state.path}")
+    print(f"{'='*60}")
+
+    if args.once:
+        scheduler.warm()
+        remaining = scheduler.run_cycle(scheduler.target_for(datetime.now()))
+        scheduler.pool.close()
+        print(f"\nPending center-days: {remaining}")
+        return 0 if remaining == 0 else 1
+
+    def stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping after the current center")
+        scheduler.stop()
 
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    scheduler.run()
     return 0
 
 
@@ -240,6 +595,10 @@ def cmd_web(args, config):
     print(f"Starting Ivoris Multi-Center Web UI")
     print(f"{'='*60}")
     print(f"\nServer: http://localhost:{args.port}")
+    if args.profile:
+        # Read by the app at import (also in uvicorn's reload process)
+        os.environ["IVORIS_PROFILING"] = "1"
+        print(f"Profiling: send 'X-Profile: 1' with /api/extract or /api/benchmark")
     print(f"Press Ctrl+C to stop\n")
 
     uvicorn.run(
@@ -285,12 +644,27 @@ Workflow:
   1. scripts/generate_test_dbs.py  - Create test databases
   2. discover-raw                  - View raw database schema
   3. generate-mappings             - Create mapping files
+     compile-mappings              - Bundle mappings for fast startup
+     evaluate-mappings             - Check mapping accuracy (test databases)
   4. show-mapping                  - Review a mapping file
   5. extract                       - Extract data
   6. benchmark                     - Performance test
+     daemon                        - Daily extraction with catch-up
         """,
     )
 
+    parser.add_argument(
+        "--config",
+        type=Path,
+        help="Centers config file (default: $IVORIS_CONFIG or config/centers.yml)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the command (cProfile, tracemalloc, stack samples) into "
+        "data/output/profiles/; with 'web', honor the X-Profile: 1 request header",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Commands")
 
     # discover-raw command
@@ -300,11 +674,111 @@ Workflow:
     discover_parser.add_argument(
         "--center", "-c", help="Specific center ID (default: all)"
     )
+    discover_parser.add_argument(
+        "--refresh", action="store_true", help="Re-query instead of using cached discovery"
+    )
+    discover_parser.add_argument(
+        "--keys", action="store_true", help="Include primary/foreign key metadata"
+    )
+    discover_parser.add_argument(
+        "--row-counts", action="store_true", help="Include table row counts"
+    )
+    discover_parser.add_argument(
+        "--server-wide",
+        action="store_true",
+        help="Read all center catalogs in one query over a single server connection",
+    )
+    discover_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=5,
+        help="Max parallel workers (default: 5)",
+    )
 
     # generate-mappings command
     gen_parser = subparsers.add_parser(
         "generate-mappings", help="Generate mapping files from schemas"
     )
+    gen_parser.add_argument(
+        "--incremental",
+        "-i",
+        action="store_true",
+        help="Only regenerate centers whose schema fingerprint changed "
+        "(reviewed mappings are never overwritten)",
+    )
+    gen_parser.add_argument(
+        "--server-wide",
+        action="store_true",
+        help="Read all center catalogs in one query over a single server connection",
+    )
+    gen_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=5,
+        help="Max parallel workers (default: 5)",
+    )
+    gen_parser.add_argument(
+        "--sample-values",
+        action="store_true",
+        help="Classify unresolved columns (DATUM, DELKZ, ART) by sampling their values",
+    )
+    gen_parser.add_argument(
+        "--sample-rows",
+        type=int,
+        default=200,
+        help="Max rows sampled per candidate column (default: 200)",
+    )
+    gen_parser.add_argument(
+        "--sample-timeout",
+        type=int,
+        default=5,
+        help="Per-query sampling timeout in seconds (default: 5)",
+    )
+    gen_parser.add_argument(
+        "--sample-workers",
+        type=int,
+        default=8,
+        help="Max concurrent sampling queries across all centers (default: 8)",
+    )
+
+    # compile-mappings command
+    subparsers.add_parser(
+        "compile-mappings", help="Compile mapping files into a fast-loading bundle"
+    )
+
+    # evaluate-mappings command
+    eval_parser = subparsers.add_parser(
+        "evaluate-mappings", help="Compare mappings with generated ground truth"
+    )
+    eval_parser.add_argument(
+        "--center", "-c", help="Specific center ID (default: all with ground truth)"
+    )
+    eval_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=8,
+        help="Max parallel file loaders (default: 8)",
+    )
+    eval_parser.add_argument(
+        "--show-mismatches",
+        "-m",
+        action="store_true",
+        help="List each mismatched table and column",
+    )
+    eval_parser.add_argument(
+        "--limit",
+        type=int,
+        default=50,
+        help="Max imperfect centers to list (default: 50, 0 for all)",
+    )
+    eval_parser.add_argument(
+        "--fail-under",
+        type=int,
+        help="Exit with 1 if overall accuracy is below this percentage",
+    )
 
     # show-mapping command
     show_parser = subparsers.add_parser(
@@ -336,15 +810,120 @@ Workflow:
         default=5,
         help="Max parallel workers (default: 5)",
     )
+    extract_parser.add_argument(
+        "--faults",
+        metavar="PROFILE",
+        help="Fault profile (YAML) injecting latency and failures into every connection",
+    )
+    extract_parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a timeline (Chrome Trace Event JSON, opens in chrome://tracing "
+        "or ui.perfetto.dev) to data/output/traces/",
+    )
 
     # benchmark command
     bench_parser = subparsers.add_parser("benchmark", help="Run performance benchmark")
     bench_parser.add_argument(
         "--workers",
         "-w",
+        type=parse_worker_counts,
+        default=[5],
+        help="Comma-separated worker counts to compare, e.g. 1,5,10,20 (default: 5)",
+    )
+    bench_parser.add_argument(
+        "--iterations",
+        "-n",
         type=int,
         default=5,
-        help="Max parallel workers (default: 5)",
+        help="Measured runs per worker count and mode (default: 5)",
+    )
+    bench_parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="Discarded runs before the warm measurements (default: 1)",
+    )
+    bench_parser.add_argument(
+        "--center", "-c", help="Specific center ID (default: all)"
+    )
+    bench_parser.add_argument(
+        "--output", "-o", help="Write the full report (with raw samples) as JSON"
+    )
+    bench_parser.add_argument(
+        "--compare",
+        help="Baseline JSON report; exit with 1 on significant regressions",
+    )
+    bench_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Slowest centers to list per worker count (default: 10)",
+    )
+    bench_parser.add_argument(
+        "--faults",
+        metavar="PROFILE",
+        help="Fault profile (YAML) injecting latency and failures into every connection",
+    )
+    bench_parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a timeline (Chrome Trace Event JSON, opens in chrome://tracing "
+        "or ui.perfetto.dev) to data/output/traces/",
+    )
+
+    # daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Run daily extractions, keeping state warm and catching up missed days"
+    )
+    daemon_parser.add_argument(
+        "--at",
+        type=parse_time_of_day,
+        default=dt_time(6, 0),
+        help="Daily run time, HH:MM local time (default: 06:00)",
+    )
+    daemon_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=5,
+        help="Max parallel workers for the newest date (default: 5)",
+    )
+    daemon_parser.add_argument(
+        "--catchup-workers",
+        type=int,
+        default=2,
+        help="Max parallel workers while backfilling missed dates (default: 2)",
+    )
+    daemon_parser.add_argument(
+        "--max-backfill-days",
+        type=int,
+        default=30,
+        help="Never backfill further back than this (default: 30)",
+    )
+    daemon_parser.add_argument(
+        "--retry-minutes",
+        type=float,
+        default=30,
+        help="Retry failed centers after this many minutes (default: 30)",
+    )
+    daemon_parser.add_argument(
+        "--since", help="First date for centers without state (YYYY-MM-DD, default: latest target)"
+    )
+    daemon_parser.add_argument(
+        "--format",
+        "-f",
+        choices=["json", "csv", "both"],
+        default="both",
+        help="Output format",
+    )
+    daemon_parser.add_argument(
+        "--state", help="State file (default: data/daemon_state.json)"
+    )
+    daemon_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run one catch-up cycle and exit (1 if work is left pending)",
     )
 
     # list command
@@ -368,7 +947,9 @@ Workflow:
         parser.print_help()
         return 0
 
-    # Load config
+    # Load config; the web server and other child processes see the same file
+    if args.config:
+        os.environ["IVORIS_CONFIG"] = str(args.config)
     try:
         config = load_config()
     except Exception as e:
@@ -379,14 +960,26 @@ Workflow:
     commands = {
         "discover-raw": cmd_discover_raw,
         "generate-mappings": cmd_generate_mappings,
+        "compile-mappings": cmd_compile_mappings,
+        "evaluate-mappings": cmd_evaluate_mappings,
         "show-mapping": cmd_show_mapping,
         "extract": cmd_extract,
         "benchmark": cmd_benchmark,
+        "daemon": cmd_daemon,
         "list": cmd_list,
         "web": cmd_web,
     }
 
-    return commands[args.command](args, config)
+    if not args.profile or args.command == "web":
+        return commands[args.command](args, config)
+
+    from ..core.profiling import RunProfiler
+
+    with RunProfiler(args.command) as profiler:
+        code = commands[args.command](args, config)
+    print(f"\nProfile: {profiler.report.directory}")
+    print(f"  summary.txt, profile.pstats, stacks.collapsed (flamegraph.pl / speedscope)")
+    return code
 
 
 if __name__ == "__main__":
@@ -5,13 +5,27 @@ Loads center configuration from YAML file.
 """
 
 import logging
+import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import yaml
 
+from .dialect import DEFAULT_BACKEND, DEFAULT_SQLITE_DIR, Dialect, get_dialect
+
+if TYPE_CHECKING:
+    from .faults import FaultProfile
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "centers.yml"
+
+
+def default_config_path() -> Path:
+    """Config file to use: $IVORIS_CONFIG (e.g. a generated fleet) or centers.yml."""
+    return Path(os.environ.get("IVORIS_CONFIG") or DEFAULT_CONFIG_PATH)
+
 
 @dataclass
 class CenterConfig:
@@ -27,22 +41,25 @@ class CenterConfig:
 class DatabaseConfig:
     """Database connection configuration."""
 
-    host: str
-    port: int
-    user: str
-    password: str
-    driver: str
+    host: str = "localhost"
+    port: int = 1433
+    user: str = ""
+    password: str = ""
+    driver: str = "ODBC Driver 18 for SQL Server"
+    backend: str = DEFAULT_BACKEND  # sqlserver | sqlite
+    path: str = DEFAULT_SQLITE_DIR  # sqlite: directory of <database>.db files
+    faults: "FaultProfile | None" = None  # Injected latency/failures (--faults)
+
+    @property
+    def dialect(self) -> Dialect:
+        dialect = get_dialect(self.backend)
+        if self.faults is not None:
+            return self.faults.wrap(dialect)
+        return dialect
 
     def connection_string(self, database: str) -> str:
-        """Build ODBC connection string for a specific database."""
-        return (
-            f"DRIVER={{{self.driver}}};"
-            f"SERVER={self.host},{self.port};"
-            f"DATABASE={database};"
-            f"UID={self.user};"
-            f"PWD={self.password};"
-            f"TrustServerCertificate=yes;"
-        )
+        """Connection string for a specific database (ODBC string or SQLite file)."""
+        return self.dialect.connection_string(self, database)
 
 
 @dataclass
@@ -64,24 +81,32 @@ class AppConfig:
         return [c.id for c in self.centers]
 
 
+def database_config(db_data: dict) -> DatabaseConfig:
+    """DatabaseConfig from the `database` section of a centers config."""
+    backend = db_data.get("backend", DEFAULT_BACKEND)
+    get_dialect(backend)  # Fail early on unknown backends
+    if backend == DEFAULT_BACKEND:
+        return DatabaseConfig(
+            host=db_data["host"],
+            port=db_data["port"],
+            user=db_data["user"],
+            password=db_data["password"],
+            driver=db_data["driver"],
+        )
+    return DatabaseConfig(backend=backend, path=db_data.get("path", DEFAULT_SQLITE_DIR))
+
+
 def load_config(config_path: Path | None = None) -> AppConfig:
     """Load configuration from YAML file."""
     if config_path is None:
-        config_path = Path(__file__).parent.parent.parent / "config" / "centers.yml"
+        config_path = default_config_path()
 
     logger.debug(f"Loading config from {config_path}")
 
     with open(config_path) as f:
         data = yaml.safe_load(f)
 
-    db_data = data["database"]
-    database = DatabaseConfig(
-        host=db_data["host"],
-        port=db_data["port"],
-        user=db_data["user"],
-        password=db_data["password"],
-        driver=db_data["driver"],
-    )
+    database = database_config(data["database"])
 
     centers = [
         CenterConfig(
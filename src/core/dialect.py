@@ -0,0 +1,366 @@
+"""
+SQL dialects - what differs between database backends.
+
+Everything that talks to a center database goes through a Dialect:
+connecting, quoting identifiers, limiting result sets and reading the
+catalog. The mapped extraction queries (queries.py) are plain SQL with
+`?` parameters and a `ck.` schema prefix, which both backends accept
+unchanged.
+
+- sqlserver: pyodbc and T-SQL, one database per center on a server
+- sqlite: embedded files, one per center (<path>/<database>.db), for
+  benchmarks and concurrency experiments without a SQL Server. Each
+  connection attaches the center's file as schema "ck", so mapped
+  queries resolve `ck.TABLE` as they do on SQL Server.
+
+The backend is chosen by `database.backend` in the centers config.
+Dialects are stateless; get_dialect() returns shared instances. pyodbc
+is only imported when the SQL Server dialect connects or catches
+errors, so the SQLite backend runs without an ODBC driver.
+"""
+
+import logging
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent.parent
+
+DEFAULT_BACKEND = "sqlserver"
+DEFAULT_SQLITE_DIR = "data/sqlite"
+SQLITE_SCHEMA = "ck"  # Schema name a center's SQLite file is attached as
+
+# One row per column, as returned by Dialect.read_catalog()
+CatalogRow = namedtuple(
+    "CatalogRow",
+    "table_name column_name data_type is_nullable column_id "
+    "is_primary_key ref_table ref_column row_count",
+)
+
+# Schema fingerprint, computed server-side in one catalog query.
+#
+# SHA-256 over one line per column "TABLE.COLUMN:type:YES|NO" (UTF-16LE,
+# newline-separated), ordered by table name (binary) and ordinal position.
+# discovery.fingerprint_schema() computes the same value from a
+# DiscoveredSchema.
+FINGERPRINT_QUERY = """
+    SELECT LOWER(CONVERT(VARCHAR(64), HASHBYTES('SHA2_256', COALESCE(
+        STRING_AGG(
+            CAST(CONCAT(c.TABLE_NAME, '.', c.COLUMN_NAME, ':',
+                        c.DATA_TYPE, ':', c.IS_NULLABLE) AS NVARCHAR(MAX)),
+            NCHAR(10)
+        ) WITHIN GROUP (
+            ORDER BY c.TABLE_NAME COLLATE Latin1_General_BIN2, c.ORDINAL_POSITION
+        ),
+        N'')), 2))
+    FROM INFORMATION_SCHEMA.COLUMNS c
+    JOIN INFORMATION_SCHEMA.TABLES t
+        ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+    WHERE c.TABLE_SCHEMA = ? AND t.TABLE_TYPE = 'BASE TABLE'
+"""
+
+
+def quote_name(name: str) -> str:
+    """Bracket-quote a SQL Server identifier."""
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def catalog_query(
+    include_keys: bool = False,
+    include_row_counts: bool = False,
+    database: str | None = None,
+) -> str:
+    """
+    Build the set-based SQL Server catalog query for all tables and columns.
+
+    One row per column, ordered by table and column position. Key and
+    row-count metadata are added as LEFT JOINs when requested. With
+    `database`, catalog views are qualified with that database so the
+    query can run from another database's connection.
+
+    Parameter: schema name.
+    """
+    db = f"{quote_name(database)}." if database else ""
+    # Catalog names use each database's collation; unify them for UNION ALL
+    collate = " COLLATE DATABASE_DEFAULT" if database else ""
+    select = [
+        f"t.name{collate} AS table_name",
+        f"c.name{collate} AS column_name",
+        f"COALESCE(ty.name, uty.name){collate} AS data_type",
+        "c.is_nullable",
+        "c.column_id",
+    ]
+    joins = [
+        f"JOIN {db}sys.schemas s ON s.schema_id = t.schema_id",
+        f"JOIN {db}sys.columns c ON c.object_id = t.object_id",
+        # CLR types (hierarchyid, geometry, ...) have no system type row;
+        # fall back to the column's own type like INFORMATION_SCHEMA does
+        f"LEFT JOIN {db}sys.types ty ON ty.user_type_id = c.system_type_id",
+        f"LEFT JOIN {db}sys.types uty ON uty.user_type_id = c.user_type_id",
+    ]
+
+    if include_keys:
+        select += [
+            "CAST(CASE WHEN pk.column_id IS NULL THEN 0 ELSE 1 END AS BIT) AS is_primary_key",
+            f"rt.name{collate} AS ref_table",
+            f"rcol.name{collate} AS ref_column",
+        ]
+        joins += [
+            f"""LEFT JOIN (
+                SELECT ic.object_id, ic.column_id
+                FROM {db}sys.indexes i
+                JOIN {db}sys.index_columns ic
+                    ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                WHERE i.is_primary_key = 1
+            ) pk ON pk.object_id = c.object_id AND pk.column_id = c.column_id""",
+            f"""LEFT JOIN {db}sys.foreign_key_columns fk
+                ON fk.parent_object_id = c.object_id AND fk.parent_column_id = c.column_id""",
+            f"LEFT JOIN {db}sys.tables rt ON rt.object_id = fk.referenced_object_id",
+            f"""LEFT JOIN {db}sys.columns rcol
+                ON rcol.object_id = fk.referenced_object_id
+                AND rcol.column_id = fk.referenced_column_id""",
+        ]
+
+    if include_row_counts:
+        select.append("rc.row_count")
+        joins.append(f"""LEFT JOIN (
+                SELECT object_id, SUM(row_count) AS row_count
+                FROM {db}sys.dm_db_partition_stats
+                WHERE index_id IN (0, 1)
+                GROUP BY object_id
+            ) rc ON rc.object_id = t.object_id""")
+
+    return (
+        "SELECT " + ", ".join(select)
+        + f" FROM {db}sys.tables t "
+        + " ".join(joins)
+        + " WHERE s.name = ? AND t.is_ms_shipped = 0"
+    )
+
+
+class Dialect:
+    """Backend-specific SQL and connection handling (base: SQL Server)."""
+
+    name = DEFAULT_BACKEND
+    server_catalog = True  # Many databases' catalogs readable in one query
+
+    @property
+    def Error(self) -> type[Exception]:
+        """Driver exception base class (failed connections and queries)."""
+        import pyodbc
+
+        return pyodbc.Error
+
+    def connection_string(self, db_config: "DatabaseConfig", database: str) -> str:
+        """Build ODBC connection string for a specific database."""
+        return (
+            f"DRIVER={{{db_config.driver}}};"
+            f"SERVER={db_config.host},{db_config.port};"
+            f"DATABASE={database};"
+            f"UID={db_config.user};"
+            f"PWD={db_config.password};"
+            f"TrustServerCertificate=yes;"
+        )
+
+    def connect(self, connection_string: str, timeout: int | None = None) -> Any:
+        """Open a DB-API connection (timeout: login timeout in seconds)."""
+        import pyodbc
+
+        if timeout is None:
+            return pyodbc.connect(connection_string)
+        return pyodbc.connect(connection_string, timeout=timeout)
+
+    def set_query_timeout(self, conn: Any, seconds: int) -> None:
+        conn.timeout = seconds
+
+    def quote_name(self, name: str) -> str:
+        return quote_name(name)
+
+    def limit(self, select: str, rows: int) -> str:
+        """Limit a "SELECT ..." statement to its first `rows` rows."""
+        return f"SELECT TOP ({int(rows)}) " + select.removeprefix("SELECT ")
+
+    def tablesample(self, percent: int) -> str:
+        """Table suffix for page-level sampling ('' if unsupported)."""
+        return f" TABLESAMPLE SYSTEM ({int(percent)} PERCENT)"
+
+    def read_catalog(
+        self,
+        conn: Any,
+        schema: str,
+        include_keys: bool = False,
+        include_row_counts: bool = False,
+    ) -> tuple[str, list]:
+        """Database name and one catalog row per column (see CatalogRow)."""
+        cursor = conn.cursor()
+        # Database name and the whole catalog in one round trip
+        cursor.execute(
+            "SELECT DB_NAME(); " + catalog_query(include_keys, include_row_counts),
+            (schema,),
+        )
+        database = cursor.fetchone()[0]
+        cursor.nextset()
+        rows = cursor.fetchall()
+        cursor.close()
+        return database, rows
+
+    def fingerprint(self, conn: Any, schema: str) -> str | None:
+        """Schema fingerprint computed by the database (None if unsupported)."""
+        cursor = conn.cursor()
+        cursor.execute(FINGERPRINT_QUERY, (schema,))
+        fingerprint = cursor.fetchone()[0]
+        cursor.close()
+        return fingerprint
+
+
+class SqliteDialect(Dialect):
+    """Embedded SQLite, one file per center database."""
+
+    name = "sqlite"
+    server_catalog = False
+
+    @property
+    def Error(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def directory(self, db_config: "DatabaseConfig") -> Path:
+        path = Path(db_config.path or DEFAULT_SQLITE_DIR)
+        return path if path.is_absolute() else ROOT / path
+
+    def connection_string(self, db_config: "DatabaseConfig", database: str) -> str:
+        """Path of the center's database file."""
+        return str(self.directory(db_config) / f"{database}.db")
+
+    def connect(
+        self, connection_string: str, timeout: int | None = None, create: bool = False
+    ) -> sqlite3.Connection:
+        """
+        Attach the database file as schema "ck" to a fresh connection.
+
+        Missing files raise sqlite3.OperationalError unless `create` is
+        set. Connections may be used by another thread than the one that
+        opened them (the pool hands them out to one thread at a time).
+        """
+        conn = sqlite3.connect(
+            ":memory:", timeout=timeout or 5.0, check_same_thread=False, uri=True
+        )
+        mode = "rwc" if create else "rw"
+        uri = Path(connection_string).resolve().as_uri() + f"?mode={mode}"
+        try:
+            conn.execute(f"ATTACH DATABASE ? AS {SQLITE_SCHEMA}", (uri,))
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def set_query_timeout(self, conn: Any, seconds: int) -> None:
+        pass  # Local files; queries are not cancelled
+
+    def quote_name(self, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def limit(self, select: str, rows: int) -> str:
+        return f"{select} LIMIT {int(rows)}"
+
+    def tablesample(self, percent: int) -> str:
+        return ""
+
+    def read_catalog(
+        self,
+        conn: Any,
+        schema: str,
+        include_keys: bool = False,
+        include_row_counts: bool = False,
+    ) -> tuple[str, list]:
+        """
+        Catalog rows from sqlite_master and the table_info pragmas.
+
+        Declared types are normalized to SQL Server's catalog names
+        ("NVARCHAR(100)" -> "nvarchar") and primary keys are NOT NULL,
+        so mappings and fingerprints look the same on both backends.
+        Row counts are exact COUNT(*)s.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT file FROM pragma_database_list WHERE name = ?", (schema,))
+        attached = cursor.fetchone()
+        if attached is None:
+            cursor.close()
+            return "", []
+        database = Path(attached[0]).stem
+
+        cursor.execute(
+            f"""
+            SELECT m.name, p.name, p.type, NOT p."notnull" AND p.pk = 0, p.cid + 1, p.pk > 0,
+                   fk."table", fk."to"
+            FROM {schema}.sqlite_master m
+            JOIN pragma_table_info(m.name, ?) p
+            LEFT JOIN pragma_foreign_key_list(m.name, ?) fk ON fk."from" = p.name
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid
+            """,
+            (schema, schema),
+        )
+        columns = cursor.fetchall()
+
+        row_counts: dict[str, int] = {}
+        tables = list(dict.fromkeys(row[0] for row in columns))
+        if include_row_counts and tables:
+            cursor.execute(
+                " UNION ALL ".join(
+                    f"SELECT ?, COUNT(*) FROM {schema}.{self.quote_name(t)}" for t in tables
+                ),
+                tables,
+            )
+            row_counts = dict(cursor.fetchall())
+        cursor.close()
+
+        rows = [
+            CatalogRow(
+                table_name=table,
+                column_name=column,
+                data_type=normalize_type(declared),
+                is_nullable=bool(nullable),
+                column_id=column_id,
+                is_primary_key=bool(pk),
+                ref_table=ref_table,
+                ref_column=ref_column,
+                row_count=row_counts.get(table),
+            )
+            for table, column, declared, nullable, column_id, pk, ref_table, ref_column in columns
+        ]
+        return database, rows
+
+    def fingerprint(self, conn: Any, schema: str) -> str | None:
+        return None  # No hash functions in SQL; computed from the catalog
+
+
+# SQLite spellings with a SQL Server equivalent (INTEGER PRIMARY KEY = rowid)
+TYPE_ALIASES = {"integer": "int"}
+
+
+def normalize_type(declared: str) -> str:
+    """Declared SQLite column type as a SQL Server type name."""
+    name = declared.split("(", 1)[0].strip().lower()
+    return TYPE_ALIASES.get(name, name)
+
+
+DIALECTS: dict[str, Dialect] = {
+    DEFAULT_BACKEND: Dialect(),
+    SqliteDialect.name: SqliteDialect(),
+}
+
+
+def get_dialect(backend: str | None = None) -> Dialect:
+    """Dialect for a configured backend name."""
+    try:
+        return DIALECTS[backend or DEFAULT_BACKEND]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database backend '{backend}' (expected: {', '.join(DIALECTS)})"
+        ) from None
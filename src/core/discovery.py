@@ -6,13 +6,39 @@ without any pattern matching or interpretation. The interpretation is done
 by the agentic mapping process.
 """
 
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from pathlib import Path
 
-import pyodbc
+from .dialect import (  # noqa: F401 - catalog SQL is re-exported from here
+    FINGERPRINT_QUERY,
+    Dialect,
+    catalog_query,
+    get_dialect,
+    quote_name,
+)
+from .schema_mapping import SchemaMapping
+from .storage import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
+# Cached discovery results (one JSON file per center)
+DISCOVERY_DIR = Path(__file__).parent.parent.parent / "data" / "discovery"
+
+
+class SchemaDriftError(Exception):
+    """A center's live schema no longer matches its mapping."""
+
+    def __init__(self, center_id: str, diff: list[str]):
+        self.center_id = center_id
+        self.diff = diff
+        super().__init__(
+            f"Schema drift in {center_id} - regenerate and review the mapping:\n  "
+            + "\n  ".join(diff)
+        )
+
 
 @dataclass
 class DiscoveredColumn:
@@ -21,6 +47,8 @@ class DiscoveredColumn:
     data_type: str
     is_nullable: bool
     ordinal_position: int
+    is_primary_key: bool = False
+    references: str | None = None  # "TABLE.COLUMN" of a foreign key
 
 
 @dataclass
@@ -29,6 +57,7 @@ class DiscoveredTable:
     schema: str
     name: str
     columns: list[DiscoveredColumn]
+    row_count: int | None = None
 
 
 @dataclass
@@ -36,74 +65,99 @@ class DiscoveredSchema:
     """Complete schema discovery result."""
     database: str
     tables: list[DiscoveredTable]
+    include_keys: bool = False
+    include_row_counts: bool = False
+
+
+def group_catalog_rows(
+    rows,
+    schema_filter: str,
+    include_keys: bool = False,
+    include_row_counts: bool = False,
+) -> list[DiscoveredTable]:
+    """Group catalog query rows into DiscoveredTables (client-side)."""
+    tables: dict[str, DiscoveredTable] = {}
+    seen: set[tuple[str, str]] = set()
+
+    for row in sorted(rows, key=lambda r: (r.table_name, r.column_id)):
+        # A column in several foreign keys yields several rows
+        key = (row.table_name, row.column_name)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        table = tables.get(row.table_name)
+        if table is None:
+            table = tables[row.table_name] = DiscoveredTable(
+                schema=schema_filter,
+                name=row.table_name,
+                columns=[],
+                row_count=row.row_count if include_row_counts else None,
+            )
+
+        column = DiscoveredColumn(
+            name=row.column_name,
+            data_type=row.data_type,
+            is_nullable=bool(row.is_nullable),
+            ordinal_position=row.column_id,
+        )
+        if include_keys:
+            column.is_primary_key = bool(row.is_primary_key)
+            if row.ref_table:
+                column.references = f"{row.ref_table}.{row.ref_column}"
+        table.columns.append(column)
+
+    return list(tables.values())
 
 
 class SchemaDiscovery:
     """Discovers database schema without interpretation."""
 
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, dialect: Dialect | None = None):
         self.connection_string = connection_string
+        self.dialect = dialect or get_dialect()
 
-    def _get_connection(self) -> pyodbc.Connection:
-        return pyodbc.connect(self.connection_string)
+    def _get_connection(self):
+        return self.dialect.connect(self.connection_string)
 
-    def discover(self, schema_filter: str = "ck") -> DiscoveredSchema:
+    def discover(
+        self,
+        schema_filter: str = "ck",
+        include_keys: bool = False,
+        include_row_counts: bool = False,
+    ) -> DiscoveredSchema:
         """
         Discover all tables and columns in a schema.
 
         Returns raw discovery - no interpretation of what things mean.
+        All tables and columns come from one catalog query, so the cost
+        does not grow with the number of tables.
         """
         conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Get database name
-        cursor.execute("SELECT DB_NAME()")
-        database = cursor.fetchone()[0]
+        try:
+            database, rows = self.dialect.read_catalog(
+                conn, schema_filter, include_keys, include_row_counts
+            )
+        finally:
+            conn.close()
 
-        # Get all tables in schema
-        cursor.execute("""
-            SELECT TABLE_NAME
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE TABLE_SCHEMA = ? AND TABLE_TYPE = 'BASE TABLE'
-            ORDER BY TABLE_NAME
-        """, (schema_filter,))
-
-        table_names = [row[0] for row in cursor.fetchall()]
-
-        # Get columns for each table
-        tables = []
-        for table_name in table_names:
-            cursor.execute("""
-                SELECT
-                    COLUMN_NAME,
-                    DATA_TYPE,
-                    IS_NULLABLE,
-                    ORDINAL_POSITION
-                FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
-                ORDER BY ORDINAL_POSITION
-            """, (schema_filter, table_name))
-
-            columns = [
-                DiscoveredColumn(
-                    name=row[0],
-                    data_type=row[1],
-                    is_nullable=(row[2] == "YES"),
-                    ordinal_position=row[3],
-                )
-                for row in cursor.fetchall()
-            ]
-
-            tables.append(DiscoveredTable(
-                schema=schema_filter,
-                name=table_name,
-                columns=columns,
-            ))
+        tables = group_catalog_rows(rows, schema_filter, include_keys, include_row_counts)
+        logger.debug(f"Discovered {len(tables)} tables in {database}")
 
-        cursor.close()
-        conn.close()
+        return DiscoveredSchema(
+            database=database,
+            tables=tables,
+            include_keys=include_keys,
+            include_row_counts=include_row_counts,
+        )
 
-        return DiscoveredSchema(database=database, tables=tables)
+    def fingerprint(self, schema_filter: str = "ck") -> str:
+        """Compute the schema fingerprint (server-side where supported)."""
+        conn = self._get_connection()
+        try:
+            return fetch_fingerprint(conn, schema_filter, self.dialect)
+        finally:
+            conn.close()
 
     def to_text(self, discovered: DiscoveredSchema) -> str:
         """Convert discovery to human-readable text for agentic processing."""
@@ -124,7 +178,234 @@ class SchemaDiscovery:
         return "\n".join(lines)
 
 
-def discover_schema(connection_string: str, schema_filter: str = "ck") -> DiscoveredSchema:
+class ServerDiscovery:
+    """
+    Discovers the schemas of many databases on one SQL Server at once.
+
+    Reads the catalogs of all requested databases with a generated
+    UNION ALL over each database's sys views, so onboarding hundreds of
+    centers on a shared server costs one round trip per batch instead of
+    one connection and discovery per center.
+    """
+
+    # Each database contributes one query parameter; SQL Server allows 2100
+    BATCH_SIZE = 500
+
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+
+    def _get_connection(self):
+        return get_dialect().connect(self.connection_string)  # SQL Server only
+
+    def list_databases(self, pattern: str = "DentalDB_%") -> list[str]:
+        """Online databases matching a LIKE pattern that we can access."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT name FROM sys.databases
+            WHERE name LIKE ? AND state_desc = 'ONLINE' AND HAS_DBACCESS(name) = 1
+            ORDER BY name
+        """, (pattern,))
+        names = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        conn.close()
+        return names
+
+    def discover_all(
+        self,
+        databases: list[str] | None = None,
+        schema_filter: str = "ck",
+        include_keys: bool = False,
+        include_row_counts: bool = False,
+    ) -> dict[str, DiscoveredSchema]:
+        """
+        Discover every database in one query per batch.
+
+        Args:
+            databases: Database names (None = all DentalDB_* databases).
+                Names that don't exist on the server are skipped.
+
+        Returns:
+            DiscoveredSchema per database name
+        """
+        if databases is None:
+            available = self.list_databases()
+        else:
+            existing = set(self.list_databases("%"))
+            missing = [db for db in databases if db not in existing]
+            if missing:
+                logger.warning(f"Databases not found on server: {', '.join(missing)}")
+            available = [db for db in databases if db in existing]
+
+        results: dict[str, DiscoveredSchema] = {}
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            for i in range(0, len(available), self.BATCH_SIZE):
+                batch = available[i:i + self.BATCH_SIZE]
+                query = "\nUNION ALL\n".join(
+                    f"SELECT N'{db.replace(chr(39), chr(39) * 2)}' AS database_name, * FROM ("
+                    + catalog_query(include_keys, include_row_counts, database=db)
+                    + ") q"
+                    for db in batch
+                )
+                cursor.execute(query, [schema_filter] * len(batch))
+
+                rows_by_db: dict[str, list] = {db: [] for db in batch}
+                for row in cursor.fetchall():
+                    rows_by_db[row.database_name].append(row)
+
+                for db, rows in rows_by_db.items():
+                    results[db] = DiscoveredSchema(
+                        database=db,
+                        tables=group_catalog_rows(
+                            rows, schema_filter, include_keys, include_row_counts
+                        ),
+                        include_keys=include_keys,
+                        include_row_counts=include_row_counts,
+                    )
+        finally:
+            cursor.close()
+            conn.close()
+
+        logger.info(f"Discovered {len(results)} databases server-wide")
+        return results
+
+
+def discover_schema(
+    connection_string: str, schema_filter: str = "ck", dialect: Dialect | None = None
+) -> DiscoveredSchema:
     """Convenience function to discover schema."""
-    discovery = SchemaDiscovery(connection_string)
+    discovery = SchemaDiscovery(connection_string, dialect)
     return discovery.discover(schema_filter)
+
+
+def save_discovery(
+    center_id: str, discovered: DiscoveredSchema, cache_dir: Path | None = None
+) -> Path:
+    """Cache a discovery result on disk."""
+    filepath = (cache_dir or DISCOVERY_DIR) / f"{center_id}_discovery.json"
+
+    data = asdict(discovered)
+    data["fingerprint"] = fingerprint_schema(discovered)
+    return write_json_atomic(filepath, data)
+
+
+def load_discovery(center_id: str, cache_dir: Path | None = None) -> DiscoveredSchema | None:
+    """Load a cached discovery result, or None if not cached."""
+    filepath = (cache_dir or DISCOVERY_DIR) / f"{center_id}_discovery.json"
+    if not filepath.exists():
+        return None
+
+    with open(filepath, encoding="utf-8") as f:
+        data = json.load(f)
+
+    return DiscoveredSchema(
+        database=data["database"],
+        tables=[
+            DiscoveredTable(
+                schema=t["schema"],
+                name=t["name"],
+                columns=[DiscoveredColumn(**c) for c in t["columns"]],
+                row_count=t.get("row_count"),
+            )
+            for t in data["tables"]
+        ],
+        include_keys=data.get("include_keys", False),
+        include_row_counts=data.get("include_row_counts", False),
+    )
+
+
+def discover_cached(
+    center_id: str,
+    connection_string: str,
+    refresh: bool = False,
+    include_keys: bool = False,
+    include_row_counts: bool = False,
+    cache_dir: Path | None = None,
+    dialect: Dialect | None = None,
+) -> DiscoveredSchema:
+    """
+    Discover a center's schema, reusing the on-disk cache when possible.
+
+    The cache is used unless refresh is set, it lacks requested
+    metadata or its fingerprint no longer matches the live schema (one
+    fingerprint query); fresh results are written back to the cache.
+    """
+    discovery = SchemaDiscovery(connection_string, dialect)
+    if not refresh:
+        cached = load_discovery(center_id, cache_dir)
+        if (
+            cached is not None
+            and (cached.include_keys or not include_keys)
+            and (cached.include_row_counts or not include_row_counts)
+        ):
+            if discovery.fingerprint() == fingerprint_schema(cached):
+                return cached
+            logger.info(f"{center_id}: schema changed since the cached discovery, re-discovering")
+
+    discovered = discovery.discover(
+        include_keys=include_keys, include_row_counts=include_row_counts
+    )
+    save_discovery(center_id, discovered, cache_dir)
+    return discovered
+
+
+def fetch_fingerprint(conn, schema_filter: str = "ck", dialect: Dialect | None = None) -> str:
+    """
+    Schema fingerprint on an open connection.
+
+    One query where the database can hash (SQL Server); otherwise
+    computed from the catalog rows.
+    """
+    dialect = dialect or get_dialect()
+    fingerprint = dialect.fingerprint(conn, schema_filter)
+    if fingerprint is None:
+        database, rows = dialect.read_catalog(conn, schema_filter)
+        fingerprint = fingerprint_schema(
+            DiscoveredSchema(database=database, tables=group_catalog_rows(rows, schema_filter))
+        )
+    return fingerprint
+
+
+def fingerprint_schema(discovered: DiscoveredSchema) -> str:
+    """Compute the schema fingerprint from a discovery result."""
+    lines = [
+        f"{table.name}.{col.name}:{col.data_type}:{'YES' if col.is_nullable else 'NO'}"
+        for table in sorted(discovered.tables, key=lambda t: t.name)
+        for col in sorted(table.columns, key=lambda c: c.ordinal_position)
+    ]
+    return hashlib.sha256("\n".join(lines).encode("utf-16-le")).hexdigest()
+
+
+def diff_mapping(mapping: SchemaMapping, discovered: DiscoveredSchema) -> list[str]:
+    """
+    Describe how the live schema breaks a mapping.
+
+    Only mapped tables and columns are compared; changes elsewhere in the
+    schema change the fingerprint but do not affect extraction.
+    """
+    live = {t.name: {c.name: c for c in t.columns} for t in discovered.tables}
+    diff = []
+
+    for canonical, table in sorted(mapping.tables.items()):
+        live_columns = live.get(table.actual_name)
+        if live_columns is None:
+            diff.append(f"- table {canonical} -> {table.actual_name} (missing)")
+            continue
+        for col_canonical, col in sorted(table.columns.items()):
+            live_col = live_columns.get(col.actual_name)
+            if live_col is None:
+                diff.append(
+                    f"- column {canonical}.{col_canonical} -> "
+                    f"{table.actual_name}.{col.actual_name} (missing)"
+                )
+            elif col.data_type and live_col.data_type != col.data_type:
+                diff.append(
+                    f"~ column {canonical}.{col_canonical} -> "
+                    f"{table.actual_name}.{col.actual_name} "
+                    f"({col.data_type} -> {live_col.data_type})"
+                )
+
+    return diff
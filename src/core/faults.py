@@ -0,0 +1,272 @@
+"""
+Fault injection - WAN latency and failures on top of any backend.
+
+Production centers sit behind WAN links (20-200 ms RTT, occasional
+stalls); local SQLite or a LAN SQL Server answer in well under a
+millisecond. A fault profile wraps the configured dialect so every
+connection and query pays what the profile says:
+
+    seed: 42
+    default:
+      connect_ms: 120         # Login handshake
+      rtt_ms: 40              # Per query round trip
+      jitter_ms: 15           # Uniform +/- on every delay
+      bandwidth_kbps: 4000    # Result transfer (0 = unlimited)
+      stall_rate: 0.01        # Share of queries that stall ...
+      stall_ms: 3000          # ... for this long
+      connect_timeout_s: 15   # Longer injected delays raise a timeout
+      query_timeout_s: 30
+      connect_error_rate: 0.0
+      query_error_rate: 0.005
+    centers:                  # Overrides by center ID (or database name)
+      center_07: {rtt_ms: 200, bandwidth_kbps: 500}
+
+Delays are real sleeps (the GIL is released), so worker threads overlap
+as they would on a slow network. Injected failures raise InjectedFault,
+which the pool and adapters treat like driver errors.
+
+Every connection draws from its own RNG, seeded with (seed, database,
+n-th connection to that database), so a profile injects the same faults
+in the same places on every run, regardless of thread scheduling.
+"""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+INJECTED = REGISTRY.counter(
+    "ivoris_injected_faults_total", "Faults injected by the fault profile", ("kind",)
+)
+
+
+class InjectedFault(Exception):
+    """A connection or query failure injected by a fault profile."""
+
+
+class InjectedTimeout(InjectedFault):
+    """An injected delay exceeded the connect or query timeout."""
+
+
+@dataclass
+class FaultSettings:
+    """Latency and failure parameters of one center's link."""
+
+    connect_ms: float = 0.0
+    rtt_ms: float = 0.0
+    jitter_ms: float = 0.0
+    bandwidth_kbps: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 0.0
+    connect_timeout_s: float = 0.0  # 0 = no timeout
+    query_timeout_s: float = 0.0
+    connect_error_rate: float = 0.0
+    query_error_rate: float = 0.0
+
+    def delay_s(self, base_ms: float, rng: random.Random) -> float:
+        """Base delay plus jitter, in seconds."""
+        if self.jitter_ms:
+            base_ms += rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, base_ms) / 1000
+
+    def transfer_s(self, size: int) -> float:
+        """Time to move `size` bytes over the link."""
+        if not self.bandwidth_kbps:
+            return 0.0
+        return size * 8 / (self.bandwidth_kbps * 1000)
+
+
+def _settings(data: dict | None, base: FaultSettings) -> FaultSettings:
+    known = {f.name for f in fields(FaultSettings)}
+    unknown = set(data or {}) - known
+    if unknown:
+        raise ValueError(f"Unknown fault settings: {', '.join(sorted(unknown))}")
+    return replace(base, **(data or {}))
+
+
+def _wait(seconds: float, timeout_s: float, what: str) -> None:
+    """Sleep like a blocked driver call; give up at the timeout."""
+    if timeout_s and seconds > timeout_s:
+        time.sleep(timeout_s)
+        INJECTED.inc(kind="timeout")
+        raise InjectedTimeout(f"Injected {what} timeout after {timeout_s}s")
+    time.sleep(seconds)
+
+
+def _row_size(row) -> int:
+    """Approximate wire size of a result row."""
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in row)
+
+
+class FaultProfile:
+    """Fault settings per database, plus reproducible per-connection RNGs."""
+
+    def __init__(
+        self,
+        default: FaultSettings,
+        databases: dict[str, FaultSettings] | None = None,
+        seed: int = 0,
+        source: str | None = None,
+    ):
+        self.default = default
+        self.databases = databases or {}
+        self.seed = seed
+        self.source = source
+        self._lock = threading.Lock()
+        self._connections: dict[str, int] = {}  # database -> connections opened
+        self._by_connection_string: dict[str, str] = {}
+        self._wrapped: dict[int, "FaultInjectingDialect"] = {}
+
+    @classmethod
+    def load(cls, path: Path, centers=()) -> "FaultProfile":
+        """Read a YAML (or JSON) profile; center IDs are resolved to databases."""
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+
+        default = _settings(data.get("default"), FaultSettings())
+        database_of = {c.id: c.database for c in centers}
+        databases = {
+            database_of.get(key, key): _settings(overrides, default)
+            for key, overrides in (data.get("centers") or {}).items()
+        }
+        return cls(default, databases, seed=int(data.get("seed", 0)), source=str(path))
+
+    def settings(self, database: str) -> FaultSettings:
+        return self.databases.get(database, self.default)
+
+    def wrap(self, dialect) -> "FaultInjectingDialect":
+        """The fault-injecting wrapper of a dialect (one per dialect)."""
+        with self._lock:
+            wrapped = self._wrapped.get(id(dialect))
+            if wrapped is None:
+                wrapped = self._wrapped[id(dialect)] = FaultInjectingDialect(dialect, self)
+            return wrapped
+
+    def register(self, connection_string: str, database: str) -> None:
+        with self._lock:
+            self._by_connection_string[connection_string] = database
+
+    def database_for(self, connection_string: str) -> str:
+        with self._lock:
+            return self._by_connection_string.get(connection_string, connection_string)
+
+    def connection_rng(self, database: str) -> random.Random:
+        with self._lock:
+            n = self._connections.get(database, 0)
+            self._connections[database] = n + 1
+        return random.Random(f"{self.seed}:{database}:{n}")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Profile as recorded in benchmark reports."""
+        return {
+            "source": self.source,
+            "seed": self.seed,
+            "default": asdict(self.default),
+            "databases": {db: asdict(s) for db, s in sorted(self.databases.items())},
+        }
+
+
+class FaultyCursor:
+    """Cursor whose executes pay a round trip and fetches pay bandwidth."""
+
+    def __init__(self, cursor, connection: "FaultyConnection"):
+        self._cursor = cursor
+        self._connection = connection
+
+    def execute(self, sql, *params):
+        conn = self._connection
+        settings, rng = conn.settings, conn.rng
+        delay = settings.delay_s(settings.rtt_ms, rng)
+        if settings.stall_rate and rng.random() < settings.stall_rate:
+            INJECTED.inc(kind="stall")
+            delay += settings.delay_s(settings.stall_ms, rng)
+        _wait(delay, conn.query_timeout_s, "query")
+        if settings.query_error_rate and rng.random() < settings.query_error_rate:
+            INJECTED.inc(kind="query_error")
+            raise InjectedFault("Injected query failure")
+        self._cursor.execute(sql, *params)
+        return self
+
+    def _transfer(self, rows: list) -> list:
+        size = sum(_row_size(row) for row in rows)
+        time.sleep(self._connection.settings.transfer_s(size))
+        return rows
+
+    def fetchall(self) -> list:
+        return self._transfer(self._cursor.fetchall())
+
+    def fetchmany(self, size: int = 1) -> list:
+        return self._transfer(self._cursor.fetchmany(size))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._transfer([row])
+        return row
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)  # description, close, nextset, ...
+
+
+class FaultyConnection:
+    """Connection wrapper handing out FaultyCursors."""
+
+    def __init__(self, conn, settings: FaultSettings, rng: random.Random):
+        self.raw = conn
+        self.settings = settings
+        self.rng = rng
+        self.query_timeout_s = settings.query_timeout_s
+
+    def cursor(self) -> FaultyCursor:
+        return FaultyCursor(self.raw.cursor(), self)
+
+    def __getattr__(self, name: str):
+        return getattr(self.raw, name)  # commit, rollback, close, ...
+
+
+class FaultInjectingDialect:
+    """Dialect wrapper that injects a profile's delays and failures."""
+
+    def __init__(self, dialect, profile: FaultProfile):
+        self.inner = dialect
+        self.profile = profile
+
+    @property
+    def Error(self) -> tuple[type[Exception], ...]:
+        return (self.inner.Error, InjectedFault)
+
+    def connection_string(self, db_config, database: str) -> str:
+        connection_string = self.inner.connection_string(db_config, database)
+        self.profile.register(connection_string, database)
+        return connection_string
+
+    def connect(self, connection_string: str, timeout: int | None = None, **kwargs):
+        database = self.profile.database_for(connection_string)
+        settings = self.profile.settings(database)
+        rng = self.profile.connection_rng(database)
+
+        timeouts = [t for t in (settings.connect_timeout_s, timeout) if t]
+        _wait(settings.delay_s(settings.connect_ms, rng), min(timeouts, default=0), "connect")
+        if settings.connect_error_rate and rng.random() < settings.connect_error_rate:
+            INJECTED.inc(kind="connect_error")
+            raise InjectedFault(f"Injected connection failure to {database}")
+
+        conn = self.inner.connect(connection_string, timeout, **kwargs)
+        return FaultyConnection(conn, settings, rng)
+
+    def set_query_timeout(self, conn: FaultyConnection, seconds: int) -> None:
+        timeouts = [t for t in (conn.settings.query_timeout_s, seconds) if t]
+        conn.query_timeout_s = min(timeouts, default=0)
+        self.inner.set_query_timeout(conn.raw, seconds)
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)  # name, quote_name, limit, read_catalog, ...
@@ -8,12 +8,17 @@ The mappings are created through:
 1. Raw discovery (discovery.py) - finds tables/columns
 2. Agentic mapping (agentic_mapper.py) - identifies canonical names
 3. Saved to data/mappings/<center_id>_mapping.json
+4. Optionally compiled into data/mappings.bundle (compile-mappings)
 """
 
 import json
 import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
+from .mapping_bundle import MappingBundle, default_bundle_path, open_bundle
 from .schema_mapping import ColumnMapping, SchemaMapping, TableMapping
 
 logger = logging.getLogger(__name__)
@@ -50,6 +55,7 @@ def mapping_to_schema(mapping_data: dict) -> SchemaMapping:
             columns[canonical_col] = ColumnMapping(
                 canonical_name=canonical_col,
                 actual_name=col_data["actual_name"],
+                data_type=col_data.get("data_type"),
             )
 
         tables[canonical_table] = TableMapping(
@@ -62,11 +68,168 @@ def mapping_to_schema(mapping_data: dict) -> SchemaMapping:
         schema=mapping_data.get("schema", "ck"),
         suffix="AGENTIC",  # Indicates mapping came from agentic process
         tables=tables,
+        fingerprint=mapping_data.get("schema_fingerprint"),
     )
 
 
-# Cache for schema mappings per center
-_schema_cache: dict[str, SchemaMapping] = {}
+@dataclass
+class CacheStats:
+    """Counters for the mapping cache."""
+
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    coalesced: int = 0  # callers that waited on another thread's load
+    invalidations: int = 0
+    bundle_loads: int = 0  # loads served from the compiled bundle
+
+
+@dataclass
+class _CacheEntry:
+    schema: SchemaMapping
+    mtime_ns: int
+    size: int
+
+
+class MappingCache:
+    """
+    Thread-safe cache of schema mappings per center.
+
+    - Single-flight: concurrent requests for the same center share one
+      load; other threads wait for its result instead of parsing again.
+    - Hot reload: every lookup stats the mapping file and reloads it when
+      mtime or size changed, so reviewed edits are picked up without a
+      restart. Unchanged files are never re-parsed.
+    - Bundle: loads come from the compiled mapping bundle (with its
+      precomputed SQL) while it is fresh, falling back to the JSON file.
+    """
+
+    def __init__(self, mappings_dir: Path | None = None, bundle_path: Path | None = None):
+        self.mappings_dir = mappings_dir or MAPPINGS_DIR
+        self.bundle_path = bundle_path or default_bundle_path(self.mappings_dir)
+        self._entries: dict[str, _CacheEntry] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._bundle: MappingBundle | None = None
+        self._bundle_key: tuple[int, int] | None = None
+
+    def _get_bundle(self) -> MappingBundle | None:
+        """
+        Current bundle, reopened when the bundle file is recompiled.
+
+        Must hold the lock, and so must every read of the returned
+        bundle: the replaced bundle's mmap is closed here, which is only
+        safe while no other thread can be reading from it.
+        """
+        try:
+            stat = self.bundle_path.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = None
+
+        if key != self._bundle_key:
+            old = self._bundle
+            self._bundle = open_bundle(self.bundle_path) if key else None
+            self._bundle_key = key
+            if old is not None:
+                old.close()
+        return self._bundle
+
+    def _load(self, center_id: str, stat) -> SchemaMapping:
+        with self._lock:
+            bundle = self._get_bundle()
+            payload = bundle.lookup(center_id, stat) if bundle else None
+            if payload is not None:
+                self._stats.bundle_loads += 1
+        if payload is not None:
+            schema = mapping_to_schema(payload["mapping"])
+            schema.compiled_sql = payload["sql"]
+            return schema
+        return mapping_to_schema(load_mapping_file(center_id, self.mappings_dir))
+
+    def list_available(self) -> list[str]:
+        """Center IDs with a mapping, from the bundle index when fresh."""
+        with self._lock:
+            bundle = self._get_bundle()
+            center_ids = bundle.center_ids(self.mappings_dir) if bundle else None
+        if center_ids is not None:
+            return center_ids
+        return _glob_mappings(self.mappings_dir)
+
+    def _path(self, center_id: str) -> Path:
+        return self.mappings_dir / f"{center_id}_mapping.json"
+
+    def get(self, center_id: str) -> SchemaMapping:
+        """Get the mapping for a center, loading or reloading as needed."""
+        try:
+            stat = self._path(center_id).stat()
+        except FileNotFoundError:
+            self.invalidate(center_id)
+            raise FileNotFoundError(
+                f"No mapping file for {center_id}. "
+                f"Run 'python -m src.cli generate-mappings' first."
+            ) from None
+
+        with self._lock:
+            entry = self._entries.get(center_id)
+            if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                self._stats.hits += 1
+                return entry.schema
+
+            future = self._inflight.get(center_id)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[center_id] = future
+                if entry is None:
+                    self._stats.misses += 1
+                else:
+                    self._stats.reloads += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            if entry is None:
+                logger.info(f"Loading mapping for {center_id}")
+            else:
+                logger.info(f"Mapping for {center_id} changed on disk, reloading")
+            schema = self._load(center_id, stat)
+            logger.info(f"Loaded {len(schema.tables)} tables")
+
+            with self._lock:
+                self._entries[center_id] = _CacheEntry(
+                    schema=schema, mtime_ns=stat.st_mtime_ns, size=stat.st_size
+                )
+            future.set_result(schema)
+            return schema
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(center_id, None)
+
+    def invalidate(self, center_id: str | None = None) -> None:
+        """Drop one center's mapping (or all with None) from the cache."""
+        with self._lock:
+            if center_id is None:
+                self._stats.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(center_id, None) is not None:
+                self._stats.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of cache counters plus the number of cached centers."""
+        with self._lock:
+            return {**asdict(self._stats), "cached": len(self._entries)}
+
+
+# Process-wide mapping cache shared by all extraction threads
+_mapping_cache = MappingCache()
 
 
 def get_schema(center_id: str, connection_string: str = None) -> SchemaMapping:
@@ -83,25 +246,20 @@ def get_schema(center_id: str, connection_string: str = None) -> SchemaMapping:
     Returns:
         SchemaMapping for the center
     """
-    if center_id not in _schema_cache:
-        logger.info(f"Loading mapping for {center_id}")
-        mapping_data = load_mapping_file(center_id)
-        _schema_cache[center_id] = mapping_to_schema(mapping_data)
-        logger.info(f"Loaded {len(_schema_cache[center_id].tables)} tables")
+    return _mapping_cache.get(center_id)
 
-    return _schema_cache[center_id]
 
+def invalidate(center_id: str | None = None) -> None:
+    """Invalidate a cached mapping (all mappings if center_id is None)."""
+    _mapping_cache.invalidate(center_id)
 
-def clear_cache():
-    """Clear the schema cache."""
-    _schema_cache.clear()
 
+def cache_stats() -> dict[str, int]:
+    """Hit/miss/reload counters of the mapping cache."""
+    return _mapping_cache.stats()
 
-def list_available_mappings(mappings_dir: Path | None = None) -> list[str]:
-    """List all available mapping files."""
-    if mappings_dir is None:
-        mappings_dir = MAPPINGS_DIR
 
+def _glob_mappings(mappings_dir: Path) -> list[str]:
     if not mappings_dir.exists():
         return []
 
@@ -109,3 +267,10 @@ def list_available_mappings(mappings_dir: Path | None = None) -> list[str]:
         f.stem.replace("_mapping", "")
         for f in mappings_dir.glob("*_mapping.json")
     ]
+
+
+def list_available_mappings(mappings_dir: Path | None = None) -> list[str]:
+    """List all available mapping files."""
+    if mappings_dir is None or mappings_dir == _mapping_cache.mappings_dir:
+        return _mapping_cache.list_available()
+    return _glob_mappings(mappings_dir)
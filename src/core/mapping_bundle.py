@@ -0,0 +1,173 @@
+"""
+Precompiled mapping bundle.
+
+Packs every center's mapping file plus its rendered extraction SQL
+into a single binary file that is memory-mapped at startup, so a
+process serving hundreds of centers does one open instead of a glob
+and one JSON parse per center.
+
+Layout (little-endian):
+
+    header   MAGIC, format version, marshal version, center count,
+             mappings dir mtime_ns, index length
+    index    per center: id, source mtime_ns, source size, offset, length
+    payload  per center: marshal({"mapping": <json data>, "sql": {...}})
+
+Staleness is checked per center: an entry is only used while the JSON
+file still has the mtime and size recorded at compile time. The center
+list is only taken from the bundle while the mappings directory itself
+is unchanged (no files added, removed or replaced).
+"""
+
+import json
+import logging
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .queries import compile_queries
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IVMB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIqI")
+_INDEX_ENTRY = struct.Struct("<qqQI")  # mtime_ns, size, offset, length (after id)
+_ID_LEN = struct.Struct("<H")
+
+
+def default_bundle_path(mappings_dir: Path) -> Path:
+    """Bundle lives next to (not inside) the mappings directory."""
+    return mappings_dir.parent / "mappings.bundle"
+
+
+@dataclass
+class _IndexEntry:
+    mtime_ns: int
+    size: int
+    offset: int
+    length: int
+
+
+class MappingBundle:
+    """Read-only, memory-mapped view of a compiled mapping bundle."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, marshal_version, count, dir_mtime_ns, index_len = (
+            _HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a mapping bundle")
+        if version != FORMAT_VERSION or marshal_version != marshal.version:
+            raise ValueError(
+                f"{path} has format {version}/{marshal_version}, "
+                f"expected {FORMAT_VERSION}/{marshal.version}"
+            )
+
+        self.dir_mtime_ns = dir_mtime_ns
+        self.index: dict[str, _IndexEntry] = {}
+
+        pos = _HEADER.size
+        for _ in range(count):
+            (id_len,) = _ID_LEN.unpack_from(self._mm, pos)
+            pos += _ID_LEN.size
+            center_id = self._mm[pos:pos + id_len].decode("utf-8")
+            pos += id_len
+            self.index[center_id] = _IndexEntry(*_INDEX_ENTRY.unpack_from(self._mm, pos))
+            pos += _INDEX_ENTRY.size
+
+        if pos != _HEADER.size + index_len:
+            raise ValueError(f"{path} has a corrupt index")
+
+    def center_ids(self, mappings_dir: Path) -> list[str] | None:
+        """Center IDs, or None if the directory changed since compile."""
+        try:
+            if mappings_dir.stat().st_mtime_ns != self.dir_mtime_ns:
+                return None
+        except FileNotFoundError:
+            return None
+        return list(self.index)
+
+    def lookup(self, center_id: str, stat: os.stat_result) -> dict | None:
+        """Payload for a center if its source file is unchanged, else None."""
+        entry = self.index.get(center_id)
+        if entry is None:
+            return None
+        if (entry.mtime_ns, entry.size) != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return marshal.loads(self._mm[entry.offset:entry.offset + entry.length])
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def open_bundle(path: Path) -> MappingBundle | None:
+    """Open a bundle, or None if missing or unreadable (JSON fallback)."""
+    if not path.exists():
+        return None
+    try:
+        return MappingBundle(path)
+    except (ValueError, struct.error, OSError) as e:
+        logger.warning(f"Ignoring mapping bundle: {e}")
+        return None
+
+
+def compile_bundle(mappings_dir: Path, bundle_path: Path | None = None) -> Path:
+    """Compile all *_mapping.json files into a bundle."""
+    from .introspector import mapping_to_schema
+
+    bundle_path = bundle_path or default_bundle_path(mappings_dir)
+    dir_mtime_ns = mappings_dir.stat().st_mtime_ns
+
+    entries = []
+    for filepath in sorted(mappings_dir.glob("*_mapping.json")):
+        center_id = filepath.stem.replace("_mapping", "")
+        stat = filepath.stat()
+        with open(filepath, encoding="utf-8") as f:
+            data = json.load(f)
+
+        payload = marshal.dumps({
+            "mapping": data,
+            "sql": compile_queries(mapping_to_schema(data)),
+        })
+        entries.append((center_id.encode("utf-8"), stat, payload))
+
+    # Payload offsets are absolute, so size the index first
+    index_len = sum(_ID_LEN.size + len(cid) + _INDEX_ENTRY.size for cid, _, _ in entries)
+    offset = _HEADER.size + index_len
+
+    index = bytearray()
+    for encoded_id, stat, payload in entries:
+        index += _ID_LEN.pack(len(encoded_id)) + encoded_id
+        index += _INDEX_ENTRY.pack(stat.st_mtime_ns, stat.st_size, offset, len(payload))
+        offset += len(payload)
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, marshal.version, len(entries), dir_mtime_ns, index_len
+    )
+
+    # Write atomically so running processes never map a partial file
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=bundle_path.parent, prefix=".mappings-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(index)
+            for _, _, payload in entries:
+                f.write(payload)
+        os.replace(tmp, bundle_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    logger.info(f"Compiled {len(entries)} mappings into {bundle_path}")
+    return bundle_path
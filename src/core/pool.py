@@ -0,0 +1,165 @@
+"""
+Database connection pool.
+
+Keeps idle connections per center database so repeated work
+(web requests, scheduled extractions) does not pay for a new login
+each time. Connections are handed out LIFO, rolled back on return,
+and replaced when they sat idle too long or failed during use.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from .config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Counters of one database's connections."""
+
+    created: int = 0
+    reused: int = 0
+    discarded: int = 0
+    in_use: int = 0
+    idle: int = 0
+
+
+class ConnectionPool:
+    """Per-database pool of connections of the configured backend."""
+
+    def __init__(
+        self,
+        db_config: DatabaseConfig,
+        max_idle: int = 4,
+        max_idle_s: float = 300.0,
+        connect_timeout: int = 10,
+    ):
+        self.db_config = db_config
+        self.dialect = db_config.dialect
+        self.max_idle = max_idle
+        self.max_idle_s = max_idle_s
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[tuple[Any, float]]] = {}
+        self._stats: dict[str, PoolStats] = {}
+        self._closed = False
+
+    def _stats_for(self, database: str) -> PoolStats:
+        stats = self._stats.get(database)
+        if stats is None:
+            stats = self._stats[database] = PoolStats()
+        return stats
+
+    def acquire(self, database: str) -> Any:
+        """Take an idle connection or open a new one."""
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            stats = self._stats_for(database)
+            idle = self._idle.get(database, [])
+            while idle:
+                candidate, returned_at = idle.pop()
+                if now - returned_at <= self.max_idle_s:
+                    conn = candidate
+                    break
+                expired.append(candidate)
+            stats.discarded += len(expired)
+            stats.idle = len(idle)
+            stats.in_use += 1
+            if conn is not None:
+                stats.reused += 1
+
+        for candidate in expired:
+            self._close_quietly(candidate)
+
+        if conn is not None:
+            return conn
+
+        try:
+            conn = self.dialect.connect(
+                self.db_config.connection_string(database), timeout=self.connect_timeout
+            )
+        except BaseException:
+            with self._lock:
+                stats.in_use -= 1
+            raise
+        with self._lock:
+            stats.created += 1
+        logger.debug(f"Opened pooled connection to {database}")
+        return conn
+
+    def release(self, database: str, conn: Any, discard: bool = False) -> None:
+        """Return a connection; discarded ones (e.g. after errors) are closed."""
+        if not discard:
+            try:
+                conn.rollback()  # No open transaction leaks to the next user
+            except self.dialect.Error:
+                discard = True
+
+        with self._lock:
+            stats = self._stats_for(database)
+            stats.in_use -= 1
+            idle = self._idle.setdefault(database, [])
+            if not discard and not self._closed and len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                stats.idle = len(idle)
+                return
+            stats.discarded += 1
+
+        self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, database: str) -> Iterator[Any]:
+        """Borrow a connection for the duration of a with-block."""
+        conn = self.acquire(database)
+        try:
+            yield conn
+        except self.dialect.Error:
+            self.release(database, conn, discard=True)
+            raise
+        except BaseException:
+            self.release(database, conn)
+            raise
+        else:
+            self.release(database, conn)
+
+    def warm(self, databases: list[str], size: int = 1) -> None:
+        """Open up to `size` idle connections per database ahead of use."""
+        for database in databases:
+            conns = []
+            try:
+                for _ in range(min(size, self.max_idle)):
+                    conns.append(self.acquire(database))
+            except self.dialect.Error as e:
+                logger.warning(f"Could not warm pool for {database}: {e}")
+            for conn in conns:
+                self.release(database, conn)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Counters per database."""
+        with self._lock:
+            return {db: vars(s).copy() for db, s in sorted(self._stats.items())}
+
+    def close(self) -> None:
+        """Close all idle connections; ones in use are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle = [conn for conns in self._idle.values() for conn, _ in conns]
+            self._idle.clear()
+            for stats in self._stats.values():
+                stats.idle = 0
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def _close_quietly(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except self.dialect.Error:
+            pass
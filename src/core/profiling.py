@@ -0,0 +1,274 @@
+"""
+Profiling - cProfile, tracemalloc and stack samples of one run.
+
+`--profile` (CLI) and the `X-Profile: 1` header (web) run a command
+under a RunProfiler, which writes to data/output/profiles/<run-id>/:
+
+- profile.pstats    cProfile stats of all threads, merged
+                    (python -m pstats, snakeviz, gprof2dot)
+- stacks.collapsed  wall-clock stack samples, one "a;b;c count" line
+                    per stack (flamegraph.pl, speedscope, inferno)
+- summary.txt       top functions by cumulative and own time, top
+                    allocations by line, peak traced memory
+
+cProfile only sees the thread that enabled it. Before Python 3.12,
+pools wrap the work they submit with propagate(): work handed over by
+a profiled thread runs under its own profiler, which the worker
+disables again when the work item returns (a profiler can only be
+removed from its own thread). The stats are merged at the end. Other
+threads, such as concurrent web requests or long-lived executor
+threads, are never profiled. From 3.12 on, cProfile hooks all threads
+by itself.
+
+cProfile measures CPU-bound code well but hides time spent waiting on
+the database. The stack sampler records what every thread is doing
+every few milliseconds, blocked or not, so the flamegraph shows where
+the wall time goes. Thread names (minus their pool index) are the
+root frames.
+
+Only one run is profiled at a time; a second one waits until the
+first has finished.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent.parent
+PROFILES_DIR = ROOT / "data" / "output" / "profiles"
+
+SAMPLE_INTERVAL_S = 0.005
+TOP_N = 25
+
+# cProfile uses sys.monitoring from 3.12 on, which covers all threads
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+_active = threading.Lock()
+_local = threading.local()  # .profiler: RunProfiler of the current thread
+
+T = TypeVar("T")
+
+
+@dataclass
+class ProfileReport:
+    """Where a profiled run's output went, plus headline numbers."""
+
+    run_id: str
+    directory: Path
+    wall_s: float
+    threads: int
+    samples: int
+    peak_memory_bytes: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "directory": str(self.directory),
+            "wall_s": round(self.wall_s, 3),
+            "threads": self.threads,
+            "samples": self.samples,
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+
+def propagate(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    func for another thread, profiled there when the calling thread is.
+
+    Before 3.12, wrap work submitted to a pool with this; otherwise (or
+    outside a profiled run) func is returned unchanged.
+    """
+    run = getattr(_local, "profiler", None)
+    if run is None or not PER_THREAD_PROFILERS:
+        return func
+
+    def profiled(*args, **kwargs):
+        if run._stop.is_set() or getattr(_local, "profiler", None) is run:
+            return func(*args, **kwargs)  # Run over, or already profiled here
+        profiler = run._add_profiler()
+        _local.profiler = run  # Its own submissions are profiled too
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _local.profiler = None
+
+    return profiled
+
+
+def _frame_name(code, names: dict) -> str:
+    """'func (src/module.py:12)', memoized per code object."""
+    name = names.get(code)
+    if name is None:
+        path = Path(code.co_filename)
+        try:
+            path = path.relative_to(ROOT)
+        except ValueError:
+            path = Path(*path.parts[-2:])
+        name = names[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+    return name
+
+
+def _thread_group(name: str) -> str:
+    """'ThreadPoolExecutor-0_3' -> 'ThreadPoolExecutor'"""
+    return re.sub(r"[-_\d]+$", "", name) or name
+
+
+class RunProfiler:
+    """Profiles everything the process does between start() and stop()."""
+
+    def __init__(self, name: str, output_dir: Path | None = None, sample_interval_s: float = SAMPLE_INTERVAL_S):
+        self.name = name
+        self.output_dir = output_dir or PROFILES_DIR
+        self.sample_interval_s = sample_interval_s
+        self.report: ProfileReport | None = None
+        self._lock = threading.Lock()
+        self._profilers: list[cProfile.Profile] = []
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._threads: set[int] = set()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._own_tracemalloc = False
+        self._started = 0.0
+
+    def __enter__(self) -> "RunProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _add_profiler(self) -> cProfile.Profile:
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(profiler)
+        profiler.enable()
+        return profiler
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        frame_names: dict = {}
+        while not self._stop.wait(self.sample_interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self._threads.add(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code, frame_names))
+                    frame = frame.f_back
+                stack.append(_thread_group(names.get(ident, "thread")))
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def start(self) -> None:
+        _active.acquire()
+        self._started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        tracemalloc.reset_peak()
+
+        # Started first, so it is not profiled itself
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+        _local.profiler = self
+        self._add_profiler()
+
+    def stop(self) -> ProfileReport:
+        """Stop profiling and write the output files."""
+        try:
+            _local.profiler = None
+            self._stop.set()
+            self._sampler.join()
+            wall_s = time.perf_counter() - self._started
+
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+
+            # Work items still running keep their profiler until they
+            # return; Stats() takes a snapshot of what each one has so far
+            with self._lock:
+                profilers = list(self._profilers)
+            profilers[0].disable()
+            stats = pstats.Stats(profilers[0])
+            for profiler in profilers[1:]:
+                stats.add(profiler)
+
+            directory = self._run_directory()
+            stats.dump_stats(directory / "profile.pstats")
+            with open(directory / "stacks.collapsed", "w", encoding="utf-8") as f:
+                for stack, count in sorted(self._stacks.items()):
+                    f.write(f"{stack} {count}\n")
+
+            self.report = ProfileReport(
+                run_id=directory.name,
+                directory=directory,
+                wall_s=wall_s,
+                threads=len(self._threads),
+                samples=self._samples,
+                peak_memory_bytes=peak,
+            )
+            with open(directory / "summary.txt", "w", encoding="utf-8") as f:
+                f.write(self._summary(stats, snapshot))
+        finally:
+            _active.release()
+
+        logger.info(f"Profile written to {self.report.directory}")
+        return self.report
+
+    def _run_directory(self) -> Path:
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{self.name}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        directory, n = self.output_dir / run_id, 1
+        while True:
+            try:
+                directory.mkdir()
+                return directory
+            except FileExistsError:
+                n += 1
+                directory = self.output_dir / f"{run_id}-{n}"
+
+    def _summary(self, stats: pstats.Stats, snapshot: tracemalloc.Snapshot) -> str:
+        report = self.report
+        out = io.StringIO()
+        out.write(f"Profile: {report.run_id}\n")
+        out.write(f"Run: {self.name}\n")
+        out.write(
+            f"Wall time: {report.wall_s:.2f}s  Threads: {report.threads}  "
+            f"Stack samples: {report.samples} (every {self.sample_interval_s * 1000:.0f}ms)\n"
+        )
+        out.write(f"Peak traced memory: {report.peak_memory_bytes / 1e6:.1f} MB\n")
+
+        stats.stream = out
+        for key, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            out.write(f"\n{'='*60}\nTop {TOP_N} functions by {title}\n{'='*60}\n")
+            stats.sort_stats(key).print_stats(TOP_N)
+
+        out.write(f"\n{'='*60}\nTop {TOP_N} allocations (live at the end, by line)\n{'='*60}\n")
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            frame = stat.traceback[0]
+            out.write(f"  {stat.size / 1e3:10.1f} KB {stat.count:8} blocks  {frame.filename}:{frame.lineno}\n")
+        return out.getvalue()
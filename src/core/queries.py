@@ -0,0 +1,87 @@
+"""
+Extraction queries.
+
+Builds the SQL used by the center adapter from a schema mapping.
+The same builders are used at runtime and by `compile-mappings`,
+which stores the rendered SQL in the mapping bundle.
+"""
+
+from .schema_mapping import SchemaMapping
+
+# Keys of SchemaMapping.compiled_sql
+CHART_ENTRIES = "chart_entries"
+SERVICES = "services"
+
+
+def chart_entries_query(s: SchemaMapping) -> str:
+    """Chart entries for one date (parameter: Ivoris date int)."""
+    # Get actual column names
+    k_patnr = s.get_column("KARTEI", "PATNR")
+    k_datum = s.get_column("KARTEI", "DATUM")
+    k_bemerkung = s.get_column("KARTEI", "BEMERKUNG")
+    k_delkz = s.get_column("KARTEI", "DELKZ")
+
+    pk_patnr = s.get_column("PATKASSE", "PATNR")
+    pk_kassenid = s.get_column("PATKASSE", "KASSENID")
+
+    ka_id = s.get_column("KASSEN", "ID")
+    ka_name = s.get_column("KASSEN", "NAME")
+    ka_art = s.get_column("KASSEN", "ART")
+
+    # Get actual table names
+    t_kartei = s.get_table("KARTEI")
+    t_patient = s.get_table("PATIENT")
+    t_patkasse = s.get_table("PATKASSE")
+    t_kassen = s.get_table("KASSEN")
+
+    return f"""
+        SELECT
+            k.ID as KARTEI_ID,
+            k.{k_patnr} as PATNR,
+            k.{k_datum} as DATUM,
+            k.{k_bemerkung} as BEMERKUNG,
+            ka.{ka_name} as KASSE_NAME,
+            ka.{ka_art} as KASSE_ART
+        FROM ck.{t_kartei} k
+        LEFT JOIN ck.{t_patient} p ON k.{k_patnr} = p.ID
+        LEFT JOIN ck.{t_patkasse} pk ON k.{k_patnr} = pk.{pk_patnr}
+        LEFT JOIN ck.{t_kassen} ka ON pk.{pk_kassenid} = ka.{ka_id}
+        WHERE k.{k_datum} = ?
+        AND (k.{k_delkz} = 0 OR k.{k_delkz} IS NULL)
+        ORDER BY k.{k_patnr}, k.ID
+    """
+
+
+def services_query(s: SchemaMapping) -> str:
+    """Service codes for one date (parameter: Ivoris date int)."""
+    t_leistung = s.get_table("LEISTUNG")
+    l_patientid = s.get_column("LEISTUNG", "PATIENTID")
+    l_datum = s.get_column("LEISTUNG", "DATUM")
+    l_leistung = s.get_column("LEISTUNG", "LEISTUNG")
+    l_delkz = s.get_column("LEISTUNG", "DELKZ")
+
+    return f"""
+        SELECT {l_patientid} as PATIENTID, {l_leistung} as LEISTUNG
+        FROM ck.{t_leistung}
+        WHERE {l_datum} = ?
+        AND ({l_delkz} = 0 OR {l_delkz} IS NULL)
+    """
+
+
+BUILDERS = {
+    CHART_ENTRIES: chart_entries_query,
+    SERVICES: services_query,
+}
+
+
+def compile_queries(s: SchemaMapping) -> dict[str, str]:
+    """Render all extraction queries for a mapping."""
+    return {name: build(s) for name, build in BUILDERS.items()}
+
+
+def get_query(s: SchemaMapping, name: str) -> str:
+    """Precompiled SQL from the mapping bundle, or build it now."""
+    sql = s.compiled_sql.get(name)
+    if sql is None:
+        sql = BUILDERS[name](s)
+    return sql
@@ -14,6 +14,7 @@ class ColumnMapping:
 
     canonical_name: str
     actual_name: str
+    data_type: str | None = None  # As discovered; used for drift diffs
 
 
 @dataclass
@@ -38,6 +39,11 @@ class SchemaMapping:
     schema: str  # Database schema (e.g., 'ck')
     suffix: str  # Suffix indicator (or 'RANDOM' for varied)
     tables: dict[str, TableMapping] = field(default_factory=dict)
+    compiled_sql: dict[str, str] = field(default_factory=dict)  # From mapping bundle
+    fingerprint: str | None = None  # Schema fingerprint at discovery time
+    # Other live fingerprints already found to leave mapped columns intact;
+    # a reloaded mapping file starts empty
+    compatible_fingerprints: set[str] = field(default_factory=set, compare=False)
 
     def get_table(self, canonical: str) -> str:
         """Get actual table name from canonical name."""
@@ -0,0 +1,144 @@
+"""
+Timeline traces - extraction runs in the Chrome Trace Event format.
+
+A run's total duration hides how the pool spent it: idle workers,
+centers waiting for a connection, or a queue stuck behind one slow
+center. A TraceRecorder collects spans while the run executes and
+writes them as a Trace Event JSON file, which chrome://tracing and
+https://ui.perfetto.dev open directly:
+
+- one lane per thread: the calling thread holds the run and export
+  spans, each pool worker the centers it extracted
+- a span per center, with its phases (see extraction.PHASES) nested
+  inside in the order they ran; the center span's args carry how long
+  it queued before a worker picked it up
+- a "centers" counter track with queued and running centers over time
+
+Timestamps are perf_counter offsets from the recorder's creation.
+Recording is a locked list append per span; services only record when
+a recorder is passed in.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent.parent
+TRACES_DIR = ROOT / "data" / "output" / "traces"
+KEEP_TRACES = 50  # Older files in TRACES_DIR are deleted on write
+
+
+class TraceRecorder:
+    """Collects spans and counters of one run from any thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._lanes: dict[str, int] = {}  # Thread name -> tid
+        self._queued = 0
+        self._running = 0
+
+        self._pid = os.getpid()
+        self._events.append(
+            {"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0, "args": {"name": name}}
+        )
+        with self._lock:
+            self._lane()  # The creating thread gets the first lane
+
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _lane(self) -> int:
+        """tid of the current thread; must hold the lock."""
+        # Keyed by name: idents are reused by later pools, names are not
+        name = threading.current_thread().name
+        tid = self._lanes.get(name)
+        if tid is None:
+            tid = self._lanes[name] = len(self._lanes) + 1
+            for meta, args in (("thread_name", {"name": name}), ("thread_sort_index", {"sort_index": tid})):
+                self._events.append({"name": meta, "ph": "M", "pid": self._pid, "tid": tid, "args": args})
+        return tid
+
+    def span(self, name: str, start: float, end: float, cat: str = "extract", **args) -> None:
+        """A complete span on the current thread's lane (perf_counter times)."""
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            event["tid"] = self._lane()
+            self._events.append(event)
+
+    @contextmanager
+    def timed(self, name: str, cat: str = "extract", **args) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.span(name, start, time.perf_counter(), cat, **args)
+
+    def _count(self, queued: int = 0, running: int = 0) -> None:
+        with self._lock:
+            now = self._us(time.perf_counter())
+            self._queued += queued
+            self._running += running
+            self._events.append({
+                "name": "centers",
+                "ph": "C",
+                "ts": now,
+                "pid": self._pid,
+                "args": {"queued": self._queued, "running": self._running},
+            })
+
+    def tasks_queued(self, count: int) -> None:
+        self._count(queued=count)
+
+    def task_started(self) -> None:
+        self._count(queued=-1, running=1)
+
+    def task_finished(self) -> None:
+        self._count(running=-1)
+
+    def task_dropped(self, count: int) -> None:
+        """Queued tasks that were cancelled before they started."""
+        if count:
+            self._count(queued=-count)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            events = list(self._events)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path | None = None) -> Path:
+        """Write the trace; default path is TRACES_DIR/<name>_<timestamp>.json."""
+        if path is None:
+            TRACES_DIR.mkdir(parents=True, exist_ok=True)
+            path = TRACES_DIR / f"{self.name}_{datetime.now():%Y%m%d-%H%M%S-%f}.json"
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+        if path.parent == TRACES_DIR:
+            for old in sorted(TRACES_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)[:-KEEP_TRACES]:
+                old.unlink(missing_ok=True)
+
+        logger.info(f"Trace written to {path}")
+        return path
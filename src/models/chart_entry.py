@@ -3,17 +3,48 @@ Canonical ChartEntry model.
 
 This is the unified data model that all centers map to,
 regardless of their underlying schema names.
+
+Two representations are provided:
+
+- ChartEntry: one object per entry (slotted, strings interned)
+- ChartEntryBatch: columnar storage for all entries of one center
+  and date, filled directly by the adapter and read column-wise
+  by the exporters
 """
 
+import sys
+from array import array
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any
+from typing import Any, Iterable, Iterator
+
+# Field order shared by JSON and CSV output
+FIELDS = (
+    "center_id",
+    "center_name",
+    "date",
+    "patient_id",
+    "insurance_status",
+    "insurance_name",
+    "chart_entry",
+    "service_codes",
+)
+
+# Stand-in for a NULL patient number inside the int64 column
+_NULL_PATIENT = -(2**63)
 
 
-@dataclass
+def _intern(value: str | None) -> str | None:
+    """Intern a string so repeated values share one object."""
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+@dataclass(slots=True)
 class ChartEntry:
     """Canonical chart entry from any dental center."""
-    
+
     center_id: str
     center_name: str
     date: date
@@ -23,6 +54,13 @@ class ChartEntry:
     chart_entry: str
     service_codes: list[str] = field(default_factory=list)
 
+    def __post_init__(self):
+        # Center and insurance values repeat across thousands of entries
+        self.center_id = _intern(self.center_id)
+        self.center_name = _intern(self.center_name)
+        self.insurance_status = _intern(self.insurance_status)
+        self.insurance_name = _intern(self.insurance_name)
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON output."""
         return {
@@ -48,3 +86,184 @@ class ChartEntry:
             "chart_entry": self.chart_entry,
             "service_codes": ",".join(self.service_codes),
         }
+
+
+class ChartEntryBatch:
+    """
+    Columnar chart entries for a single center and date.
+
+    Center and date are stored once per batch. Per-entry fields live in
+    parallel columns. Service codes are kept in one flat list; each
+    patient's codes are registered once and every entry of that patient
+    references them through (start, end) offsets.
+
+    Iterating a batch yields ChartEntry objects, so code that only needs
+    len() or per-entry access keeps working unchanged.
+    """
+
+    __slots__ = (
+        "center_id",
+        "center_name",
+        "date",
+        "patient_ids",
+        "insurance_status",
+        "insurance_names",
+        "chart_entries",
+        "service_codes",
+        "service_starts",
+        "service_ends",
+        "_service_spans",
+    )
+
+    def __init__(self, center_id: str, center_name: str, target_date: date):
+        self.center_id = _intern(center_id)
+        self.center_name = _intern(center_name)
+        self.date = target_date
+
+        # One column per entry field
+        self.patient_ids = array("q")
+        self.insurance_status: list[str] = []
+        self.insurance_names: list[str | None] = []
+        self.chart_entries: list[str] = []
+
+        # Shared service codes plus per-entry offsets into them
+        self.service_codes: list[str] = []
+        self.service_starts = array("l")
+        self.service_ends = array("l")
+        self._service_spans: dict[int | None, tuple[int, int]] = {}
+
+    def add_services(self, patient_id: int | None, codes: Iterable[str]) -> None:
+        """Register the service codes of a patient (before appending entries)."""
+        start = len(self.service_codes)
+        self.service_codes.extend(_intern(code) for code in codes)
+        self._service_spans[patient_id] = (start, len(self.service_codes))
+
+    def append(
+        self,
+        patient_id: int | None,
+        insurance_status: str,
+        insurance_name: str | None,
+        chart_entry: str,
+    ) -> None:
+        """Append one entry; service codes come from add_services()."""
+        start, end = self._service_spans.get(patient_id, (0, 0))
+        self.patient_ids.append(_NULL_PATIENT if patient_id is None else patient_id)
+        self.insurance_status.append(_intern(insurance_status))
+        self.insurance_names.append(_intern(insurance_name))
+        self.chart_entries.append(chart_entry)
+        self.service_starts.append(start)
+        self.service_ends.append(end)
+
+    @classmethod
+    def from_entries(
+        cls, center_id: str, center_name: str, target_date: date,
+        entries: Iterable[ChartEntry],
+    ) -> "ChartEntryBatch":
+        """Build a batch from ChartEntry objects of one center and date."""
+        batch = cls(center_id, center_name, target_date)
+        for e in entries:
+            if e.patient_id not in batch._service_spans:
+                batch.add_services(e.patient_id, e.service_codes)
+            batch.append(e.patient_id, e.insurance_status, e.insurance_name, e.chart_entry)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.chart_entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.chart_entries)
+
+    def __iter__(self) -> Iterator[ChartEntry]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index: int) -> ChartEntry:
+        return ChartEntry(
+            center_id=self.center_id,
+            center_name=self.center_name,
+            date=self.date,
+            patient_id=self._patient_id(index),
+            insurance_status=self.insurance_status[index],
+            insurance_name=self.insurance_names[index],
+            chart_entry=self.chart_entries[index],
+            service_codes=self.codes_at(index),
+        )
+
+    def _patient_id(self, index: int) -> int | None:
+        pid = self.patient_ids[index]
+        return None if pid == _NULL_PATIENT else pid
+
+    def codes_at(self, index: int) -> list[str]:
+        """Service codes of the entry at index."""
+        return self.service_codes[self.service_starts[index]:self.service_ends[index]]
+
+    def iter_dicts(self) -> Iterator[dict[str, Any]]:
+        """Yield JSON-ready dicts, reading the columns directly."""
+        date_str = self.date.isoformat()
+        codes = self.service_codes
+        for pid, status, name, text, start, end in zip(
+            self.patient_ids,
+            self.insurance_status,
+            self.insurance_names,
+            self.chart_entries,
+            self.service_starts,
+            self.service_ends,
+        ):
+            yield {
+                "center_id": self.center_id,
+                "center_name": self.center_name,
+                "date": date_str,
+                "patient_id": None if pid == _NULL_PATIENT else pid,
+                "insurance_status": status,
+                "insurance_name": name,
+                "chart_entry": text,
+                "service_codes": codes[start:end],
+            }
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """All entries as JSON-ready dicts."""
+        return list(self.iter_dicts())
+
+    def to_columns(self) -> dict[str, list]:
+        """Per-entry fields as parallel lists (center and date are per batch)."""
+        codes = self.service_codes
+        return {
+            "patient_id": [
+                None if pid == _NULL_PATIENT else pid for pid in self.patient_ids
+            ],
+            "insurance_status": list(self.insurance_status),
+            "insurance_name": list(self.insurance_names),
+            "chart_entry": list(self.chart_entries),
+            "service_codes": [
+                codes[start:end] for start, end in zip(self.service_starts, self.service_ends)
+            ],
+        }
+
+    def iter_csv_rows(self) -> Iterator[tuple[str, ...]]:
+        """Yield CSV rows as tuples in FIELDS order."""
+        date_str = self.date.isoformat()
+        codes = self.service_codes
+        # Patients share their offsets, so join each span only once
+        joined: dict[tuple[int, int], str] = {}
+        for pid, status, name, text, start, end in zip(
+            self.patient_ids,
+            self.insurance_status,
+            self.insurance_names,
+            self.chart_entries,
+            self.service_starts,
+            self.service_ends,
+        ):
+            span = (start, end)
+            codes_str = joined.get(span)
+            if codes_str is None:
+                codes_str = joined[span] = ",".join(codes[start:end])
+            yield (
+                self.center_id,
+                self.center_name,
+                date_str,
+                "" if pid == _NULL_PATIENT else str(pid),
+                status,
+                name or "",
+                text,
+                codes_str,
+            )
@@ -0,0 +1,333 @@
+"""
+Benchmark Suite - Repeated extraction runs with latency statistics.
+
+For each worker count the suite measures two kinds of runs:
+
+- cold: mapping cache invalidated and a fresh connection pool, i.e.
+  what the first extraction of a new process pays
+- warm: shared, already-filled mapping cache and connection pool,
+  after `warmup` discarded runs
+
+Each kind is run `iterations` times. Totals and per-center durations
+are summarized as mean/stdev/p50/p95/p99, and raw samples are kept in
+the JSON report so a later run can be compared against it.
+
+With a fault profile on the database config (see core.faults) every
+run pays the profile's injected latency and failures; the profile is
+recorded in the report.
+
+With a TraceRecorder, every run is a span on the calling thread's lane
+and its centers appear on the workers' lanes (see core.tracing); the
+trace file is linked from the report.
+
+Comparison uses a one-sided Mann-Whitney U test per series (no
+normality assumption; latency distributions are skewed). With one
+series per center, mode and worker count, p-values are adjusted with
+Benjamini-Hochberg so the false discovery rate stays at ALPHA. A
+slowdown is reported only if it is also larger than MIN_REGRESSION,
+so noise on tiny medians is not flagged.
+"""
+
+import logging
+import math
+import os
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from ..core.config import AppConfig
+from ..core.introspector import invalidate
+from ..core.pool import ConnectionPool
+from ..core.tracing import TraceRecorder
+from .extraction import PHASES, ExtractionService, MultiExtractionResult
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DATE = date(2022, 1, 18)  # Known test date
+TARGET_MS = 5000
+MODES = ("cold", "warm")
+
+ALPHA = 0.05  # False discovery rate for regressions
+MIN_REGRESSION = 0.05  # Median must also be at least 5% slower
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentile with linear interpolation between closest ranks."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+@dataclass
+class Distribution:
+    """Summary statistics of duration samples (ms)."""
+
+    n: int
+    mean: float
+    stdev: float
+    min: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    samples: list[float] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, samples: list[float]) -> "Distribution":
+        if not samples:
+            return cls(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, [])
+        return cls(
+            n=len(samples),
+            mean=statistics.fmean(samples),
+            stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            min=min(samples),
+            p50=percentile(samples, 50),
+            p95=percentile(samples, 95),
+            p99=percentile(samples, 99),
+            max=max(samples),
+            samples=list(samples),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {k: round(v, 2) if isinstance(v, float) else v for k, v in asdict(self).items()}
+        data["samples"] = [round(s, 2) for s in self.samples]
+        return data
+
+
+def mann_whitney_greater(baseline: list[float], current: list[float]) -> float:
+    """
+    One-sided p-value that `current` tends to be larger than `baseline`.
+
+    Normal approximation with tie and continuity correction; reliable
+    from about 5 samples per side.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    # Average ranks over the pooled samples (ties share their mean rank)
+    pooled = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t**3 - t
+        i = j + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, pooled) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean_u = n1 * n2 / 2
+    n = n1 + n2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return 1.0
+    z = (u - mean_u - 0.5) / math.sqrt(var_u)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclass
+class RunSet:
+    """All measured runs of one mode (cold/warm) at one worker count."""
+
+    totals: list[float] = field(default_factory=list)
+    centers: dict[str, list[float]] = field(default_factory=dict)
+    # center -> phase -> samples (ms)
+    center_phases: dict[str, dict[str, list[float]]] = field(default_factory=dict)
+    errors: int = 0
+    entries: int = 0
+
+    def add(self, result: MultiExtractionResult) -> None:
+        self.totals.append(result.total_duration_ms)
+        self.entries = result.total_entries
+        for r in result.results:
+            if r.error is None:
+                self.centers.setdefault(r.center_id, []).append(r.duration_ms)
+                phases = self.center_phases.setdefault(r.center_id, {})
+                for phase, ms in r.phases.items():
+                    phases.setdefault(phase, []).append(ms)
+            else:
+                self.errors += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        # Phase distributions over all center extractions, plus p50 per center
+        pooled: dict[str, list[float]] = {}
+        for phases in self.center_phases.values():
+            for phase, samples in phases.items():
+                pooled.setdefault(phase, []).extend(samples)
+
+        return {
+            "total": Distribution.of(self.totals).to_dict(),
+            "centers": {
+                center_id: Distribution.of(samples).to_dict()
+                for center_id, samples in sorted(self.centers.items())
+            },
+            "phases": {
+                phase: Distribution.of(pooled[phase]).to_dict()
+                for phase in PHASES if phase in pooled
+            },
+            "center_phases_p50": {
+                center_id: {
+                    phase: round(percentile(phases[phase], 50), 2)
+                    for phase in PHASES if phase in phases
+                }
+                for center_id, phases in sorted(self.center_phases.items())
+            },
+            "errors": self.errors,
+            "entries": self.entries,
+        }
+
+
+class BenchmarkSuite:
+    """Cold and warm extraction runs for several worker counts."""
+
+    def __init__(
+        self,
+        config: AppConfig,
+        target_date: date = BENCHMARK_DATE,
+        iterations: int = 5,
+        warmup: int = 1,
+        worker_counts: list[int] | None = None,
+        center_ids: list[str] | None = None,
+        trace: TraceRecorder | None = None,
+    ):
+        self.config = config
+        self.target_date = target_date
+        self.iterations = iterations
+        self.warmup = warmup
+        self.worker_counts = worker_counts or [5]
+        self.center_ids = center_ids
+        self.trace = trace
+
+    def _extract(self, pool: ConnectionPool, workers: int, run: str = "warm") -> MultiExtractionResult:
+        service = ExtractionService(self.config, pool=pool, trace=self.trace)
+        if self.trace is None:
+            return service.extract_all(self.target_date, self.center_ids, max_workers=workers)
+        with self.trace.timed(f"{run} run", cat="run", workers=workers):
+            return service.extract_all(self.target_date, self.center_ids, max_workers=workers)
+
+    def _cold(self, workers: int) -> MultiExtractionResult:
+        invalidate()
+        pool = ConnectionPool(self.config.database)
+        try:
+            return self._extract(pool, workers, "cold")
+        finally:
+            pool.close()
+
+    def run(self) -> dict[str, Any]:
+        """Run all configurations; returns the JSON-ready report."""
+        started = time.time()
+        runs = {}
+
+        for workers in self.worker_counts:
+            logger.info(f"Benchmark: {workers} workers, {self.iterations} iterations")
+            cold = RunSet()
+            for _ in range(self.iterations):
+                cold.add(self._cold(workers))
+
+            warm = RunSet()
+            pool = ConnectionPool(self.config.database)
+            try:
+                for _ in range(self.warmup):
+                    self._extract(pool, workers, "warm-up")
+                for _ in range(self.iterations):
+                    warm.add(self._extract(pool, workers))
+            finally:
+                pool.close()
+
+            runs[str(workers)] = {"cold": cold.to_dict(), "warm": warm.to_dict()}
+
+        faults = self.config.database.faults
+        trace_path = self.trace.write() if self.trace is not None else None
+        return {
+            "created_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+            "duration_s": round(time.time() - started, 1),
+            "target_date": self.target_date.isoformat(),
+            "iterations": self.iterations,
+            "warmup": self.warmup,
+            "workers": self.worker_counts,
+            "centers": len(ExtractionService(self.config).select_centers(self.center_ids)),
+            "target_ms": TARGET_MS,
+            "backend": self.config.database.backend,
+            "faults": faults.to_dict() if faults else None,
+            "trace": str(trace_path) if trace_path else None,
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "runs": runs,
+        }
+
+
+@dataclass
+class Regression:
+    """A significant slowdown of one measured series against a baseline."""
+
+    workers: str
+    mode: str
+    scope: str  # "total" or a center ID
+    baseline_p50: float
+    current_p50: float
+    p_value: float
+
+    @property
+    def change(self) -> float:
+        return self.current_p50 / self.baseline_p50 - 1 if self.baseline_p50 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {"change": round(self.change, 4), "p_value": round(self.p_value, 5)}
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    alpha: float = ALPHA,
+    min_regression: float = MIN_REGRESSION,
+) -> list[Regression]:
+    """Series (totals and centers) that got significantly slower."""
+    candidates: list[Regression] = []
+    for workers, modes in current["runs"].items():
+        base_modes = baseline.get("runs", {}).get(workers)
+        if base_modes is None:
+            continue
+        for mode in MODES:
+            if mode not in modes or mode not in base_modes:
+                continue
+            series = [("total", base_modes[mode]["total"], modes[mode]["total"])]
+            for center_id, dist in modes[mode]["centers"].items():
+                base_dist = base_modes[mode]["centers"].get(center_id)
+                if base_dist is not None:
+                    series.append((center_id, base_dist, dist))
+
+            for scope, base_dist, dist in series:
+                candidates.append(
+                    Regression(
+                        workers=workers,
+                        mode=mode,
+                        scope=scope,
+                        baseline_p50=base_dist["p50"],
+                        current_p50=dist["p50"],
+                        p_value=mann_whitney_greater(base_dist["samples"], dist["samples"]),
+                    )
+                )
+
+    # Benjamini-Hochberg: significant up to the largest rank k with p <= k/m * alpha
+    candidates.sort(key=lambda r: r.p_value)
+    significant = 0
+    for rank, candidate in enumerate(candidates, start=1):
+        if candidate.p_value <= rank / len(candidates) * alpha:
+            significant = rank
+    return [r for r in candidates[:significant] if r.change > min_regression]
@@ -7,18 +7,50 @@ Extracts data from multiple dental centers in parallel.
 import csv
 import json
 import logging
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from contextlib import closing, nullcontext
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
+from typing import Callable, Iterator
 
 from ..adapters.center_adapter import AdapterFactory, CenterAdapter
 from ..core.config import AppConfig, CenterConfig
-from ..models.chart_entry import ChartEntry
+from ..core.metrics import REGISTRY
+from ..core.pool import ConnectionPool
+from ..core.profiling import propagate
+from ..core.tracing import TraceRecorder
+from ..models.chart_entry import FIELDS, ChartEntry, ChartEntryBatch
 
 logger = logging.getLogger(__name__)
 
+# Exposed at /metrics (Prometheus text format)
+CENTER_DURATION = REGISTRY.histogram(
+    "ivoris_extraction_duration_seconds", "Time to extract one center", ("center",)
+)
+PHASE_DURATION = REGISTRY.histogram(
+    "ivoris_extraction_phase_duration_seconds",
+    "Time per extraction phase of one center",
+    ("center", "phase"),
+)
+ROWS = REGISTRY.counter("ivoris_extraction_rows_total", "Chart entries extracted", ("center",))
+ERRORS = REGISTRY.counter(
+    "ivoris_extraction_errors_total", "Failed center extractions by exception class", ("center", "error")
+)
+IN_FLIGHT = REGISTRY.gauge("ivoris_extraction_in_flight", "Centers being extracted right now")
+EXPORT_BYTES = REGISTRY.counter("ivoris_export_bytes_total", "Bytes written by exports", ("format",))
+
+# Where a center's extraction time goes, in execution order. "mapping" is
+# measured here, the rest by CenterAdapter; schema_check is the drift
+# fingerprint query and services covers the whole LEISTUNG query.
+PHASES = ("mapping", "connect", "schema_check", "execute", "fetch", "services", "transform")
+
+
+class ExtractionCancelled(Exception):
+    """Extraction was stopped through its cancel event."""
+
 
 @dataclass
 class ExtractionResult:
@@ -26,9 +58,14 @@ class ExtractionResult:
     
     center_id: str
     center_name: str
-    entries: list[ChartEntry]
+    entries: ChartEntryBatch
     duration_ms: float
     error: str | None = None
+    phases: dict[str, float] = field(default_factory=dict)  # Phase -> ms (see PHASES)
+
+    def phases_ms(self, ndigits: int = 2) -> dict[str, float]:
+        """Recorded phases in PHASES order, rounded for output."""
+        return {p: round(self.phases[p], ndigits) for p in PHASES if p in self.phases}
 
 
 @dataclass
@@ -57,43 +94,136 @@ class MultiExtractionResult:
 class ExtractionService:
     """Service for extracting data from dental centers."""
 
-    def __init__(self, config: AppConfig, output_dir: Path | None = None):
+    def __init__(
+        self,
+        config: AppConfig,
+        output_dir: Path | None = None,
+        pool: ConnectionPool | None = None,
+        trace: TraceRecorder | None = None,
+    ):
         self.config = config
         self.output_dir = output_dir or Path("data/output")
-        self.factory = AdapterFactory(config.database)
+        self.factory = AdapterFactory(config.database, pool=pool)
+        self.trace = trace  # Timeline of runs and exports (see core.tracing)
+
+    def _traced(self, name: str, **args):
+        return self.trace.timed(name, **args) if self.trace is not None else nullcontext()
 
-    def extract_center(self, center: CenterConfig, target_date: date) -> ExtractionResult:
-        """Extract data from a single center."""
+    def extract_center(
+        self, center: CenterConfig, target_date: date, submitted: float | None = None
+    ) -> ExtractionResult:
+        """Extract data from a single center, timing each phase."""
         start = time.perf_counter()
-        
+        phases: dict[str, float] = {}
+        adapter = None
+        error = None
+        IN_FLIGHT.inc()
+        if self.trace is not None:
+            self.trace.task_started()
+
         try:
             adapter = self.factory.create(center)
+            phases["mapping"] = (time.perf_counter() - start) * 1000
             with adapter:
                 entries = adapter.extract_chart_entries(target_date)
             
             duration = (time.perf_counter() - start) * 1000
+            phases.update(adapter.timings)
+            CENTER_DURATION.observe(duration / 1000, center=center.id)
+            ROWS.inc(len(entries), center=center.id)
             return ExtractionResult(
                 center_id=center.id,
                 center_name=center.name,
                 entries=entries,
                 duration_ms=duration,
+                phases=phases,
             )
         except Exception as e:
+            error = e
             duration = (time.perf_counter() - start) * 1000
             logger.error(f"Error extracting {center.name}: {e}")
+            ERRORS.inc(center=center.id, error=type(e).__name__)
+            if adapter is not None:
+                phases.update(adapter.timings)
             return ExtractionResult(
                 center_id=center.id,
                 center_name=center.name,
-                entries=[],
+                entries=ChartEntryBatch(center.id, center.name, target_date),
                 duration_ms=duration,
                 error=str(e),
+                phases=phases,
             )
+        finally:
+            IN_FLIGHT.dec()
+            for phase, ms in phases.items():
+                PHASE_DURATION.observe(ms / 1000, center=center.id, phase=phase)
+            if self.trace is not None:
+                self._trace_center(center, start, submitted, phases, adapter, error)
+
+    def _trace_center(self, center, start, submitted, phases, adapter, error) -> None:
+        """Record a center's span with its phases nested inside."""
+        trace = self.trace
+        args = {"center": center.name}
+        if submitted is not None:
+            args["queued_ms"] = round((start - submitted) * 1000, 2)
+        if error is not None:
+            args["error"] = f"{type(error).__name__}: {error}"
+        trace.span(center.id, start, time.perf_counter(), cat="center", **args)
+        if "mapping" in phases:
+            trace.span("mapping", start, start + phases["mapping"] / 1000, cat="phase")
+        for phase, phase_start, phase_end in adapter.spans if adapter is not None else ():
+            trace.span(phase, phase_start, phase_end, cat="phase")
+        trace.task_finished()
+
+    def select_centers(self, center_ids: list[str] | None) -> list[CenterConfig]:
+        """Configured centers to extract (None = all)."""
+        if center_ids:
+            return [c for c in self.config.centers if c.id in center_ids]
+        return self.config.centers
+
+    def iter_extract(
+        self,
+        target_date: date,
+        center_ids: list[str] | None = None,
+        max_workers: int = 5,
+    ) -> Iterator[ExtractionResult]:
+        """
+        Extract centers in parallel, yielding each result as it completes.
+
+        Closing the iterator early cancels centers that have not started.
+        """
+        centers = self.select_centers(center_ids)
+        logger.info(f"Extracting from {len(centers)} centers for {target_date}")
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        if self.trace is not None:
+            self.trace.tasks_queued(len(centers))
+        futures = [
+            executor.submit(propagate(self.extract_center), center, target_date, time.perf_counter())
+            for center in centers
+        ]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+
+                status = "✓" if result.error is None else "✗"
+                logger.info(
+                    f"  {status} {result.center_name}: "
+                    f"{len(result.entries)} entries in {result.duration_ms:.0f}ms"
+                )
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if self.trace is not None:
+                self.trace.task_dropped(sum(f.cancelled() for f in futures))
 
     def extract_all(
         self,
         target_date: date,
         center_ids: list[str] | None = None,
         max_workers: int = 5,
+        on_result: Callable[[ExtractionResult], None] | None = None,
+        cancel: threading.Event | None = None,
     ) -> MultiExtractionResult:
         """
         Extract data from multiple centers in parallel.
@@ -102,35 +232,23 @@ class ExtractionService:
             target_date: Date to extract
             center_ids: Specific centers to extract (None = all)
             max_workers: Max parallel connections
+            on_result: Called with each center's result as it completes
+            cancel: When set, stops after the next completed center
+                (raises ExtractionCancelled, pending centers never start)
         """
         start = time.perf_counter()
 
-        # Determine which centers to extract
-        if center_ids:
-            centers = [c for c in self.config.centers if c.id in center_ids]
-        else:
-            centers = self.config.centers
-
-        logger.info(f"Extracting from {len(centers)} centers for {target_date}")
-
-        # Extract in parallel
         results: list[ExtractionResult] = []
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.extract_center, center, target_date): center
-                for center in centers
-            }
-
-            for future in as_completed(futures):
-                result = future.result()
+        run = self._traced(f"extract {target_date}", workers=max_workers)
+        with run, closing(self.iter_extract(target_date, center_ids, max_workers)) as completed:
+            for result in completed:
                 results.append(result)
-                
-                status = "✓" if result.error is None else "✗"
-                logger.info(
-                    f"  {status} {result.center_name}: "
-                    f"{len(result.entries)} entries in {result.duration_ms:.0f}ms"
-                )
+                if on_result is not None:
+                    on_result(result)
+                if cancel is not None and cancel.is_set():
+                    raise ExtractionCancelled(
+                        f"Cancelled after {len(results)} centers"
+                    )
 
         # Sort by center_id for consistent output
         results.sort(key=lambda r: r.center_id)
@@ -145,12 +263,18 @@ class ExtractionService:
             total_duration_ms=total_duration,
         )
 
-    def export_json(self, result: MultiExtractionResult) -> Path:
-        """Export extraction result to JSON."""
+    def export_name(self, result: MultiExtractionResult) -> str:
+        """Default export file name (without extension) of a result."""
+        return f"ivoris_multi_center_{result.target_date.isoformat()}"
+
+    def export_json(self, result: MultiExtractionResult, name: str | None = None) -> Path:
+        """Export extraction result to JSON (name: file name without extension)."""
+        with self._traced("export_json", cat="export"):
+            return self._export_json(result, name or self.export_name(result))
+
+    def _export_json(self, result: MultiExtractionResult, name: str) -> Path:
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        filename = f"ivoris_multi_center_{result.target_date.isoformat()}.json"
-        path = self.output_dir / filename
+        path = self.output_dir / f"{name}.json"
 
         data = {
             "target_date": result.target_date.isoformat(),
@@ -162,38 +286,40 @@ class ExtractionService:
                     "center_name": r.center_name,
                     "entry_count": len(r.entries),
                     "duration_ms": round(r.duration_ms, 2),
+                    "phases_ms": r.phases_ms(),
                     "error": r.error,
                 }
                 for r in result.results
             ],
-            "entries": [e.to_dict() for e in result.all_entries],
+            "entries": [d for r in result.results for d in r.entries.iter_dicts()],
         }
 
         with open(path, "w") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
 
+        EXPORT_BYTES.inc(path.stat().st_size, format="json")
         logger.info(f"Exported to {path}")
         return path
 
-    def export_csv(self, result: MultiExtractionResult) -> Path:
-        """Export extraction result to CSV."""
+    def export_csv(self, result: MultiExtractionResult, name: str | None = None) -> Path:
+        """Export extraction result to CSV (name: file name without extension)."""
+        with self._traced("export_csv", cat="export"):
+            return self._export_csv(result, name or self.export_name(result))
+
+    def _export_csv(self, result: MultiExtractionResult, name: str) -> Path:
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        filename = f"ivoris_multi_center_{result.target_date.isoformat()}.csv"
-        path = self.output_dir / filename
+        path = self.output_dir / f"{name}.csv"
 
-        entries = result.all_entries
-        if not entries:
+        if result.total_entries == 0:
             path.write_text("")
             return path
 
-        fieldnames = list(entries[0].to_csv_row().keys())
-        
         with open(path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for entry in entries:
-                writer.writerow(entry.to_csv_row())
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for r in result.results:
+                writer.writerows(r.entries.iter_csv_rows())
 
+        EXPORT_BYTES.inc(path.stat().st_size, format="csv")
         logger.info(f"Exported to {path}")
         return path
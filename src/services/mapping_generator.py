@@ -7,17 +7,27 @@ through client discussion.
 
 The generator:
 1. Takes raw discovery results
-2. Proposes mappings based on naming patterns
+2. Proposes mappings based on naming patterns (exact base-name index,
+   then character n-gram similarity for anything left over)
 3. Saves as JSON files for manual review
 """
 
 import json
 import logging
 import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-from ..core.discovery import DiscoveredSchema, DiscoveredTable
+import numpy as np
+
+from ..core.discovery import DiscoveredSchema, DiscoveredTable, diff_mapping, fingerprint_schema
+from ..core.introspector import mapping_to_schema
+from ..core.profiling import propagate
+from ..core.storage import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +44,15 @@ EXPECTED_COLUMNS = {
 }
 
 
+# Match pattern: BASE_SUFFIX where SUFFIX is 2-4 alphanumeric chars
+_SUFFIX_RE = re.compile(r"^(.+)_[A-Z0-9]{2,4}$")
+
+# Fuzzy matching: character trigrams hashed into a fixed-width vector
+NGRAM_SIZE = 3
+NGRAM_DIMS = 2048
+FUZZY_THRESHOLD = 0.6
+
+
 def extract_base_name(name: str) -> str:
     """
     Extract base name by removing suffix.
@@ -43,33 +62,143 @@ def extract_base_name(name: str) -> str:
         PATNR_NAN6 -> PATNR
         P_NAME_LXZ -> P_NAME
     """
-    # Match pattern: BASE_SUFFIX where SUFFIX is 2-4 alphanumeric chars
-    match = re.match(r"^(.+)_[A-Z0-9]{2,4}$", name)
+    match = _SUFFIX_RE.match(name)
     if match:
         return match.group(1)
     return name
 
 
+@dataclass
+class Match:
+    """A proposed canonical name for an actual table/column name."""
+
+    canonical: str
+    confidence: float  # 1.0 for exact, cosine similarity for fuzzy
+    method: str  # "exact" or "fuzzy"
+
+
+class NameIndex:
+    """
+    Hash index from canonical names to themselves.
+
+    An actual name matches if it equals a canonical name or its base
+    name (suffix stripped) does. Trying the full name first keeps clean
+    names like P_NAME from being split into P + _NAME.
+    """
+
+    def __init__(self, canonical: list[str]):
+        self._index = {c.upper(): c for c in canonical}
+
+    def lookup(self, actual_name: str) -> str | None:
+        upper = actual_name.upper()
+        return self._index.get(upper) or self._index.get(extract_base_name(upper))
+
+
+@lru_cache(maxsize=64)
+def _name_index(canonical: tuple[str, ...]) -> NameIndex:
+    return NameIndex(list(canonical))
+
+
+def ngram_matrix(names: list[str]) -> np.ndarray:
+    """L2-normalized, hashed character n-gram counts (one row per name)."""
+    matrix = np.zeros((len(names), NGRAM_DIMS), dtype=np.float32)
+    for i, name in enumerate(names):
+        padded = f"^{name.upper()}$"
+        for j in range(len(padded) - NGRAM_SIZE + 1):
+            gram = padded[j:j + NGRAM_SIZE].encode("utf-8")
+            matrix[i, zlib.crc32(gram) % NGRAM_DIMS] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@lru_cache(maxsize=64)
+def _canonical_matrix(canonical: tuple[str, ...]) -> np.ndarray:
+    return ngram_matrix(list(canonical))
+
+
+def match_grouped(
+    groups: dict[str, tuple[list[str], list[str]]],
+    threshold: float = FUZZY_THRESHOLD,
+) -> dict[str, dict[str, Match]]:
+    """
+    Match actual names to canonical names, group by group.
+
+    Args:
+        groups: key -> (actual names, canonical names allowed for them),
+            e.g. one group per table with its expected columns.
+
+    Returns:
+        key -> {actual name: Match}
+
+    Exact matches come from the hash index. Everything left over, across
+    all groups, is scored in one similarity matrix (pending names x all
+    canonical names) and assigned greedily by score, at most one actual
+    name per canonical name per group.
+    """
+    results: dict[str, dict[str, Match]] = {key: {} for key in groups}
+    pending: list[tuple[str, str]] = []
+
+    for key, (names, canonical) in groups.items():
+        index = _name_index(tuple(canonical))
+        taken = set()
+        for name in names:
+            hit = index.lookup(name)
+            if hit and hit not in taken:
+                results[key][name] = Match(hit, 1.0, "exact")
+                taken.add(hit)
+            else:
+                pending.append((key, name))
+
+    if not pending:
+        return results
+
+    all_canonical = sorted({c for _, canonical in groups.values() for c in canonical})
+    column_of = {c: j for j, c in enumerate(all_canonical)}
+
+    scores = (
+        ngram_matrix([extract_base_name(name.upper()) for _, name in pending])
+        @ _canonical_matrix(tuple(all_canonical)).T
+    )
+
+    # Only canonical names of the row's own group that are still free
+    allowed = np.zeros(scores.shape, dtype=bool)
+    for i, (key, _) in enumerate(pending):
+        taken = {m.canonical for m in results[key].values()}
+        for c in groups[key][1]:
+            if c not in taken:
+                allowed[i, column_of[c]] = True
+    scores = np.where(allowed, scores, 0.0)
+
+    rows, cols = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[rows, cols], kind="stable")
+    assigned_rows: set[int] = set()
+    assigned: set[tuple[str, str]] = set()
+
+    for i, j in zip(rows[order], cols[order]):
+        key, name = pending[i]
+        canonical = all_canonical[j]
+        if i in assigned_rows or (key, canonical) in assigned:
+            continue
+        results[key][name] = Match(canonical, round(float(scores[i, j]), 3), "fuzzy")
+        assigned_rows.add(i)
+        assigned.add((key, canonical))
+
+    return results
+
+
 def find_matching_table(
     actual_name: str, canonical_tables: list[str]
 ) -> str | None:
-    """Find which canonical table this actual name matches."""
-    base = extract_base_name(actual_name)
-    for canonical in canonical_tables:
-        if base == canonical:
-            return canonical
-    return None
+    """Find which canonical table this actual name matches (exact only)."""
+    return _name_index(tuple(canonical_tables)).lookup(actual_name)
 
 
 def find_matching_column(
     actual_name: str, expected_columns: list[str]
 ) -> str | None:
-    """Find which canonical column this actual name matches."""
-    base = extract_base_name(actual_name)
-    for expected in expected_columns:
-        if base == expected:
-            return expected
-    return None
+    """Find which canonical column this actual name matches (exact only)."""
+    return _name_index(tuple(expected_columns)).lookup(actual_name)
 
 
 def generate_mapping(
@@ -79,7 +208,9 @@ def generate_mapping(
     """
     Generate a proposed mapping from discovered schema.
 
-    Returns a mapping structure ready for manual review.
+    Returns a mapping structure ready for manual review. Each mapped
+    table and column records its match confidence and method; expected
+    columns that could not be matched are listed as unresolved.
     """
     mapping = {
         "center_id": center_id,
@@ -87,80 +218,260 @@ def generate_mapping(
         "schema": "ck",
         "generated": True,  # Flag indicating this was auto-generated
         "reviewed": False,  # Flag for manual review status
+        "schema_fingerprint": fingerprint_schema(discovered),
         "tables": {},
         "unmapped_tables": [],
     }
 
-    for table in discovered.tables:
-        canonical_table = find_matching_table(table.name, CANONICAL_TABLES)
-
-        if canonical_table:
-            expected_cols = EXPECTED_COLUMNS[canonical_table]
-            column_mapping = {}
-
-            for col in table.columns:
-                canonical_col = find_matching_column(col.name, expected_cols)
-                if canonical_col:
-                    column_mapping[canonical_col] = {
-                        "actual_name": col.name,
-                    }
-
-            mapping["tables"][canonical_table] = {
-                "actual_name": table.name,
-                "columns": column_mapping,
-            }
-        else:
-            mapping["unmapped_tables"].append(table.name)
+    table_matches = match_grouped(
+        {"tables": ([t.name for t in discovered.tables], CANONICAL_TABLES)}
+    )["tables"]
+
+    matched_tables = [
+        (table, table_matches[table.name])
+        for table in discovered.tables
+        if table.name in table_matches
+    ]
+    mapping["unmapped_tables"] = [
+        t.name for t in discovered.tables if t.name not in table_matches
+    ]
+
+    # All columns of all matched tables are scored together
+    column_matches = match_grouped({
+        match.canonical: (
+            [c.name for c in table.columns],
+            EXPECTED_COLUMNS[match.canonical],
+        )
+        for table, match in matched_tables
+    })
+
+    for table, match in matched_tables:
+        matches = column_matches[match.canonical]
+        column_mapping = {}
+        unmapped_columns = []
+
+        for col in table.columns:
+            col_match = matches.get(col.name)
+            if col_match:
+                column_mapping[col_match.canonical] = {
+                    "actual_name": col.name,
+                    "data_type": col.data_type,
+                    "confidence": col_match.confidence,
+                    "method": col_match.method,
+                }
+            else:
+                unmapped_columns.append(col.name)
+
+        mapping["tables"][match.canonical] = {
+            "actual_name": table.name,
+            "confidence": match.confidence,
+            "method": match.method,
+            "columns": column_mapping,
+            "unresolved_columns": [
+                c for c in EXPECTED_COLUMNS[match.canonical] if c not in column_mapping
+            ],
+            "unmapped_columns": unmapped_columns,
+        }
 
     return mapping
 
 
 def save_mapping(mapping: dict, output_dir: Path) -> Path:
-    """Save mapping to JSON file."""
-    output_dir.mkdir(parents=True, exist_ok=True)
+    """Save mapping to JSON file (atomically, readers never see partial files)."""
     filepath = output_dir / f"{mapping['center_id']}_mapping.json"
+    return write_json_atomic(filepath, mapping)
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, indent=2, ensure_ascii=False)
 
-    return filepath
+def load_existing_mapping(center_id: str, output_dir: Path) -> dict | None:
+    """Load a previously generated mapping file, if any."""
+    filepath = output_dir / f"{center_id}_mapping.json"
+    if not filepath.exists():
+        return None
+    with open(filepath, encoding="utf-8") as f:
+        return json.load(f)
 
 
-def generate_all_mappings(
+def generate_center_mapping(
     config,
+    center,
     output_dir: Path,
-) -> list[Path]:
+    incremental: bool = False,
+    discovered: DiscoveredSchema | None = None,
+    sampler=None,
+) -> Path | None:
     """
-    Generate mapping files for all centers.
+    Generate the mapping file for one center.
 
-    This discovers schemas from each database and generates
-    proposed mappings based on naming conventions.
+    Uses `discovered` when given (server-wide discovery), otherwise
+    discovers the center's database. With a ValueSampler, columns left
+    unresolved by name matching are classified by sampled values.
+    Returns None when skipped.
     """
-    from ..core.discovery import discover_schema
+    from ..core.discovery import SchemaDiscovery, save_discovery
 
-    generated_files = []
+    conn_str = config.database.connection_string(center.database)
+    discovery = SchemaDiscovery(conn_str, config.database.dialect)
 
-    for center in config.centers:
-        logger.info(f"Processing {center.name} ({center.id})...")
+    existing = load_existing_mapping(center.id, output_dir) if incremental else None
+    if existing:
+        if discovered is not None:
+            fingerprint = fingerprint_schema(discovered)
+        else:
+            fingerprint = discovery.fingerprint(existing.get("schema", "ck"))
+        if fingerprint == existing.get("schema_fingerprint"):
+            logger.info(f"  {center.id}: schema unchanged, skipped")
+            return None
+        if existing.get("reviewed"):
+            if discovered is None:
+                discovered = discovery.discover(existing.get("schema", "ck"))
+            drift = diff_mapping(mapping_to_schema(existing), discovered)
+            if drift:
+                logger.warning(
+                    f"  {center.id}: mapped columns changed but mapping is reviewed, "
+                    f"kept as is. Review it manually: {'; '.join(drift)}"
+                )
+                return None
+            # Only unmapped parts changed: keep the review, refresh the fingerprint
+            existing["schema_fingerprint"] = fingerprint
+            logger.info(f"  {center.id}: schema changed outside mapped columns, fingerprint updated")
+            return save_mapping(existing, output_dir)
+
+    # Discover raw schema from database
+    if discovered is None:
+        # Row counts let the sampler choose TABLESAMPLE on large tables
+        discovered = discovery.discover(include_row_counts=sampler is not None)
+    save_discovery(center.id, discovered)
+
+    # Generate proposed mapping
+    mapping = generate_mapping(center.id, discovered)
+    if sampler is not None:
+        resolved = sampler.resolve(center, mapping, discovered)
+        if resolved:
+            logger.info(f"  {center.id}: resolved by sampling: {', '.join(resolved)}")
+
+    # Save mapping file
+    filepath = save_mapping(mapping, output_dir)
+
+    # Report
+    table_count = len(mapping["tables"])
+    unmapped = len(mapping["unmapped_tables"])
+    logger.info(f"  {center.id}: {table_count} tables mapped, {unmapped} unmapped")
 
-        try:
-            # Discover raw schema from database
-            conn_str = config.database.connection_string(center.database)
-            discovered = discover_schema(conn_str)
+    return filepath
 
-            # Generate proposed mapping
-            mapping = generate_mapping(center.id, discovered)
 
-            # Save mapping file
-            filepath = save_mapping(mapping, output_dir)
-            generated_files.append(filepath)
+@dataclass
+class MappingGenerationResult:
+    """Outcome of generating one center's mapping."""
 
-            # Report
-            table_count = len(mapping["tables"])
-            unmapped = len(mapping["unmapped_tables"])
-            logger.info(f"  -> {table_count} tables mapped, {unmapped} unmapped")
+    center_id: str
+    center_name: str
+    status: str  # "generated", "skipped" or "error"
+    duration_ms: float
+    path: Path | None = None
+    error: str | None = None
 
-        except Exception as e:
-            logger.error(f"  -> Error: {e}")
 
-    return generated_files
+def generate_all_mappings(
+    config,
+    output_dir: Path,
+    incremental: bool = False,
+    server_wide: bool = False,
+    max_workers: int = 5,
+    sampler=None,
+) -> list[MappingGenerationResult]:
+    """
+    Generate mapping files for all centers.
+
+    This discovers schemas from each database and generates
+    proposed mappings based on naming conventions. Centers are
+    processed on a bounded thread pool and progress is logged as
+    each one completes.
+
+    With incremental=True, only the schema fingerprint is queried for
+    centers that already have a mapping. Centers whose fingerprint is
+    unchanged are skipped, and reviewed mappings are never overwritten
+    (a changed schema is reported for manual review instead).
+
+    With server_wide=True, all catalogs are read up front through one
+    server connection (see ServerDiscovery); centers missing from that
+    result fall back to per-database discovery.
+
+    With a ValueSampler, unresolved columns are classified by sampling
+    their values; the sampler's own pool bounds the sampling queries
+    across all centers.
+    """
+    prefetched = (
+        discover_server_wide(config, include_row_counts=sampler is not None)
+        if server_wide else {}
+    )
+
+    def process(center) -> MappingGenerationResult:
+        start = time.perf_counter()
+        try:
+            filepath = generate_center_mapping(
+                config,
+                center,
+                output_dir,
+                incremental=incremental,
+                discovered=prefetched.get(center.database),
+                sampler=sampler,
+            )
+            status = "generated" if filepath else "skipped"
+            error = None
+        except Exception as e:
+            filepath, status, error = None, "error", str(e)
+        return MappingGenerationResult(
+            center_id=center.id,
+            center_name=center.name,
+            status=status,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            path=filepath,
+            error=error,
+        )
+
+    results: list[MappingGenerationResult] = []
+    total = len(config.centers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(propagate(process), center) for center in config.centers]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+
+            status = {"generated": "✓", "skipped": "-", "error": "✗"}[result.status]
+            detail = f": {result.error}" if result.error else ""
+            logger.info(
+                f"  [{len(results)}/{total}] {status} {result.center_name} "
+                f"{result.status} in {result.duration_ms:.0f}ms{detail}"
+            )
+
+    results.sort(key=lambda r: r.center_id)
+    return results
+
+
+def discover_server_wide(
+    config,
+    centers=None,
+    include_keys: bool = False,
+    include_row_counts: bool = False,
+) -> dict[str, DiscoveredSchema]:
+    """Discover all center databases in one round trip (empty on failure)."""
+    from ..core.discovery import ServerDiscovery
+
+    if not config.database.dialect.server_catalog:
+        logger.info(f"{config.database.backend} backend: using per-center discovery")
+        return {}
+
+    centers = centers if centers is not None else config.centers
+    discovery = ServerDiscovery(config.database.connection_string("master"))
+    try:
+        return discovery.discover_all(
+            [c.database for c in centers],
+            include_keys=include_keys,
+            include_row_counts=include_row_counts,
+        )
+    except Exception as e:
+        logger.warning(f"Server-wide discovery failed, using per-center discovery: {e}")
+        return {}
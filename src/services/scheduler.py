@@ -0,0 +1,448 @@
+"""
+Extraction Scheduler - daily extractions in a long-running process.
+
+`python -m src.cli daemon` replaces cron calling `extract`: the config,
+the mapping cache and the connection pool stay loaded between runs, and
+days a center missed (downtime, failed extraction) are extracted later
+instead of being lost.
+
+Schedule: one slot per day at `at` (local time); the slot on day D
+extracts D-1, like `extract` without --date. Pooled connections expire
+after a few idle minutes, so the pool is re-warmed `warm_ahead_s`
+before each slot. The config file is reloaded when it changes; the
+mapping cache reloads changed mappings by itself.
+
+State (data/daemon_state.json) records per center the date through
+which every day was extracted ("through") and later days already done
+("done"). Pending work is every date after "through", up to the latest
+slot's target, that is not done. A center seen for the first time
+starts at the current target (or `since`); nothing older than
+`max_backfill_days` before the target is backfilled.
+
+Each cycle extracts the newest target first with `workers` parallel
+connections, then older gaps oldest first, one date at a time, with
+`catchup_workers`: catch-up never runs more queries against the source
+servers than that budget, however long the backlog. Failed centers stay
+pending and are retried after `retry_minutes`.
+
+Consumers read `ivoris_multi_center_<date>.json/.csv`, the file names
+of `extract`: it is written once, when every mapped center is done for
+the date. A run that leaves a day incomplete (a center failed) stages
+the centers it got under data/daemon_staging/<date>/ and exports them
+as an interim `<name>_partial-<time>` file. The run that completes the
+day merges the staged centers with its own, re-extracting any done
+center without a staged result (e.g. mapped after that day), writes
+the standard file and deletes the day's partial files and staging.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Any
+
+from ..core.config import AppConfig, CenterConfig, load_config
+from ..core.introspector import get_schema, list_available_mappings
+from ..core.pool import ConnectionPool
+from ..models.chart_entry import ChartEntry, ChartEntryBatch
+from .extraction import ExtractionCancelled, ExtractionResult, ExtractionService, MultiExtractionResult
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent.parent
+STATE_PATH = ROOT / "data" / "daemon_state.json"
+STAGING_DIR = ROOT / "data" / "daemon_staging"
+MAPPINGS_DIR = ROOT / "data" / "mappings"
+
+FORMATS = ("json", "csv")
+
+
+@dataclass
+class SchedulerSettings:
+    """When to run and how hard the daemon may load the source servers."""
+
+    at: dt_time = dt_time(6, 0)  # Daily slot (local time)
+    workers: int = 5  # Parallel centers for the newest date
+    catchup_workers: int = 2  # Parallel centers for backfilled dates
+    max_backfill_days: int = 30
+    retry_minutes: float = 30.0  # Retry failed centers before the next slot
+    warm_ahead_s: float = 60.0
+    since: date | None = None  # First date for centers without state
+    formats: tuple[str, ...] = FORMATS
+
+
+class ExtractionState:
+    """Per-center progress, saved after every extracted date."""
+
+    def __init__(self, path: Path, centers: dict[str, dict[str, Any]] | None = None):
+        self.path = path
+        self.centers = centers or {}  # center ID -> {"through", "done", "last_success"}
+
+    @classmethod
+    def load(cls, path: Path) -> "ExtractionState":
+        if not path.exists():
+            return cls(path)
+        with open(path, encoding="utf-8") as f:
+            return cls(path, json.load(f).get("centers", {}))
+
+    def save(self) -> None:
+        """Write atomically, so a crash never leaves a truncated state file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"updated_at": datetime.now().isoformat(timespec="seconds"), "centers": self.centers},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp, self.path)
+
+    def track(self, center_id: str, start: date) -> bool:
+        """Start tracking a center at `start`; False if already tracked."""
+        if center_id in self.centers:
+            return False
+        self.centers[center_id] = {
+            "through": (start - timedelta(days=1)).isoformat(),
+            "done": [],
+            "last_success": None,
+        }
+        return True
+
+    def pending(self, center_id: str, target: date) -> list[date]:
+        """Dates after the center's watermark up to target that are not done."""
+        record = self.centers[center_id]
+        done = set(record["done"])
+        day = date.fromisoformat(record["through"]) + timedelta(days=1)
+        dates = []
+        while day <= target:
+            if day.isoformat() not in done:
+                dates.append(day)
+            day += timedelta(days=1)
+        return dates
+
+    def is_done(self, center_id: str, day: date) -> bool:
+        record = self.centers.get(center_id)
+        if record is None:
+            return False
+        return day.isoformat() <= record["through"] or day.isoformat() in record["done"]
+
+    def mark_done(self, center_id: str, day: date) -> None:
+        record = self.centers[center_id]
+        through = date.fromisoformat(record["through"])
+        done = set(record["done"]) | {day.isoformat()}
+
+        # Advance the watermark over the now contiguous days
+        while (through + timedelta(days=1)).isoformat() in done:
+            through += timedelta(days=1)
+        record["through"] = through.isoformat()
+        record["done"] = sorted(d for d in done if d > record["through"])
+        if record["last_success"] is None or day.isoformat() > record["last_success"]:
+            record["last_success"] = day.isoformat()
+
+    def skip_before(self, center_id: str, first: date) -> int:
+        """Give up on dates before `first`; returns how many were pending."""
+        record = self.centers[center_id]
+        skipped = len(self.pending(center_id, first - timedelta(days=1)))
+        if skipped:
+            record["through"] = (first - timedelta(days=1)).isoformat()
+            record["done"] = [d for d in record["done"] if d > record["through"]]
+        return skipped
+
+
+class ExtractionScheduler:
+    """Runs daily extraction cycles until stopped."""
+
+    def __init__(
+        self,
+        config_path: Path,
+        settings: SchedulerSettings | None = None,
+        state_path: Path | None = None,
+        output_dir: Path | None = None,
+        staging_dir: Path | None = None,
+    ):
+        self.config_path = config_path
+        self.settings = settings or SchedulerSettings()
+        self.state = ExtractionState.load(state_path or STATE_PATH)
+        self.staging_dir = staging_dir or STAGING_DIR
+        self.output_dir = output_dir
+        self.config: AppConfig | None = None
+        self.pool: ConnectionPool | None = None
+        self.service: ExtractionService | None = None
+        self._config_mtime_ns: int | None = None
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Stop after the center in progress (safe from signal handlers)."""
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _load(self) -> None:
+        """(Re)load the config and rebuild the pool when the file changed."""
+        mtime_ns = self.config_path.stat().st_mtime_ns
+        if self.config is not None and mtime_ns == self._config_mtime_ns:
+            return
+        if self.config is not None:
+            logger.info(f"Config {self.config_path} changed, reloading")
+        self.config = load_config(self.config_path)
+        self._config_mtime_ns = mtime_ns
+        if self.pool is not None:
+            self.pool.close()
+        self.pool = ConnectionPool(self.config.database)
+        self.service = ExtractionService(self.config, output_dir=self.output_dir, pool=self.pool)
+
+    def centers(self) -> list[CenterConfig]:
+        """Configured centers that have a mapping."""
+        mapped = set(list_available_mappings(MAPPINGS_DIR))
+        return [c for c in self.config.centers if c.id in mapped]
+
+    def warm(self) -> None:
+        """Load all mappings and open one idle connection per center."""
+        self._load()
+        centers = self.centers()
+        for center in centers:
+            try:
+                get_schema(center.id)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not load mapping for {center.id}: {e}")
+        self.pool.warm([c.database for c in centers])
+        logger.info(f"Warmed mappings and connections for {len(centers)} centers")
+
+    def latest_slot(self, now: datetime) -> datetime:
+        slot = datetime.combine(now.date(), self.settings.at)
+        return slot if now >= slot else slot - timedelta(days=1)
+
+    def target_for(self, now: datetime) -> date:
+        """Date the most recent slot extracts."""
+        return self.latest_slot(now).date() - timedelta(days=1)
+
+    def pending(self, target: date) -> dict[date, list[str]]:
+        """Center IDs still to extract, per date."""
+        settings = self.settings
+        first = target - timedelta(days=settings.max_backfill_days)
+        changed = False
+        by_date: dict[date, list[str]] = {}
+
+        for center in self.centers():
+            start = max(settings.since, first) if settings.since else target
+            changed |= self.state.track(center.id, start)
+            skipped = self.state.skip_before(center.id, first)
+            if skipped:
+                changed = True
+                logger.warning(
+                    f"{center.id}: {skipped} days before {first} are older than "
+                    f"max_backfill_days ({settings.max_backfill_days}), not backfilled"
+                )
+            for day in self.state.pending(center.id, target):
+                by_date.setdefault(day, []).append(center.id)
+
+        if changed:
+            self.state.save()
+        return by_date
+
+    def run_cycle(self, target: date) -> int:
+        """Extract everything pending up to target; returns center-days left."""
+        self._load()
+        pending = self.pending(target)
+        total = sum(len(ids) for ids in pending.values())
+        if not total:
+            logger.info(f"All centers extracted through {target}")
+            return 0
+
+        backfill = sorted(day for day in pending if day != target)
+        logger.info(
+            f"{total} center-days pending: {len(pending.get(target, []))} for {target}, "
+            f"{total - len(pending.get(target, []))} backfill over {len(backfill)} dates"
+        )
+
+        order = ([target] if target in pending else []) + backfill
+        self._drop_stale_staging(target - timedelta(days=self.settings.max_backfill_days))
+        remaining = total
+        for day in order:
+            if self.stopped:
+                break
+            center_ids = pending[day]
+            workers = self.settings.workers if day == target else self.settings.catchup_workers
+            try:
+                result = self.service.extract_all(
+                    day, center_ids, max_workers=min(workers, len(center_ids)), cancel=self._stop
+                )
+            except ExtractionCancelled:
+                logger.info(f"Stopped during {day}; its centers stay pending")
+                break
+
+            succeeded = [r.center_id for r in result.results if r.error is None]
+            for center_id in succeeded:
+                self.state.mark_done(center_id, day)
+            self.state.save()
+            remaining -= len(succeeded)
+
+            logger.info(
+                f"{day}: {len(succeeded)}/{len(center_ids)} centers, "
+                f"{result.total_entries} entries in {result.total_duration_ms:.0f}ms"
+            )
+            if succeeded:
+                self._export(result)
+
+        return remaining
+
+    def _export(self, result: MultiExtractionResult) -> None:
+        """Write the day's complete export once all centers are done, else a partial."""
+        day = result.target_date
+        ok = [r for r in result.results if r.error is None]
+        center_ids = [c.id for c in self.centers()]
+        complete = None
+        if all(self.state.is_done(c, day) for c in center_ids):
+            complete = self._complete(result, ok, center_ids)
+
+        if complete is None:
+            self._stage(day, ok)
+            self._write(result, partial=True)
+        else:
+            self._write(complete, partial=False)
+            self._clear_partials(result)
+
+    def _complete(
+        self, result: MultiExtractionResult, ok: list[ExtractionResult], center_ids: list[str]
+    ) -> MultiExtractionResult | None:
+        """This run's centers plus the staged (or re-extracted) rest; None if one is missing."""
+        day = result.target_date
+        missing = [c for c in center_ids if c not in {r.center_id for r in ok}]
+        added = self._staged(day, missing)
+        missing = [c for c in missing if c not in added]
+        if missing:
+            try:
+                extra = self.service.extract_all(
+                    day, missing,
+                    max_workers=min(self.settings.catchup_workers, len(missing)),
+                    cancel=self._stop,
+                )
+            except ExtractionCancelled:
+                return None
+            failed = [r.center_id for r in extra.results if r.error is not None]
+            if failed:
+                logger.warning(
+                    f"{day}: all centers done but {', '.join(failed)} could not be "
+                    f"re-extracted; complete export not written"
+                )
+                return None
+            added.update((r.center_id, r) for r in extra.results)
+
+        results = sorted([*ok, *added.values()], key=lambda r: r.center_id)
+        return MultiExtractionResult(
+            target_date=day,
+            results=results,
+            total_entries=sum(len(r.entries) for r in results),
+            total_duration_ms=result.total_duration_ms + sum(r.duration_ms for r in added.values()),
+        )
+
+    def _write(self, result: MultiExtractionResult, partial: bool) -> None:
+        name = self.service.export_name(result)
+        if partial:
+            name += f"_partial-{datetime.now():%Y%m%d-%H%M%S}"
+        if "json" in self.settings.formats:
+            self.service.export_json(result, name)
+        if "csv" in self.settings.formats:
+            self.service.export_csv(result, name)
+
+    def _stage(self, day: date, results: list[ExtractionResult]) -> None:
+        """Keep successful centers of an incomplete day for the complete export."""
+        directory = self.staging_dir / day.isoformat()
+        directory.mkdir(parents=True, exist_ok=True)
+        for r in results:
+            data = {
+                "center_id": r.center_id,
+                "center_name": r.center_name,
+                "duration_ms": r.duration_ms,
+                "phases": r.phases,
+                "entries": list(r.entries.iter_dicts()),
+            }
+            tmp = directory / f"{r.center_id}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, directory / f"{r.center_id}.json")
+
+    def _staged(self, day: date, center_ids: list[str]) -> dict[str, ExtractionResult]:
+        """Staged results of a day for the given centers (missing ones are left out)."""
+        results = {}
+        directory = self.staging_dir / day.isoformat()
+        for center_id in center_ids:
+            path = directory / f"{center_id}.json"
+            if not path.exists():
+                continue
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = (ChartEntry(**{**e, "date": day}) for e in data["entries"])
+            results[center_id] = ExtractionResult(
+                center_id=data["center_id"],
+                center_name=data["center_name"],
+                entries=ChartEntryBatch.from_entries(data["center_id"], data["center_name"], day, entries),
+                duration_ms=data["duration_ms"],
+                phases=data["phases"],
+            )
+        return results
+
+    def _clear_partials(self, result: MultiExtractionResult) -> None:
+        """Remove a completed day's staging and interim partial exports."""
+        shutil.rmtree(self.staging_dir / result.target_date.isoformat(), ignore_errors=True)
+        name = f"{self.service.export_name(result)}_partial-"
+        for fmt in FORMATS:
+            for path in self.service.output_dir.glob(f"{name}*.{fmt}"):
+                path.unlink(missing_ok=True)
+                logger.info(f"Removed interim export {path.name}")
+
+    def _drop_stale_staging(self, first: date) -> None:
+        """Staged days before the backfill window will never complete."""
+        if not self.staging_dir.exists():
+            return
+        for directory in self.staging_dir.iterdir():
+            if directory.is_dir() and directory.name < first.isoformat():
+                logger.info(f"Dropping staged results of {directory.name} (outside backfill window)")
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def _sleep_until(self, when: datetime) -> bool:
+        """Wait until `when`; True if stopped meanwhile."""
+        return self._stop.wait(max(0.0, (when - datetime.now()).total_seconds()))
+
+    def run(self) -> None:
+        """Catch up, then run at every slot until stopped."""
+        settings = self.settings
+        self.warm()
+        try:
+            while not self.stopped:
+                try:
+                    remaining = self.run_cycle(self.target_for(datetime.now()))
+                except Exception as e:
+                    # Keep running (e.g. a half-written config); retry later
+                    logger.error(f"Extraction cycle failed: {e}")
+                    remaining = -1
+                if self.stopped:
+                    break
+
+                now = datetime.now()
+                wake = self.latest_slot(now) + timedelta(days=1)
+                if remaining:
+                    wake = min(wake, now + timedelta(minutes=settings.retry_minutes))
+                    logger.info(f"Work still pending, retrying at {wake:%Y-%m-%d %H:%M}")
+                else:
+                    logger.info(f"Next run at {wake:%Y-%m-%d %H:%M}")
+
+                if self._sleep_until(wake - timedelta(seconds=settings.warm_ahead_s)):
+                    break
+                try:
+                    self.warm()
+                except Exception as e:
+                    logger.error(f"Warm-up failed: {e}")
+                if self._sleep_until(wake):
+                    break
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+            logger.info("Scheduler stopped")
@@ -0,0 +1,269 @@
+"""
+Schema Diff - Mapping accuracy against generated ground truth.
+
+Compares each center's mapping file with the ground truth written by
+scripts/generate_test_dbs.py (actual table and column names per
+canonical name) and aggregates accuracy across centers.
+
+Per-center diffs are memoized with the (mtime_ns, size) of both files,
+so re-evaluating thousands of centers only stats the unchanged ones.
+Stale centers are loaded and compared on a thread pool.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ..core.profiling import propagate
+
+logger = logging.getLogger(__name__)
+
+GROUND_TRUTH_SUFFIX = "_ground_truth.json"
+MAPPING_SUFFIX = "_mapping.json"
+
+GOOD_ACCURACY = 80  # Below this a mapping needs review
+
+
+def compare_schemas(center_id: str, ground_truth: dict, mapping: dict | None) -> dict:
+    """Table/column comparison of a ground truth and a mapping (None if missing)."""
+    tables_matched = 0
+    tables_total = 0
+    columns_matched = 0
+    columns_total = 0
+    tables_diff = {}
+
+    mapping_tables = mapping.get("tables", {}) if mapping else {}
+
+    for canonical_table, gt_data in ground_truth.get("tables", {}).items():
+        tables_total += 1
+        gt_actual = gt_data.get("actual_name", "")
+
+        mapping_actual = ""
+        mapping_columns = {}
+        if canonical_table in mapping_tables:
+            mapping_actual = mapping_tables[canonical_table].get("actual_name", "")
+            mapping_columns = {
+                col: data.get("actual_name", "")
+                for col, data in mapping_tables[canonical_table].get("columns", {}).items()
+            }
+
+        table_match = gt_actual == mapping_actual
+        if table_match:
+            tables_matched += 1
+
+        columns_diff = {}
+        for canonical_col, gt_col_value in gt_data.get("columns", {}).items():
+            columns_total += 1
+            # Ground truth columns are stored as direct string values
+            gt_col_actual = gt_col_value if isinstance(gt_col_value, str) else gt_col_value.get("actual_name", "")
+            mapping_col_actual = mapping_columns.get(canonical_col, "")
+
+            col_match = gt_col_actual == mapping_col_actual
+            if col_match:
+                columns_matched += 1
+
+            columns_diff[canonical_col] = {
+                "ground_truth": gt_col_actual,
+                "mapping": mapping_col_actual,
+                "match": col_match,
+            }
+
+        tables_diff[canonical_table] = {
+            "ground_truth": gt_actual,
+            "mapping": mapping_actual,
+            "match": table_match,
+            "columns": columns_diff,
+        }
+
+    return {
+        "center_id": center_id,
+        "has_mapping": mapping is not None,
+        "tables_matched": tables_matched,
+        "tables_total": tables_total,
+        "columns_matched": columns_matched,
+        "columns_total": columns_total,
+        "accuracy": _accuracy(tables_matched + columns_matched, tables_total + columns_total),
+        "tables": tables_diff,
+    }
+
+
+def _accuracy(matched: int, total: int) -> int:
+    return round((matched / total * 100) if total > 0 else 0)
+
+
+def _file_state(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_json(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass
+class EvaluationReport:
+    """Per-center diffs plus aggregate accuracy."""
+
+    centers: list[dict] = field(default_factory=list)
+    missing_ground_truth: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    loaded: int = 0  # Centers (re)read from disk; the rest came from the memo
+
+    @property
+    def tables_matched(self) -> int:
+        return sum(c["tables_matched"] for c in self.centers)
+
+    @property
+    def tables_total(self) -> int:
+        return sum(c["tables_total"] for c in self.centers)
+
+    @property
+    def columns_matched(self) -> int:
+        return sum(c["columns_matched"] for c in self.centers)
+
+    @property
+    def columns_total(self) -> int:
+        return sum(c["columns_total"] for c in self.centers)
+
+    @property
+    def accuracy(self) -> int:
+        """Accuracy over all tables and columns of all centers."""
+        return _accuracy(
+            self.tables_matched + self.columns_matched,
+            self.tables_total + self.columns_total,
+        )
+
+    def summary(self) -> dict[str, Any]:
+        accuracies = [c["accuracy"] for c in self.centers]
+        return {
+            "centers": len(self.centers),
+            "tables_matched": self.tables_matched,
+            "tables_total": self.tables_total,
+            "columns_matched": self.columns_matched,
+            "columns_total": self.columns_total,
+            "accuracy": self.accuracy,
+            "mean_center_accuracy": round(sum(accuracies) / len(accuracies), 1) if accuracies else 0,
+            "perfect": sum(1 for a in accuracies if a == 100),
+            "good": sum(1 for a in accuracies if GOOD_ACCURACY <= a < 100),
+            "needs_review": sum(1 for a in accuracies if a < GOOD_ACCURACY),
+            "without_mapping": sum(1 for c in self.centers if not c["has_mapping"]),
+        }
+
+    def to_dict(self, details: bool = False) -> dict[str, Any]:
+        """JSON form; per-table diffs only with details (they dominate the size)."""
+        if details:
+            centers = self.centers
+        else:
+            centers = [{k: v for k, v in c.items() if k != "tables"} for c in self.centers]
+        return {
+            "summary": self.summary(),
+            "centers": centers,
+            "missing_ground_truth": self.missing_ground_truth,
+            "errors": self.errors,
+        }
+
+
+class SchemaDiffEvaluator:
+    """Evaluates mapping accuracy for many centers, memoized by file state."""
+
+    def __init__(self, ground_truth_dir: Path, mappings_dir: Path, max_workers: int = 8):
+        self.ground_truth_dir = ground_truth_dir
+        self.mappings_dir = mappings_dir
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._memo: dict[str, tuple[tuple, dict]] = {}  # center -> (file states, diff)
+
+    def ground_truth_file(self, center_id: str) -> Path:
+        return self.ground_truth_dir / f"{center_id}{GROUND_TRUTH_SUFFIX}"
+
+    def mapping_file(self, center_id: str) -> Path:
+        return self.mappings_dir / f"{center_id}{MAPPING_SUFFIX}"
+
+    def center_ids(self) -> list[str]:
+        """Centers that have a ground truth file."""
+        if not self.ground_truth_dir.exists():
+            return []
+        return sorted(
+            p.name[: -len(GROUND_TRUTH_SUFFIX)]
+            for p in self.ground_truth_dir.glob(f"*{GROUND_TRUTH_SUFFIX}")
+        )
+
+    def depends_on(self, center_ids: list[str]) -> list[Path]:
+        """Files (and directories) a report for these centers is built from."""
+        paths = [self.ground_truth_dir, self.mappings_dir]
+        for center_id in center_ids:
+            paths.append(self.ground_truth_file(center_id))
+            paths.append(self.mapping_file(center_id))
+        return paths
+
+    def _states(self, center_id: str) -> tuple:
+        return (
+            _file_state(self.ground_truth_file(center_id)),
+            _file_state(self.mapping_file(center_id)),
+        )
+
+    def _compute(self, center_id: str, states: tuple) -> dict:
+        ground_truth = _load_json(self.ground_truth_file(center_id))
+        mapping = _load_json(self.mapping_file(center_id)) if states[1] else None
+        diff = compare_schemas(center_id, ground_truth, mapping)
+        with self._lock:
+            self._memo[center_id] = (states, diff)
+        return diff
+
+    def diff(self, center_id: str) -> dict | None:
+        """Diff of one center; None if it has no ground truth."""
+        states = self._states(center_id)
+        if states[0] is None:
+            return None
+        with self._lock:
+            memo = self._memo.get(center_id)
+        if memo is not None and memo[0] == states:
+            return memo[1]
+        return self._compute(center_id, states)
+
+    def evaluate(self, center_ids: list[str] | None = None) -> EvaluationReport:
+        """Diffs of the given centers (default: all with ground truth)."""
+        if center_ids is None:
+            center_ids = self.center_ids()
+
+        report = EvaluationReport()
+        diffs: dict[str, dict] = {}
+        stale: list[tuple[str, tuple]] = []
+
+        states_by_center = {center_id: self._states(center_id) for center_id in center_ids}
+        with self._lock:
+            for center_id, states in states_by_center.items():
+                if states[0] is None:
+                    report.missing_ground_truth.append(center_id)
+                    continue
+                memo = self._memo.get(center_id)
+                if memo is not None and memo[0] == states:
+                    diffs[center_id] = memo[1]
+                else:
+                    stale.append((center_id, states))
+
+        if stale:
+            workers = max(1, min(self.max_workers, len(stale)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    center_id: executor.submit(propagate(self._compute), center_id, states)
+                    for center_id, states in stale
+                }
+                for center_id, future in futures.items():
+                    try:
+                        diffs[center_id] = future.result()
+                    except (OSError, ValueError, AttributeError) as e:
+                        logger.warning(f"Could not evaluate {center_id}: {e}")
+                        report.errors[center_id] = str(e)
+            report.loaded = len(stale) - len(report.errors)
+
+        report.centers = [diffs[c] for c in center_ids if c in diffs]
+        return report
@@ -0,0 +1,226 @@
+"""
+Table Browser - Paginated access to a center's mapped tables.
+
+Callers use canonical names only. Projection, filters and sort order
+are rewritten through the center's schema mapping and pushed down to
+SQL; values are always sent as parameters.
+
+Pagination is keyset-based on the table's ID column: each page ends
+with a cursor and the next page starts strictly after it, so page N
+costs the same as page 1 (an index seek instead of skipping rows).
+Sorting on another column pages on (sort value, ID); rows with a NULL
+sort value come first (last when descending) and are paged by ID.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from ..core.dialect import Dialect, get_dialect
+from ..core.schema_mapping import SchemaMapping
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = "ID"
+QUERY_TIMEOUT_S = 30
+
+# Filter value prefixes, e.g. DATUM=ge:20220101
+OPERATORS = {"eq": "=", "ne": "<>", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+
+class TableQueryError(ValueError):
+    """Invalid table browser request (unknown table/column, bad cursor)."""
+
+
+@dataclass
+class TablePage:
+    """One page of rows, keyed by canonical column names."""
+
+    table: str
+    actual_table: str
+    columns: list[str]
+    rows: list[dict[str, Any]]
+    next_after: str | None  # Cursor for the next page; None on the last page
+
+
+def parse_filter(value: str) -> tuple[str, str | None]:
+    """Split 'ge:20220101' into ('>=', '20220101'); 'null' means IS NULL."""
+    if value.lower() == "null":
+        return "IS", None
+    prefix, sep, rest = value.partition(":")
+    if sep and prefix in OPERATORS:
+        return OPERATORS[prefix], rest
+    return "=", value
+
+
+def _parse_key(value: Any) -> int:
+    """Cursor key as an integer ID."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise TableQueryError(f"Invalid cursor: {value}")
+
+
+def build_page_query(
+    schema: SchemaMapping,
+    table: str,
+    columns: list[str] | None = None,
+    filters: dict[str, str] | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+    after: str | None = None,
+    limit: int = 100,
+    dialect: Dialect | None = None,
+) -> tuple[str, list, list[str], list[str]]:
+    """
+    Build the SQL for one page.
+
+    Returns (sql, params, output columns, extra columns). Key and sort
+    columns are selected after the output columns even when not
+    projected, so the cursor can always be built.
+    """
+    dialect = dialect or get_dialect()
+    quote_name = dialect.quote_name
+    table_mapping = schema.tables.get(table)
+    if table_mapping is None:
+        raise TableQueryError(f"Table '{table}' is not in the mapping")
+
+    mapped = table_mapping.columns
+    if not mapped:
+        raise TableQueryError(f"No columns mapped for '{table}'")
+
+    def actual(canonical: str) -> str:
+        if canonical not in mapped:
+            raise TableQueryError(f"Unknown column '{canonical}' in {table}")
+        return quote_name(mapped[canonical].actual_name)
+
+    has_key = KEY_COLUMN in mapped
+    sort = sort or (KEY_COLUMN if has_key else None)
+
+    output = list(columns) if columns else list(mapped)
+    wanted = [KEY_COLUMN if has_key else None, sort]
+    extra = [c for c in dict.fromkeys(wanted) if c and c not in output]
+    select = [f"{actual(c)} AS {quote_name(c)}" for c in output + extra]
+
+    where = []
+    params: list = []
+    for canonical, value in (filters or {}).items():
+        op, operand = parse_filter(value)
+        if operand is None:
+            where.append(f"{actual(canonical)} IS NULL")
+        else:
+            where.append(f"{actual(canonical)} {op} ?")
+            params.append(operand)
+
+    direction = "DESC" if descending else "ASC"
+    cmp = "<" if descending else ">"
+    order = ""
+
+    if sort is not None:
+        sort_col = actual(sort)
+        if not has_key:
+            if after is not None:
+                raise TableQueryError(f"'{table}' has no {KEY_COLUMN} column for paging")
+            order = f" ORDER BY {sort_col} {direction}"
+        elif sort == KEY_COLUMN:
+            if after is not None:
+                where.append(f"{sort_col} {cmp} ?")
+                params.append(_parse_key(after))
+            order = f" ORDER BY {sort_col} {direction}"
+        else:
+            # (NULL flag, sort value, key) keyset: NULLs sort first ascending
+            key_col = actual(KEY_COLUMN)
+            if after is not None:
+                try:
+                    last_value, last_key = json.loads(after)
+                except (ValueError, TypeError):
+                    raise TableQueryError(f"Invalid cursor: {after}")
+                last_key = _parse_key(last_key)
+                after_value = f"({sort_col} {cmp} ? OR ({sort_col} = ? AND {key_col} {cmp} ?))"
+                if last_value is None and descending:
+                    where.append(f"({sort_col} IS NULL AND {key_col} < ?)")
+                    params.append(last_key)
+                elif last_value is None:
+                    where.append(f"(({sort_col} IS NULL AND {key_col} > ?) OR {sort_col} IS NOT NULL)")
+                    params.append(last_key)
+                elif descending:
+                    where.append(f"({after_value} OR {sort_col} IS NULL)")
+                    params.extend([last_value, last_value, last_key])
+                else:
+                    where.append(after_value)
+                    params.extend([last_value, last_value, last_key])
+            null_flag = f"CASE WHEN {sort_col} IS NULL THEN 0 ELSE 1 END"
+            order = (
+                f" ORDER BY {null_flag} {direction}, {sort_col} {direction}, {key_col} {direction}"
+            )
+    elif after is not None:
+        raise TableQueryError(f"'{table}' has no {KEY_COLUMN} column for paging")
+
+    sql = (
+        f"SELECT {', '.join(select)} "
+        f"FROM {quote_name(schema.schema)}.{quote_name(table_mapping.actual_name)}"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += order
+
+    return dialect.limit(sql, limit), params, output, extra
+
+
+def _json_value(value: Any) -> Any:
+    """Convert dates and other driver types for JSON."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if value is not None and not isinstance(value, (int, float, bool, str)):
+        return str(value)
+    return value
+
+
+def fetch_page(
+    pool,
+    database: str,
+    schema: SchemaMapping,
+    table: str,
+    columns: list[str] | None = None,
+    filters: dict[str, str] | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+    after: str | None = None,
+    limit: int = 100,
+) -> TablePage:
+    """Fetch one page of a mapped table through a pooled connection."""
+    dialect = pool.dialect
+    sql, params, output, extra = build_page_query(
+        schema, table, columns, filters, sort, descending, after, limit, dialect
+    )
+
+    with pool.connection(database) as conn:
+        dialect.set_query_timeout(conn, QUERY_TIMEOUT_S)
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        raw = cursor.fetchall()
+        cursor.close()
+
+    rows = [
+        {col: _json_value(value) for col, value in zip(output, row)}
+        for row in raw
+    ]
+
+    next_after = None
+    position = {col: i for i, col in enumerate(output + extra)}
+    if KEY_COLUMN in position and len(raw) == limit:
+        last = raw[-1]
+        last_key = last[position[KEY_COLUMN]]
+        if (sort or KEY_COLUMN) == KEY_COLUMN:
+            next_after = str(last_key)
+        else:
+            next_after = json.dumps([_json_value(last[position[sort]]), last_key])
+
+    return TablePage(
+        table=table,
+        actual_table=schema.tables[table].actual_name,
+        columns=output,
+        rows=rows,
+        next_after=next_after,
+    )
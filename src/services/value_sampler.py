@@ -0,0 +1,265 @@
+"""
+Value Sampler - Classifies ambiguous columns by the shape of their values.
+
+When name-based matching leaves a canonical column unresolved, the
+remaining (unmapped) columns of that table are sampled and scored:
+
+- DATUM: 8-digit YYYYMMDD integers (Ivoris date format)
+- DELKZ: 0/1 delete flags
+- ART:   insurance type codes ('P' or digits)
+
+Sampling is strictly bounded: TOP n rows (TABLESAMPLE first on large
+tables where the backend supports it), a per-query timeout, and a shared worker pool across columns
+and centers. Only the resulting shape scores are cached - never the
+sampled values - keyed by the center's schema fingerprint, so reruns
+against an unchanged schema issue no queries.
+"""
+
+import json
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable
+
+from ..core.dialect import Dialect, get_dialect
+from ..core.discovery import DiscoveredSchema
+from ..core.profiling import propagate
+from ..core.storage import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_DIR = Path(__file__).parent.parent.parent / "data" / "samples"
+
+SAMPLE_ROWS = 200
+QUERY_TIMEOUT_S = 5
+TABLESAMPLE_MIN_ROWS = 100_000  # Below this, TOP alone is cheap enough
+MIN_SCORE = 0.95
+
+
+def is_ivoris_date(value: Any) -> bool:
+    """8-digit YYYYMMDD integer that is a real calendar date."""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return False
+    if not 19000101 <= n <= 21001231:
+        return False
+    try:
+        date(n // 10000, n // 100 % 100, n % 100)
+    except ValueError:
+        return False
+    return True
+
+
+def is_delete_flag(value: Any) -> bool:
+    """0/1 flag."""
+    return str(value).strip() in ("0", "1", "True", "False")
+
+
+def is_insurance_type(value: Any) -> bool:
+    """KASSEN.ART code: 'P' (private) or a short digit code."""
+    s = str(value).strip().upper()
+    return 1 <= len(s) <= 2 and (s == "P" or s.isdigit())
+
+
+# canonical column -> (value test, data types the column may have)
+CLASSIFIERS: dict[str, tuple[Callable[[Any], bool], set[str]]] = {
+    "DATUM": (is_ivoris_date, {"int", "bigint", "numeric", "decimal"}),
+    "DELKZ": (is_delete_flag, {"int", "smallint", "tinyint", "bit"}),
+    "ART": (is_insurance_type, {"char", "varchar", "nchar", "nvarchar"}),
+}
+
+
+def score_values(values: list[Any]) -> dict[str, float]:
+    """Fraction of non-null values that fit each classifier."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return {}
+    return {
+        canonical: sum(1 for v in values if test(v)) / len(values)
+        for canonical, (test, _) in CLASSIFIERS.items()
+    }
+
+
+def sample_query(
+    schema: str,
+    table: str,
+    column: str,
+    rows: int,
+    row_count: int | None,
+    dialect: Dialect | None = None,
+) -> str:
+    """Bounded sample of one column's non-null values."""
+    dialect = dialect or get_dialect()
+    tablesample = ""
+    if row_count and row_count > TABLESAMPLE_MIN_ROWS:
+        # Page-level sampling clusters rows, so oversample before TOP
+        percent = min(100, max(1, math.ceil(rows * 20 * 100 / row_count)))
+        tablesample = dialect.tablesample(percent)
+    col = dialect.quote_name(column)
+    return dialect.limit(
+        f"SELECT {col} "
+        f"FROM {dialect.quote_name(schema)}.{dialect.quote_name(table)}{tablesample} "
+        f"WHERE {col} IS NOT NULL",
+        rows,
+    )
+
+
+class ValueSampler:
+    """Resolves unresolved mapping columns by sampling candidate values."""
+
+    def __init__(
+        self,
+        db_config,
+        sample_rows: int = SAMPLE_ROWS,
+        timeout_s: int = QUERY_TIMEOUT_S,
+        max_workers: int = 8,
+        cache_dir: Path | None = None,
+    ):
+        self.db_config = db_config
+        self.dialect = db_config.dialect
+        self.sample_rows = sample_rows
+        self.timeout_s = timeout_s
+        self.cache_dir = cache_dir or SAMPLES_DIR
+        # Shared by all centers, so total sampling load stays bounded
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _cache_path(self, center_id: str) -> Path:
+        return self.cache_dir / f"{center_id}_samples.json"
+
+    def _load_cache(self, center_id: str, fingerprint: str) -> dict[str, dict]:
+        path = self._cache_path(center_id)
+        if not path.exists():
+            return {}
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("fingerprint") != fingerprint:
+            return {}
+        return data.get("columns", {})
+
+    def _sample(
+        self, conn_str: str, schema: str, table: str, column: str, row_count: int | None
+    ) -> dict:
+        sampled = sample_query(schema, table, column, self.sample_rows, row_count, self.dialect)
+        plain = sample_query(schema, table, column, self.sample_rows, None, self.dialect)
+        queries = 0
+        conn = self.dialect.connect(conn_str, timeout=self.timeout_s)
+        try:
+            self.dialect.set_query_timeout(conn, self.timeout_s)
+            cursor = conn.cursor()
+            queries += 1
+            cursor.execute(sampled)
+            values = [row[0] for row in cursor.fetchmany(self.sample_rows)]
+            if not values and sampled != plain:
+                # Sampled pages held only NULLs - fall back to plain TOP
+                queries += 1
+                cursor.execute(plain)
+                values = [row[0] for row in cursor.fetchmany(self.sample_rows)]
+            cursor.close()
+        finally:
+            conn.close()
+            with self._lock:
+                self.queries += queries
+        return {"samples": len(values), "scores": score_values(values)}
+
+    def resolve(self, center, mapping: dict, discovered: DiscoveredSchema) -> list[str]:
+        """
+        Fill unresolved columns of a mapping in place.
+
+        Returns the resolved "TABLE.COLUMN" canonical names.
+        """
+        fingerprint = mapping.get("schema_fingerprint", "")
+        cache = self._load_cache(center.id, fingerprint)
+        conn_str = self.db_config.connection_string(center.database)
+        live = {t.name: t for t in discovered.tables}
+
+        # Candidate columns whose type fits at least one wanted classifier
+        candidates: dict[str, list[tuple[str, str]]] = {}
+        futures = {}
+        for canonical_table, table in mapping["tables"].items():
+            wanted = [c for c in table.get("unresolved_columns", []) if c in CLASSIFIERS]
+            live_table = live.get(table["actual_name"])
+            if not wanted or live_table is None:
+                continue
+
+            types = {c.name: c.data_type for c in live_table.columns}
+            for column in table.get("unmapped_columns", []):
+                if not any(types.get(column) in CLASSIFIERS[w][1] for w in wanted):
+                    continue
+                key = f"{table['actual_name']}.{column}"
+                candidates.setdefault(canonical_table, []).append((column, key))
+                if key not in cache and key not in futures:
+                    futures[key] = self._executor.submit(
+                        propagate(self._sample),
+                        conn_str,
+                        mapping.get("schema", "ck"),
+                        table["actual_name"],
+                        column,
+                        live_table.row_count,
+                    )
+
+        for key, future in futures.items():
+            try:
+                cache[key] = future.result()
+            except self.dialect.Error as e:
+                logger.warning(f"  {center.id}: sampling {key} failed: {e}")
+
+        if futures:
+            write_json_atomic(
+                self._cache_path(center.id),
+                {"fingerprint": fingerprint, "columns": cache},
+            )
+
+        resolved = []
+        for canonical_table, columns in candidates.items():
+            table = mapping["tables"][canonical_table]
+            types = {c.name: c.data_type for c in live[table["actual_name"]].columns}
+
+            for canonical in [c for c in table["unresolved_columns"] if c in CLASSIFIERS]:
+                allowed_types = CLASSIFIERS[canonical][1]
+                scored = sorted(
+                    (
+                        (cache[key]["scores"].get(canonical, 0.0), column)
+                        for column, key in columns
+                        if key in cache
+                        and column in table["unmapped_columns"]
+                        and types.get(column) in allowed_types
+                    ),
+                    reverse=True,
+                )
+                if not scored or scored[0][0] < MIN_SCORE:
+                    continue
+                if len(scored) > 1 and scored[1][0] >= MIN_SCORE:
+                    logger.info(
+                        f"  {center.id}: {canonical_table}.{canonical} ambiguous "
+                        f"({scored[0][1]}, {scored[1][1]}), left for review"
+                    )
+                    continue
+
+                score, column = scored[0]
+                table["columns"][canonical] = {
+                    "actual_name": column,
+                    "data_type": types.get(column),
+                    "confidence": round(score, 3),
+                    "method": "sampled",
+                }
+                table["unresolved_columns"].remove(canonical)
+                table["unmapped_columns"].remove(column)
+                resolved.append(f"{canonical_table}.{canonical}")
+
+        return resolved
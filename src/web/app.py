@@ -6,18 +6,35 @@ Simple UI for exploring dental center databases and viewing metrics.
 
 import json
 import logging
+import os
+import threading
+import time
+from contextlib import aclosing
 from datetime import date, datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-
-from ..core.config import load_config
-from ..core.introspector import list_available_mappings
-from ..services.extraction import ExtractionService
+from pydantic import BaseModel
+
+from ..core.config import default_config_path, load_config
+from ..core.introspector import cache_stats, get_schema, list_available_mappings
+from ..core.metrics import REGISTRY, MetricFamily
+from ..core.pool import ConnectionPool
+from ..core.profiling import RunProfiler
+from ..core.tracing import TRACES_DIR, TraceRecorder
+from ..services.benchmark import BENCHMARK_DATE, TARGET_MS
+from ..services.extraction import ExtractionCancelled, ExtractionService
+from ..services.schema_diff import SchemaDiffEvaluator
+from .cache import ResponseCache, conditional_response
+from .executor import BlockingExecutor
+from .instrumentation import MetricsMiddleware, prometheus_response, wants_prometheus
+from .jobs import QUEUED, RUNNING, SUCCEEDED, Job, JobCancelled, JobManager
+from .serialization import CompressionMiddleware, FastJSONResponse, dumps
 
 logger = logging.getLogger(__name__)
 
@@ -34,26 +51,76 @@ app = FastAPI(
     title="Ivoris Multi-Center Explorer",
     description="Explore dental center databases and view extraction metrics",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
+# Compress large, non-streaming responses (gzip, or brotli if installed)
+app.add_middleware(CompressionMiddleware)
+
+# Request counts/durations per route (outermost: sees bytes on the wire)
+app.add_middleware(MetricsMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-# Load config once
+# Blocking work (extraction, pyodbc) runs on a bounded pool, never on
+# the event loop. Per endpoint: (max concurrent, max queued).
+ENDPOINT_LIMITS = {
+    "extract": (2, 8),
+    "benchmark": (1, 2),
+    "table-data": (4, 16),
+    "schema-diff": (2, 8),
+}
+blocking = BlockingExecutor(ENDPOINT_LIMITS)
+
+# Requests sending this header run under the profiler, if enabled
+# (`python -m src.cli --profile web`); see core/profiling.py
+PROFILE_HEADER = "X-Profile"
+PROFILING_ENABLED = os.environ.get("IVORIS_PROFILING") == "1"
+
+# Background extraction/benchmark jobs (POST /api/jobs)
+jobs = JobManager(max_workers=2)
+
+# Config is reloaded when its file changes
+CONFIG_PATH = default_config_path()
 _config = None
+_config_mtime_ns = None
+_pool = None
+_pool_lock = threading.Lock()
+
+# Serialized responses of file-backed endpoints (see cache.py)
+response_cache = ResponseCache()
+
+# Mapping accuracy against ground truth, memoized per center
+schema_diffs = SchemaDiffEvaluator(GROUND_TRUTH_DIR, MAPPINGS_DIR)
 
 
 def get_config():
-    """Get or load configuration."""
-    global _config
-    if _config is None:
-        _config = load_config()
+    """Get configuration, reloading it if the file changed."""
+    global _config, _config_mtime_ns
+    mtime_ns = CONFIG_PATH.stat().st_mtime_ns
+    if _config is None or mtime_ns != _config_mtime_ns:
+        _config = load_config(CONFIG_PATH)
+        _config_mtime_ns = mtime_ns
     return _config
 
 
+def get_pool() -> ConnectionPool:
+    """Connection pool shared by all requests, replaced when the database config changes."""
+    global _pool
+    db_config = get_config().database
+    with _pool_lock:
+        if _pool is None or _pool.db_config != db_config:
+            if _pool is not None:
+                logger.info("Database config changed, replacing the connection pool")
+                _pool.close()
+            _pool = ConnectionPool(db_config)
+        return _pool
+
+
 # =============================================================================
 # HTML PAGES
 # =============================================================================
@@ -87,7 +154,9 @@ async def explore_page(request: Request):
 
 @app.get("/metrics", response_class=HTMLResponse)
 async def metrics_page(request: Request):
-    """View extraction metrics."""
+    """View extraction metrics (Prometheus text format for scrapers)."""
+    if wants_prometheus(request):
+        return prometheus_response()
     return templates.TemplateResponse(
         "metrics.html",
         {
@@ -117,28 +186,34 @@ async def schema_diff_page(request: Request):
 
 
 @app.get("/api/centers")
-async def list_centers():
+async def list_centers(request: Request):
     """List all configured centers with mapping status."""
     config = get_config()
-    available_mappings = set(list_available_mappings(MAPPINGS_DIR))
 
-    centers = []
-    for center in config.centers:
-        centers.append(
-            {
-                "id": center.id,
-                "name": center.name,
-                "city": center.city,
-                "database": center.database,
-                "has_mapping": center.id in available_mappings,
-            }
-        )
+    def build():
+        available_mappings = set(list_available_mappings(MAPPINGS_DIR))
 
-    return {"centers": centers, "total": len(centers)}
+        centers = []
+        for center in config.centers:
+            centers.append(
+                {
+                    "id": center.id,
+                    "name": center.name,
+                    "city": center.city,
+                    "database": center.database,
+                    "has_mapping": center.id in available_mappings,
+                }
+            )
+
+        return {"centers": centers, "total": len(centers)}
+
+    # The directory mtime changes when mapping files are added or removed
+    cached = response_cache.get("centers", [CONFIG_PATH, MAPPINGS_DIR], build)
+    return conditional_response(request, cached)
 
 
 @app.get("/api/centers/{center_id}")
-async def get_center(center_id: str):
+async def get_center(request: Request, center_id: str):
     """Get center details and schema mapping."""
     config = get_config()
     center = config.get_center(center_id)
@@ -146,28 +221,29 @@ async def get_center(center_id: str):
     if not center:
         raise HTTPException(status_code=404, detail=f"Center not found: {center_id}")
 
-    # Load mapping if available
-    mapping = None
     mapping_file = MAPPINGS_DIR / f"{center_id}_mapping.json"
-    if mapping_file.exists():
-        with open(mapping_file) as f:
-            mapping = json.load(f)
 
-    return {
-        "id": center.id,
-        "name": center.name,
-        "city": center.city,
-        "database": center.database,
-        "mapping": mapping,
-    }
+    def build():
+        # Load mapping if available
+        mapping = None
+        if mapping_file.exists():
+            with open(mapping_file) as f:
+                mapping = json.load(f)
 
+        return {
+            "id": center.id,
+            "name": center.name,
+            "city": center.city,
+            "database": center.database,
+            "mapping": mapping,
+        }
 
-@app.get("/api/extract")
-async def extract_data(
-    date_str: str = Query(default="2022-01-18", alias="date"),
-    center_ids: Optional[str] = Query(default=None, alias="centers"),
-):
-    """Extract chart entries from centers."""
+    cached = response_cache.get(("center", center_id), [CONFIG_PATH, mapping_file], build)
+    return conditional_response(request, cached)
+
+
+def _parse_extract_request(date_str: str, center_ids: Optional[str]):
+    """Validate extraction parameters; returns (config, date, center IDs)."""
     config = get_config()
 
     # Check for mappings
@@ -184,23 +260,185 @@ async def extract_data(
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid date: {date_str}")
 
-    # Parse center IDs
-    selected_centers = None
-    if center_ids:
-        selected_centers = [c.strip() for c in center_ids.split(",")]
-        # Validate centers exist
-        for cid in selected_centers:
-            if not config.get_center(cid):
-                raise HTTPException(status_code=404, detail=f"Unknown center: {cid}")
-
-    # Run extraction
-    service = ExtractionService(config)
-    result = service.extract_all(
-        target_date=target_date,
-        center_ids=selected_centers,
-        max_workers=5,
+    return config, target_date, _parse_center_ids(config, center_ids)
+
+
+def _parse_center_ids(config, center_ids: Optional[str]) -> list[str] | None:
+    """Comma-separated center IDs, stripped and deduplicated; 404 for unknown ones."""
+    if not center_ids:
+        return None
+    selected = list(dict.fromkeys(c.strip() for c in center_ids.split(",") if c.strip()))
+    for cid in selected:
+        if not config.get_center(cid):
+            raise HTTPException(status_code=404, detail=f"Unknown center: {cid}")
+    return selected or None
+
+
+def _profiled(request: Request, response: Response, name: str, func):
+    """func, run under the profiler if the request opted in."""
+    if not PROFILING_ENABLED or request.headers.get(PROFILE_HEADER) != "1":
+        return func
+
+    def run(*args, **kwargs):
+        with RunProfiler(name) as profiler:
+            result = func(*args, **kwargs)
+        response.headers["X-Profile-Run"] = profiler.report.run_id
+        return result
+
+    return run
+
+
+@app.get("/api/extract")
+async def extract_data(
+    request: Request,
+    response: Response,
+    date_str: str = Query(default="2022-01-18", alias="date"),
+    center_ids: Optional[str] = Query(default=None, alias="centers"),
+    shape: str = Query(default="rows", pattern="^(rows|columnar)$"),
+):
+    """
+    Extract chart entries from centers.
+
+    shape=columnar returns each center's entries as parallel arrays per
+    field instead of one object per entry (smaller and faster to encode).
+    """
+    config, target_date, selected_centers = _parse_extract_request(date_str, center_ids)
+
+    return await blocking["extract"].run(
+        _profiled(request, response, "api-extract", _run_extraction), config, target_date, selected_centers, shape
     )
 
+
+@app.get("/api/extract/stream")
+async def extract_stream(
+    request: Request,
+    date_str: str = Query(default="2022-01-18", alias="date"),
+    center_ids: Optional[str] = Query(default=None, alias="centers"),
+    include_entries: bool = Query(default=False, alias="entries"),
+    shape: str = Query(default="rows", pattern="^(rows|columnar)$"),
+    fmt: Optional[str] = Query(default=None, alias="format", pattern="^(ndjson|sse)$"),
+):
+    """
+    Stream extraction results, one event per center as it completes.
+
+    Events: "start" (center count), "center" (timing, counts and, with
+    entries=true, the entries in the given shape), "done" (totals). Sent as NDJSON by
+    default, or as Server-Sent Events with format=sse or
+    Accept: text/event-stream.
+    """
+    config, target_date, selected_centers = _parse_extract_request(date_str, center_ids)
+    if fmt is None:
+        accept = request.headers.get("accept", "")
+        fmt = "sse" if "text/event-stream" in accept else "ndjson"
+
+    # Reject before the response starts; afterwards errors become events
+    blocking["extract"].check_capacity()
+    service = ExtractionService(config, pool=get_pool())
+    total = len(service.select_centers(selected_centers))
+
+    def encode(event: str, data: dict) -> bytes:
+        if fmt == "sse":
+            return f"event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+        return dumps({"event": event, **data}) + b"\n"
+
+    async def events():
+        start = time.perf_counter()
+        completed = successful = total_entries = 0
+        yield encode("start", {"date": target_date.isoformat(), "total_centers": total})
+
+        results = blocking["extract"].iterate(
+            service.iter_extract, target_date, selected_centers, 5
+        )
+        try:
+            async with aclosing(results):
+                async for r in results:
+                    completed += 1
+                    successful += r.error is None
+                    total_entries += len(r.entries)
+                    yield encode("center", _center_event(r, completed, total, include_entries, shape))
+        except HTTPException as e:
+            yield encode("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+
+        yield encode("done", {
+            "date": target_date.isoformat(),
+            "total_entries": total_entries,
+            "total_duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "successful_centers": successful,
+            "total_centers": completed,
+        })
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        # Disable proxy buffering so events reach the browser immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _center_event(
+    r, completed: int, total: int, include_entries: bool, shape: str = "rows"
+) -> dict:
+    """Stream event for one finished center."""
+    data = {
+        "center_id": r.center_id,
+        "center_name": r.center_name,
+        "entries_count": len(r.entries),
+        "duration_ms": round(r.duration_ms, 1),
+        "success": r.error is None,
+        "error": r.error,
+        "completed": completed,
+        "total_centers": total,
+    }
+    if include_entries:
+        data["entries"] = _entries_payload(r.entries, shape)
+    return data
+
+
+def _entries_payload(entries, shape: str):
+    """Entries of one center in the requested shape."""
+    if shape == "columnar":
+        return entries.to_columns()
+    return entries.to_dicts()
+
+
+def _extract(
+    config,
+    target_date: date,
+    center_ids: list[str] | None,
+    job: Job | None,
+    trace: TraceRecorder | None = None,
+):
+    """Run extract_all, reporting progress to and honoring cancellation of a job."""
+    service = ExtractionService(config, pool=get_pool(), trace=trace)
+    if job is None:
+        return service.extract_all(target_date, center_ids, max_workers=5)
+
+    job.total = len(service.select_centers(center_ids))
+
+    def on_result(_):
+        job.completed += 1
+
+    try:
+        return service.extract_all(
+            target_date, center_ids, max_workers=5,
+            on_result=on_result, cancel=job.cancel_event,
+        )
+    except ExtractionCancelled:
+        raise JobCancelled(job.id)
+
+
+def _run_extraction(
+    config,
+    target_date: date,
+    center_ids: list[str] | None,
+    shape: str = "rows",
+    job: Job | None = None,
+) -> dict:
+    """Run an extraction and format the response (blocking)."""
+    result = _extract(config, target_date, center_ids, job)
+
     # Format results
     centers_data = []
     for r in result.results:
@@ -212,12 +450,13 @@ async def extract_data(
                 "duration_ms": round(r.duration_ms, 1),
                 "success": r.error is None,
                 "error": r.error,
-                "entries": [e.to_dict() for e in r.entries],
+                "entries": _entries_payload(r.entries, shape),
             }
         )
 
     return {
         "date": result.target_date.isoformat(),
+        "shape": shape,
         "total_entries": result.total_entries,
         "total_duration_ms": round(result.total_duration_ms, 1),
         "successful_centers": result.successful_centers,
@@ -226,14 +465,30 @@ async def extract_data(
     }
 
 
+# Query parameters of /api/table-data that are not column filters
+TABLE_DATA_PARAMS = {"limit", "after", "columns", "sort", "desc"}
+
+
 @app.get("/api/table-data/{center_id}/{table_name}")
 async def get_table_data(
+    request: Request,
     center_id: str,
     table_name: str,
-    limit: int = Query(default=100, le=1000),
+    limit: int = Query(default=100, ge=1, le=1000),
+    after: Optional[str] = Query(default=None),
+    columns: Optional[str] = Query(default=None),
+    sort: Optional[str] = Query(default=None),
+    desc: bool = Query(default=False),
 ):
-    """Get raw data from a specific table in a center's database."""
-    import pyodbc
+    """
+    Get one page of a mapped table in a center's database.
+
+    All names are canonical and rewritten through the mapping:
+    `columns=ID,DATUM` projects, any other parameter filters
+    (`DATUM=20220118`, `DATUM=ge:20220101`, `PATNR=null`), `sort`/`desc`
+    order the page and `after=<next_after>` continues after the last row.
+    """
+    from ..services.table_browser import TableQueryError, fetch_page
 
     config = get_config()
     center = config.get_center(center_id)
@@ -241,89 +496,54 @@ async def get_table_data(
     if not center:
         raise HTTPException(status_code=404, detail=f"Center not found: {center_id}")
 
-    # Load mapping to get actual table/column names
-    mapping_file = MAPPINGS_DIR / f"{center_id}_mapping.json"
-    if not mapping_file.exists():
-        raise HTTPException(
-            status_code=404,
-            detail=f"No mapping for {center_id}. Run 'generate-mappings' first.",
+    filters = {k: v for k, v in request.query_params.items() if k not in TABLE_DATA_PARAMS}
+    projection = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+
+    pool = get_pool()
+
+    def load_page():
+        schema = get_schema(center_id)  # Cached, revalidated by mtime
+        return fetch_page(
+            pool,
+            center.database,
+            schema,
+            table_name,
+            columns=projection,
+            filters=filters,
+            sort=sort,
+            descending=desc,
+            after=after,
+            limit=limit,
         )
 
-    with open(mapping_file) as f:
-        mapping = json.load(f)
-
-    # Get table mapping
-    table_mapping = mapping.get("tables", {}).get(table_name)
-    if not table_mapping:
+    try:
+        page = await blocking["table-data"].run(load_page)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
-            detail=f"Table '{table_name}' not found in mapping for {center_id}",
-        )
-
-    actual_table = table_mapping.get("actual_name")
-    schema = mapping.get("schema", "dbo")
-    columns_mapping = table_mapping.get("columns", {})
-
-    # Build column list (canonical -> actual)
-    columns = []
-    select_parts = []
-    for canonical, col_data in columns_mapping.items():
-        actual_col = col_data.get("actual_name", canonical)
-        columns.append(canonical)
-        select_parts.append(f"[{actual_col}] AS [{canonical}]")
-
-    if not select_parts:
-        raise HTTPException(status_code=400, detail="No columns found in mapping")
-
-    # Query the database
-    try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 18 for SQL Server}};"
-            f"SERVER=localhost,1434;"
-            f"DATABASE={center.database};"
-            f"UID=sa;PWD=Clinero2026;"
-            f"TrustServerCertificate=yes"
+            detail=f"No mapping for {center_id}. Run 'generate-mappings' first.",
         )
-        conn = pyodbc.connect(conn_str, timeout=10)
-        cursor = conn.cursor()
-
-        sql = f"SELECT TOP {limit} {', '.join(select_parts)} FROM [{schema}].[{actual_table}]"
-        cursor.execute(sql)
-
-        rows = []
-        for row in cursor.fetchall():
-            row_dict = {}
-            for i, col in enumerate(columns):
-                value = row[i]
-                # Convert dates and other types to string for JSON
-                if hasattr(value, 'isoformat'):
-                    value = value.isoformat()
-                elif value is not None:
-                    value = str(value) if not isinstance(value, (int, float, bool)) else value
-                row_dict[col] = value
-            rows.append(row_dict)
-
-        cursor.close()
-        conn.close()
-
-        return {
-            "center_id": center_id,
-            "table": table_name,
-            "actual_table": actual_table,
-            "columns": columns,
-            "row_count": len(rows),
-            "rows": rows,
-        }
-
-    except pyodbc.Error as e:
+    except TableQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except pool.dialect.Error as e:
         raise HTTPException(
             status_code=500,
             detail=f"Database error: {str(e)}",
         )
 
+    return {
+        "center_id": center_id,
+        "table": table_name,
+        "actual_table": page.actual_table,
+        "columns": page.columns,
+        "row_count": len(page.rows),
+        "rows": page.rows,
+        "next_after": page.next_after,
+    }
+
 
 @app.get("/api/benchmark")
-async def run_benchmark():
+async def run_benchmark(request: Request, response: Response):
     """Run performance benchmark."""
     config = get_config()
 
@@ -335,13 +555,17 @@ async def run_benchmark():
             detail="No mapping files found. Run 'generate-mappings' first.",
         )
 
-    # Run extraction on test date
-    service = ExtractionService(config)
-    result = service.extract_all(
-        target_date=date(2022, 1, 18),
-        max_workers=5,
+    return await blocking["benchmark"].run(
+        _profiled(request, response, "api-benchmark", _run_benchmark), config
     )
 
+
+def _run_benchmark(config, job: Job | None = None) -> dict:
+    """Run extraction on the test date and summarize timing (blocking)."""
+    trace = TraceRecorder("api-benchmark")
+    result = _extract(config, BENCHMARK_DATE, None, job, trace)
+    trace_path = trace.write()
+
     # Per-center timing
     timing = []
     for r in sorted(result.results, key=lambda x: x.duration_ms, reverse=True):
@@ -350,124 +574,243 @@ async def run_benchmark():
                 "center_id": r.center_id,
                 "center_name": r.center_name,
                 "duration_ms": round(r.duration_ms, 1),
+                "phases_ms": r.phases_ms(1),
                 "entries_count": len(r.entries),
                 "success": r.error is None,
             }
         )
 
-    target_ms = 5000
+    # Time spent per phase, summed over all centers
+    phase_totals = {}
+    for r in result.results:
+        for phase, ms in r.phases_ms(1).items():
+            phase_totals[phase] = round(phase_totals.get(phase, 0.0) + ms, 1)
+
+    target_ms = TARGET_MS
     passed = result.total_duration_ms < target_ms
 
     return {
         "total_centers": len(result.results),
         "total_entries": result.total_entries,
         "total_duration_ms": round(result.total_duration_ms, 1),
+        "phase_totals_ms": phase_totals,
         "target_ms": target_ms,
         "passed": passed,
         "timing": timing,
+        # Chrome Trace Event JSON: open in chrome://tracing or ui.perfetto.dev
+        "trace": f"/api/traces/{trace_path.name}",
     }
 
 
-@app.get("/api/schema-diff/{center_id}")
-async def get_schema_diff(center_id: str):
-    """Compare ground truth schema vs discovered mapping for a center."""
-    config = get_config()
-    center = config.get_center(center_id)
+@app.get("/api/traces/{name}")
+async def get_trace(name: str):
+    """Download a timeline trace written by a benchmark run."""
+    path = TRACES_DIR / name
+    if path.parent != TRACES_DIR or path.suffix != ".json" or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Unknown trace: {name}")
+    return FileResponse(path, media_type="application/json", filename=name)
 
-    if not center:
-        raise HTTPException(status_code=404, detail=f"Center not found: {center_id}")
 
-    # Load ground truth
-    ground_truth_file = GROUND_TRUTH_DIR / f"{center_id}_ground_truth.json"
-    if not ground_truth_file.exists():
-        raise HTTPException(
-            status_code=404,
-            detail=f"No ground truth for {center_id}. Run generate_test_dbs.py first.",
+class JobRequest(BaseModel):
+    """Body of POST /api/jobs."""
+
+    kind: Literal["extract", "benchmark"] = "extract"
+    date: str = "2022-01-18"  # Ignored for benchmarks
+    centers: Optional[list[str]] = None
+    shape: Literal["rows", "columnar"] = "rows"
+
+
+def _job_links(job: Job) -> dict:
+    return {
+        "status": f"/api/jobs/{job.id}",
+        "result": f"/api/jobs/{job.id}/result",
+    }
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(body: JobRequest):
+    """
+    Start an extraction or benchmark in the background.
+
+    Identical requests (same kind, date, center set and shape) that are
+    still queued or running return the existing job instead.
+    """
+    if body.kind == "benchmark":
+        config = get_config()
+        if not list_available_mappings(MAPPINGS_DIR):
+            raise HTTPException(
+                status_code=400,
+                detail="No mapping files found. Run 'generate-mappings' first.",
+            )
+        key = ("benchmark",)
+        params = {}
+        func = partial(_run_benchmark, config)
+    else:
+        centers = ",".join(body.centers) if body.centers else None
+        config, target_date, selected = _parse_extract_request(body.date, centers)
+        center_set = tuple(sorted(set(selected))) if selected else None
+        key = ("extract", target_date, center_set, body.shape)
+        params = {"date": target_date.isoformat(), "centers": center_set, "shape": body.shape}
+        func = partial(
+            _run_extraction, config, target_date, list(center_set) if center_set else None, body.shape
         )
 
-    with open(ground_truth_file) as f:
-        ground_truth = json.load(f)
+    job, coalesced = jobs.submit(body.kind, key, params, func)
+    return {**job.to_dict(), "coalesced_into_existing": coalesced, "links": _job_links(job)}
 
-    # Load mapping
-    mapping_file = MAPPINGS_DIR / f"{center_id}_mapping.json"
-    mapping = None
-    if mapping_file.exists():
-        with open(mapping_file) as f:
-            mapping = json.load(f)
-
-    # Compare schemas
-    tables_matched = 0
-    tables_total = 0
-    columns_matched = 0
-    columns_total = 0
-    tables_diff = {}
-
-    # Get canonical tables from ground truth
-    gt_tables = ground_truth.get("tables", {})
-
-    for canonical_table, gt_data in gt_tables.items():
-        tables_total += 1
-        gt_actual = gt_data.get("actual_name", "")
-
-        # Get mapping data
-        mapping_actual = ""
-        mapping_columns = {}
-        if mapping and canonical_table in mapping.get("tables", {}):
-            mapping_actual = mapping["tables"][canonical_table].get("actual_name", "")
-            mapping_columns = {
-                col: data.get("actual_name", "")
-                for col, data in mapping["tables"][canonical_table]
-                .get("columns", {})
-                .items()
-            }
 
-        table_match = gt_actual == mapping_actual
-        if table_match:
-            tables_matched += 1
+@app.get("/api/jobs")
+async def list_jobs():
+    """All retained jobs, newest first."""
+    return {"jobs": [job.to_dict() for job in jobs.list()], "stats": jobs.stats()}
 
-        # Compare columns
-        columns_diff = {}
-        gt_columns = gt_data.get("columns", {})
 
-        for canonical_col, gt_col_value in gt_columns.items():
-            columns_total += 1
-            # Ground truth columns are stored as direct string values
-            gt_col_actual = gt_col_value if isinstance(gt_col_value, str) else gt_col_value.get("actual_name", "")
-            mapping_col_actual = mapping_columns.get(canonical_col, "")
+def _get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found or expired: {job_id}")
+    return job
 
-            col_match = gt_col_actual == mapping_col_actual
-            if col_match:
-                columns_matched += 1
 
-            columns_diff[canonical_col] = {
-                "ground_truth": gt_col_actual,
-                "mapping": mapping_col_actual,
-                "match": col_match,
-            }
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a job."""
+    job = _get_job(job_id)
+    return {**job.to_dict(), "links": _job_links(job)}
 
-        tables_diff[canonical_table] = {
-            "ground_truth": gt_actual,
-            "mapping": mapping_actual,
-            "match": table_match,
-            "columns": columns_diff,
-        }
 
-    # Calculate accuracy
-    total_items = tables_total + columns_total
-    matched_items = tables_matched + columns_matched
-    accuracy = round((matched_items / total_items * 100) if total_items > 0 else 0)
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a finished job (409 while it is still queued or running)."""
+    job = _get_job(job_id)
+    if job.status in (QUEUED, RUNNING):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=410, detail=f"Job {job_id} {job.status}: {job.error or ''}")
+    return job.result
 
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job; running jobs stop after the center in progress."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found or expired: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/api/executor")
+async def executor_stats():
+    """Concurrency limits, queueing metrics and connection pool counters."""
     return {
-        "center_id": center_id,
-        "tables_matched": tables_matched,
-        "tables_total": tables_total,
-        "columns_matched": columns_matched,
-        "columns_total": columns_total,
-        "accuracy": accuracy,
-        "tables": tables_diff,
+        "endpoints": blocking.stats(),
+        "pool": _pool.stats() if _pool is not None else {},
+        "response_cache": response_cache.stats(),
+        "jobs": jobs.stats(),
     }
 
 
+def _runtime_metrics():
+    """Scrape-time state: endpoint queues, connection pool, caches, jobs."""
+    endpoints = blocking.stats()
+    for name, help in (
+        ("running", "Blocking calls running per endpoint"),
+        ("queued", "Blocking calls waiting for a slot per endpoint"),
+    ):
+        yield MetricFamily(
+            f"ivoris_endpoint_{name}", "gauge", help,
+            [({"endpoint": e}, s[name]) for e, s in endpoints.items()],
+        )
+    for name, help in (
+        ("completed", "Blocking calls completed per endpoint"),
+        ("failed", "Blocking calls that raised per endpoint"),
+        ("rejected", "Requests rejected with 503 (queue full) per endpoint"),
+    ):
+        yield MetricFamily(
+            f"ivoris_endpoint_{name}_total", "counter", help,
+            [({"endpoint": e}, s[name]) for e, s in endpoints.items()],
+        )
+
+    pool = _pool.stats() if _pool is not None else {}
+    yield MetricFamily(
+        "ivoris_pool_connections", "gauge", "Pooled connections by state",
+        [({"database": db, "state": state}, s[state]) for db, s in pool.items() for state in ("in_use", "idle")],
+    )
+    for name in ("created", "reused", "discarded"):
+        yield MetricFamily(
+            f"ivoris_pool_connections_{name}_total", "counter", f"Pooled connections {name}",
+            [({"database": db}, s[name]) for db, s in pool.items()],
+        )
+
+    mapping = cache_stats()
+    yield MetricFamily(
+        "ivoris_mapping_cache_lookups_total", "counter", "Mapping cache lookups by result",
+        [({"result": r}, mapping[k]) for r, k in (("hit", "hits"), ("miss", "misses"), ("reload", "reloads"))],
+    )
+    yield MetricFamily("ivoris_mapping_cache_entries", "gauge", "Cached mappings", [({}, mapping["cached"])])
+
+    responses = response_cache.stats()
+    yield MetricFamily(
+        "ivoris_response_cache_lookups_total", "counter", "Response cache lookups by result",
+        [({"result": "hit"}, responses["hits"]), ({"result": "miss"}, responses["misses"])],
+    )
+    yield MetricFamily("ivoris_response_cache_entries", "gauge", "Cached responses", [({}, responses["entries"])])
+
+    job_counts = jobs.stats()
+    yield MetricFamily(
+        "ivoris_jobs", "gauge", "Retained background jobs by status",
+        [({"status": status}, count) for status, count in job_counts.items() if status != "coalesced"],
+    )
+
+
+REGISTRY.register_collector("web", _runtime_metrics)
+
+
+@app.get("/api/schema-diff")
+async def get_schema_diff_all(
+    request: Request,
+    centers: Optional[str] = Query(None, description="Comma-separated center IDs (default: all with ground truth)"),
+    details: bool = Query(False, description="Include per-table column diffs"),
+):
+    """Mapping accuracy of many centers in one pass, with aggregate totals."""
+    center_ids = _parse_center_ids(get_config(), centers)
+
+    def build():
+        ids = center_ids if center_ids is not None else schema_diffs.center_ids()
+        return response_cache.get(
+            ("schema-diff", tuple(ids), details),
+            schema_diffs.depends_on(ids),
+            lambda: schema_diffs.evaluate(ids).to_dict(details=details),
+        )
+
+    cached = await blocking["schema-diff"].run(build)
+    return conditional_response(request, cached)
+
+
+@app.get("/api/schema-diff/{center_id}")
+async def get_schema_diff(request: Request, center_id: str):
+    """Compare ground truth schema vs discovered mapping for a center."""
+    config = get_config()
+    center = config.get_center(center_id)
+
+    if not center:
+        raise HTTPException(status_code=404, detail=f"Center not found: {center_id}")
+
+    ground_truth_file = schema_diffs.ground_truth_file(center_id)
+    if not ground_truth_file.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"No ground truth for {center_id}. Run generate_test_dbs.py first.",
+        )
+
+    cached = response_cache.get(
+        ("schema-diff", center_id),
+        [ground_truth_file, schema_diffs.mapping_file(center_id)],
+        lambda: schema_diffs.diff(center_id),
+    )
+    return conditional_response(request, cached)
+
+
 # =============================================================================
 # STARTUP
 # =============================================================================
@@ -0,0 +1,110 @@
+"""
+In-process response cache for file-backed endpoints.
+
+Responses built from config, mapping and ground truth files are
+serialized once and kept together with the (mtime_ns, size) of every
+file they were built from. A request only stats those files; the body
+is rebuilt when one of them changed.
+
+Each cached body carries a strong ETag (hash of the exact bytes), so
+clients revalidating with If-None-Match get `304 Not Modified` without
+a body.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Clients must revalidate, but may keep the body for the 304 path
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Serialized JSON body plus its validators."""
+
+    body: bytes
+    etag: str
+    signature: tuple
+
+
+def file_signature(paths: list[Path]) -> tuple:
+    """(path, mtime_ns, size) per file; missing files are part of the state."""
+    signature = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+class ResponseCache:
+    """LRU of serialized responses, revalidated by file signatures."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, key: Hashable, depends_on: list[Path], build: Callable[[], Any]
+    ) -> CachedResponse:
+        """Cached response for key, rebuilt if any dependency changed."""
+        signature = file_signature(depends_on)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        body = dumps(build())
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        cached = CachedResponse(body=body, etag=etag, signature=signature)
+
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_response(request: Request, cached: CachedResponse) -> Response:
+    """200 with the cached body, or 304 if the client already has it."""
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
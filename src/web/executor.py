@@ -0,0 +1,203 @@
+"""
+Bounded executor for blocking work in the web app.
+
+Extraction and pyodbc calls are synchronous. Running them directly in
+an `async def` endpoint blocks the event loop, so one extraction would
+freeze every other request (including static pages).
+
+Blocking calls go through an EndpointLimiter instead:
+
+- all limiters share one bounded thread pool
+- each endpoint has its own concurrency limit; excess requests wait in
+  a queue of bounded length and are rejected with 503 when it is full
+- queue depth, running count and wait times are tracked per endpoint
+- blocking generators can be consumed as async iterators (streaming)
+
+Counters are only touched from the event loop thread, so they need no
+locking.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Generator
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Message kinds passed from a producer thread to the event loop
+_ITEM, _ERROR, _DONE = "item", "error", "done"
+
+
+@dataclass
+class LimiterStats:
+    """Queueing metrics of one endpoint."""
+
+    limit: int
+    max_queue: int
+    running: int = 0
+    queued: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    run_ms_total: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        started = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_ms_total / started, 1) if started else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 1),
+            "avg_run_ms": round(self.run_ms_total / started, 1) if started else 0.0,
+        }
+
+
+class EndpointLimiter:
+    """Runs blocking calls for one endpoint on the shared pool."""
+
+    def __init__(self, name: str, executor: ThreadPoolExecutor, limit: int, max_queue: int):
+        self.name = name
+        self._executor = executor
+        self._limit = limit
+        self._semaphore: asyncio.Semaphore | None = None
+        self.stats = LimiterStats(limit=limit, max_queue=max_queue)
+
+    def check_capacity(self) -> None:
+        """Raise 503 if all slots are busy and the queue is full."""
+        stats = self.stats
+        semaphore = self._semaphore
+        if semaphore is not None and semaphore.locked() and stats.queued >= stats.max_queue:
+            stats.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many concurrent {self.name} requests, try again later",
+                headers={"Retry-After": "5"},
+            )
+
+    async def _acquire(self) -> float:
+        """Wait for a free slot; returns the time the call started."""
+        stats = self.stats
+        if self._semaphore is None:
+            # Created lazily so it binds to the server's running loop
+            self._semaphore = asyncio.Semaphore(self._limit)
+
+        self.check_capacity()
+
+        queued_at = time.perf_counter()
+        stats.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            stats.queued -= 1
+
+        started = time.perf_counter()
+        wait_ms = (started - queued_at) * 1000
+        stats.wait_ms_total += wait_ms
+        stats.wait_ms_max = max(stats.wait_ms_max, wait_ms)
+        stats.running += 1
+        return started
+
+    def _release_when_done(self, future: asyncio.Future, started: float) -> None:
+        if future.done():
+            self._finish(future, started)
+        else:
+            future.add_done_callback(lambda f: self._finish(f, started))
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in the pool, waiting for a free slot."""
+        started = await self._acquire()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        try:
+            # Shielded: a disconnecting client cancels this coroutine, but
+            # the thread keeps running and must keep its slot until done
+            return await asyncio.shield(future)
+        finally:
+            self._release_when_done(future, started)
+
+    async def iterate(self, func: Callable[..., Generator], *args, **kwargs) -> AsyncIterator:
+        """
+        Run a blocking generator in the pool, yielding items as they arrive.
+
+        The generator holds one slot until it is exhausted. If the consumer
+        stops early (client disconnect), the generator is closed after its
+        next item so it can cancel outstanding work.
+        """
+        started = await self._acquire()
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            items = func(*args, **kwargs)
+            try:
+                for item in items:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (_ITEM, item))
+            except BaseException as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (_ERROR, e))
+                raise
+            finally:
+                items.close()
+            loop.call_soon_threadsafe(queue.put_nowait, (_DONE, None))
+
+        future = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind is _DONE:
+                    return
+                if kind is _ERROR:
+                    raise value
+                yield value
+        finally:
+            stop.set()
+            self._release_when_done(future, started)
+
+    def _finish(self, future: asyncio.Future, started: float) -> None:
+        stats = self.stats
+        if future.cancelled() or future.exception() is not None:
+            stats.failed += 1
+        else:
+            stats.completed += 1
+        stats.running -= 1
+        stats.run_ms_total += (time.perf_counter() - started) * 1000
+        self._semaphore.release()
+
+
+class BlockingExecutor:
+    """Shared bounded pool plus one limiter per endpoint."""
+
+    def __init__(self, limits: dict[str, tuple[int, int]]):
+        """limits: endpoint name -> (max concurrent, max queued)."""
+        workers = sum(limit for limit, _ in limits.values())
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="web-blocking")
+        self.limiters = {
+            name: EndpointLimiter(name, self._executor, limit, max_queue)
+            for name, (limit, max_queue) in limits.items()
+        }
+
+    def __getitem__(self, name: str) -> EndpointLimiter:
+        return self.limiters[name]
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: limiter.stats.to_dict() for name, limiter in self.limiters.items()}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
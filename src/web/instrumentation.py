@@ -0,0 +1,70 @@
+"""
+HTTP request metrics and the Prometheus scrape response.
+
+Requests are labelled by route template (e.g. /api/centers/{center_id}),
+not by raw path, so label cardinality stays bounded. Durations run
+until the last body chunk is sent, which for NDJSON/SSE streams is the
+end of the stream.
+"""
+
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.metrics import CONTENT_TYPE, REGISTRY
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "ivoris_http_requests_total", "HTTP requests by route and status", ("route", "method", "status")
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "ivoris_http_request_duration_seconds", "HTTP request duration by route", ("route",)
+)
+HTTP_BYTES = REGISTRY.counter(
+    "ivoris_http_response_bytes_total", "HTTP response body bytes by route", ("route",)
+)
+
+
+def wants_prometheus(request: Request) -> bool:
+    """Scrapers ask for text/plain or OpenMetrics; browsers ask for HTML."""
+    if request.query_params.get("format") == "prometheus":
+        return True
+    return "text/html" not in request.headers.get("accept", "")
+
+
+def prometheus_response() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """Count requests, response bytes and durations per route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_counted(message: Message) -> None:
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(route=path, method=scope["method"], status=status)
+            HTTP_DURATION.observe(time.perf_counter() - start, route=path)
+            HTTP_BYTES.inc(sent, route=path)
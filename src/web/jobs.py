@@ -0,0 +1,194 @@
+"""
+Background jobs for long-running web actions (extraction, benchmark).
+
+A job runs on a small dedicated thread pool, outside any HTTP request.
+Clients poll its status and fetch the result when it finished.
+
+- Coalescing: submitting a job whose key (kind + parameters) matches a
+  queued or running job returns that job instead of starting another.
+- Cancellation: queued jobs are dropped; running jobs see their cancel
+  event at the next checkpoint (e.g. after each center). A coalesced job
+  is shared, so cancelling it cancels it for every requester.
+- Retention: finished jobs are kept for `ttl_s` seconds (and at most
+  `max_finished`), then evicted.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its cancel event is set."""
+
+
+@dataclass
+class Job:
+    """State of one background job."""
+
+    id: str
+    kind: str
+    key: Hashable
+    params: dict[str, Any]
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    completed: int = 0  # Progress: units done / total (e.g. centers)
+    total: int | None = None
+    coalesced: int = 0  # Submissions that joined this job
+    result: Any = None
+    error: str | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Future | None = None
+
+    def check_cancelled(self) -> None:
+        """Checkpoint for job functions."""
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.id)
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.time()
+        end = self.finished_at or now
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_ms": round((end - self.started_at) * 1000, 1) if self.started_at else None,
+            "completed": self.completed,
+            "total": self.total,
+            "coalesced": self.coalesced,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs, coalesces, cancels and retains background jobs."""
+
+    def __init__(self, max_workers: int = 2, ttl_s: float = 900.0, max_finished: int = 200):
+        self.ttl_s = ttl_s
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._active: dict[Hashable, Job] = {}  # key -> queued/running job
+
+    def submit(
+        self,
+        kind: str,
+        key: Hashable,
+        params: dict[str, Any],
+        func: Callable[[Job], Any],
+    ) -> tuple[Job, bool]:
+        """Start func(job) in the background; returns (job, coalesced)."""
+        with self._lock:
+            self._evict()
+            active = self._active.get(key)
+            if active is not None:
+                active.coalesced += 1
+                return active, True
+
+            job = Job(id=uuid.uuid4().hex[:16], kind=kind, key=key, params=params)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            job.future = self._executor.submit(self._run, job, func)
+        logger.info(f"Job {job.id} ({kind}) queued")
+        return job, False
+
+    def _run(self, job: Job, func: Callable[[Job], Any]) -> None:
+        with self._lock:
+            if job.cancel_event.is_set():
+                return  # Cancelled while queued (already finalized)
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        try:
+            result = func(job)
+            status, error = SUCCEEDED, None
+        except JobCancelled:
+            result, status, error = None, CANCELLED, None
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            job.result = result
+            job.error = error
+            self._finish(job, status)
+        logger.info(f"Job {job.id} {status}")
+
+    def _finish(self, job: Job, status: str) -> None:
+        # Caller holds the lock
+        job.status = status
+        job.finished_at = time.time()
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        with self._lock:
+            self._evict()
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Request cancellation; returns the job (None if unknown)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            job.cancel_event.set()
+            if job.status == QUEUED:
+                job.future.cancel()
+                self._finish(job, CANCELLED)
+            # Running jobs stop at their next checkpoint
+            return job
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        expired = {j.id for j in finished if now - j.finished_at > self.ttl_s}
+        overflow = len(finished) - len(expired) - self.max_finished
+        if overflow > 0:
+            remaining = sorted(
+                (j for j in finished if j.id not in expired), key=lambda j: j.finished_at
+            )
+            expired.update(j.id for j in remaining[:overflow])
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            counts["coalesced"] = sum(j.coalesced for j in self._jobs.values())
+            return counts
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
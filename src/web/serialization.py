@@ -0,0 +1,158 @@
+"""
+JSON serialization and compression for API responses.
+
+Serializer: orjson when installed (several times faster on large entry
+lists), otherwise the standard library encoder. Both produce compact
+UTF-8 JSON. Select one explicitly with IVORIS_JSON=json|orjson.
+
+Compression: responses above COMPRESS_MIN_BYTES are compressed with
+brotli (if installed and accepted by the client) or gzip. Streaming
+responses (NDJSON/SSE) are passed through untouched so events are not
+held back in a compressor buffer.
+"""
+
+import gzip
+import json
+import logging
+import os
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Good ratio at gzip-like speed; 11 is far too slow per request
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_dumps(data: Any) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+SERIALIZERS: dict[str, Callable[[Any], bytes]] = {"json": _json_dumps}
+if orjson is not None:
+    SERIALIZERS["orjson"] = _orjson_dumps
+
+
+def _default_serializer() -> str:
+    name = os.environ.get("IVORIS_JSON")
+    if name:
+        if name not in SERIALIZERS:
+            raise ValueError(f"Unknown JSON serializer '{name}' (available: {', '.join(SERIALIZERS)})")
+        return name
+    return "orjson" if "orjson" in SERIALIZERS else "json"
+
+
+serializer_name = _default_serializer()
+dumps: Callable[[Any], bytes] = SERIALIZERS[serializer_name]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best supported content coding the client accepts."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compress complete (non-streaming) responses above a size threshold."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start = message  # Held until the body shows whether to compress
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                # Streaming, small or already encoded: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Strong ETags identify exact bytes; the encoded body differs
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)